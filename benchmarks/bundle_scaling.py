@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""Measures how meshing phases grow with the number of wires of a bundle.
+
+Generates open, shielded or jacketed bundles of N wires with
+CableBundleGenerator, meshes each with Mesher.meshFromStep in a fresh
+process and tabulates the classification, boolean and meshing times,
+with the growth exponent between consecutive sizes.
+"""
+
+import os
+import sys
+import math
+import argparse
+import tempfile
+from pathlib import Path
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.Benchmark import Benchmark
+from src.CableBundleGenerator import CableBundleGenerator
+
+PHASES = ("classification", "booleans", "meshGeneration")
+
+
+def growthExponent(previous, current, previousSize, size):
+    if previous is None or previous <= 0 or current <= 0:
+        return float('nan')
+    return math.log(current / previous) / math.log(size / previousSize)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--wires", type=int, nargs='+',
+                        default=[10, 20, 50, 100, 200, 500, 1000])
+    parser.add_argument("-v", "--variant", choices=CableBundleGenerator.VARIANTS, default="jacketed")
+    parser.add_argument("-r", "--repetitions", type=int, default=1)
+    parser.add_argument("--keep", default=None,
+                        help="folder where the generated step files are kept")
+    parser.add_argument("--save", default=None, help="file where results are saved")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = args.keep if args.keep is not None else tmp
+        cases = []
+        for numWires in args.wires:
+            generator = CableBundleGenerator(numWires, args.variant)
+            generator.exportStep(folder)
+            cases.append(generator.getCaseName())
+        results = Benchmark(folder, cases, args.repetitions).run()
+
+    print("{:>6s} ".format("N") + " ".join("{:>15s} {:>5s}".format(p, "exp") for p in PHASES)
+          + " {:>10s} {:>10s}".format("total [s]", "elements"))
+    previous = dict()
+    previousSize = None
+    for numWires, caseName in zip(args.wires, cases):
+        result = results["cases"][caseName]
+        columns = []
+        for phase in PHASES:
+            wallTime = result["phases"].get(phase, 0.0)
+            columns.append("{:15.4f} {:5.2f}".format(
+                wallTime, growthExponent(previous.get(phase), wallTime, previousSize, numWires)))
+            previous[phase] = wallTime
+        previousSize = numWires
+        print("{:6d} ".format(numWires) + " ".join(columns)
+              + " {:10.3f} {:10d}".format(result["total"], result["elements"]))
+
+    if args.save is not None:
+        Benchmark.exportToJson(results, args.save)
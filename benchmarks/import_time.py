@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Measures the startup time of the step2gmsh command line.
+
+Runs `step2gmsh.py --help` several times in fresh interpreters and reports
+the median wall time, the slowest imports and whether gmsh or numpy were
+loaded, which the command line must only do once meshing starts. Exits
+with an error when --max-time is exceeded or a heavy module is imported.
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import argparse
+import time
+from pathlib import Path
+
+project_root = str(Path(__file__).parent.parent)
+HEAVY_MODULES = ('gmsh', 'numpy')
+
+
+def timeStartup(repetitions):
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, os.path.join(project_root, 'step2gmsh.py'), '--help'],
+            cwd=project_root, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def importTimes():
+    """Cumulative import time in seconds of each module imported by step2gmsh."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import step2gmsh'],
+        cwd=project_root, stderr=subprocess.PIPE, text=True, check=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)', line)
+        if match:
+            times[match.group(3)] = int(match.group(1)) * 1e-6
+    return times
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-r", "--repetitions", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports listed")
+    parser.add_argument("--max-time", type=float, default=None,
+                        help="maximum median startup time in seconds")
+    args = parser.parse_args()
+
+    startup = timeStartup(args.repetitions)
+    times = importTimes()
+
+    print("{:50s} {:>10s}".format("module", "cumulative [s]"))
+    for module, seconds in sorted(times.items(), key=lambda item: -item[1])[:args.top]:
+        print("{:50s} {:10.4f}".format(module, seconds))
+    print("startup of step2gmsh.py --help: {:.4f} s".format(startup))
+
+    failed = False
+    heavy = [module for module in HEAVY_MODULES if module in times]
+    if heavy:
+        print("REGRESSION heavy modules imported at startup: " + ", ".join(heavy))
+        failed = True
+    if args.max_time is not None and startup > args.max_time:
+        print("REGRESSION startup took {:.4f} s, more than {:.4f} s".format(startup, args.max_time))
+        failed = True
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Compares the cut and fragment resolution engines on the testData cases.
+
+For every case the geometry is built with both engines, timing the build and
+checking that both produce the same physical groups with the same areas and
+lengths.
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import gmsh
+from src.mesher import Mesher
+from src.ShapesClassification import ShapesClassification
+
+TEST_DATA_PATH = os.path.join(project_root, 'testData')
+
+
+def physicalGroupMasses():
+    masses = {}
+    for pG in gmsh.model.getPhysicalGroups():
+        tags = gmsh.model.getEntitiesForPhysicalGroup(*pG)
+        masses[gmsh.model.getPhysicalName(*pG)] = sum(
+            gmsh.model.occ.getMass(pG[0], tag) for tag in tags)
+    return masses
+
+
+def buildGeometry(inputFile, caseName, engine, repetitions):
+    elapsed = []
+    for _ in range(repetitions):
+        gmsh.clear()
+        gmsh.model.add(caseName)
+        start = time.perf_counter()
+        Mesher().buildGeometry(inputFile, engine)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed), physicalGroupMasses()
+
+
+def sameMasses(reference, other, tolerance):
+    if sorted(reference.keys()) != sorted(other.keys()):
+        return False
+    return all(
+        abs(reference[name] - other[name]) <= tolerance * max(abs(reference[name]), 1.0)
+        for name in reference
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-r", "--repetitions", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-6,
+                        help="relative tolerance when comparing areas and lengths")
+    args = parser.parse_args()
+
+    gmsh.initialize()
+    gmsh.option.setNumber("General.Terminal", 0)
+
+    print("{:40s} {:>10s} {:>10s} {:>8s} {:>6s}".format(
+        "case", *ShapesClassification.RESOLUTION_ENGINES, "speedup", "same"))
+    for caseName in sorted(os.listdir(TEST_DATA_PATH)):
+        inputFile = os.path.join(TEST_DATA_PATH, caseName, caseName + '.step')
+        if not os.path.isfile(inputFile):
+            continue
+        cutTime, cutMasses = buildGeometry(inputFile, caseName, "cut", args.repetitions)
+        fragmentTime, fragmentMasses = buildGeometry(inputFile, caseName, "fragment", args.repetitions)
+        print("{:40s} {:10.4f} {:10.4f} {:8.2f} {:>6s}".format(
+            caseName, cutTime, fragmentTime, cutTime / fragmentTime,
+            str(sameMasses(cutMasses, fragmentMasses, args.tolerance))))
+
+    gmsh.finalize()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""Benchmarks meshing of the testData cases and checks for regressions.
+
+Saves the results as a JSON baseline with --save and compares a new run
+against a saved baseline with --baseline, exiting with an error when any
+time, memory or element count grows beyond the tolerance.
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.Benchmark import Benchmark
+
+TEST_DATA_PATH = os.path.join(project_root, 'testData')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-r", "--repetitions", type=int, default=3)
+    parser.add_argument("-c", "--cases", nargs='+', default=None,
+                        help="cases to run, defaults to all testData cases")
+    parser.add_argument("--save", default=None, help="file where results are saved")
+    parser.add_argument("--baseline", default=None, help="baseline file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative growth before flagging a regression")
+    args = parser.parse_args()
+
+    results = Benchmark(TEST_DATA_PATH, args.cases, args.repetitions).run()
+
+    print("{:40s} {:>10s} {:>10s} {:>10s}".format("case", "total [s]", "elements", "peak [MB]"))
+    for caseName, result in results["cases"].items():
+        peak = result["peakRss"] / 1024**2 if result["peakRss"] else float('nan')
+        print("{:40s} {:10.3f} {:10d} {:10.1f}".format(
+            caseName, result["total"], result["elements"], peak))
+
+    if args.save is not None:
+        Benchmark.exportToJson(results, args.save)
+
+    if args.baseline is not None:
+        regressions = Benchmark.compare(
+            Benchmark.loadFromJson(args.baseline), results, args.tolerance)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if regressions:
+            sys.exit(1)
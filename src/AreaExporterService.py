@@ -1,9 +1,15 @@
 import json
 import gmsh
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import numpy as np
+
+from . import constants
+from .TopologyMap import TopologyMap
+
+
 class AreaExporterService:
     _EMPTY_NAME_CASE = ""
+    ENGINES = constants.AREA_ENGINES
     computedAreas:Dict[str,List]
     geometry: Dict
     def __init__(self):
@@ -11,13 +17,24 @@ class AreaExporterService:
             "geometries": []
         }
     
-    def addComputedArea(self, geometry:str, area:float):
+    def addComputedArea(self, geometry:str, area:float, perimeter:Optional[float]=None):
         geometry:Dict ={
             "geometry": geometry,
             "area": area,
         }
+        if perimeter is not None:
+            geometry["perimeter"] = perimeter
         self.computedAreas['geometries'].append(geometry)
 
+    def addPhysicalModel(self, engine:str="occ"):
+        if engine == "occ":
+            self.addPhysicalModelOfDimension(dimension=2)
+            self.addPhysicalModelOfDimension(dimension=1)
+        elif engine == "mesh":
+            self.addPhysicalModelFromMesh()
+        else:
+            raise ValueError("Unknown area engine: " + engine)
+
     def addPhysicalModelOfDimension(self, dimension=2):
         physicalGroups = gmsh.model.getPhysicalGroups(dimension)
         for physicalGroup in physicalGroups:
@@ -32,6 +49,122 @@ class AreaExporterService:
                 if geometryName != AreaExporterService._EMPTY_NAME_CASE:
                     self.addComputedArea(geometryName, area)
 
+    def addPhysicalModelFromMesh(self):
+        """Integrates over the mesh elements, one entry per physical group.
+
+        Surfaces report their area. Curves report their perimeter and, as
+        area, the one enclosed by the loops they form, so non circular
+        conductors are also measured. Requires a generated mesh.
+        """
+        topology = TopologyMap.current()
+        surfaceAreas = AreaExporterService._integrateEntities(2)[0]
+        curveLengths, curveSignedAreas = AreaExporterService._integrateEntities(1)
+
+        for dim, pgTag in gmsh.model.getPhysicalGroups(2):
+            geometryName = topology.getPhysicalName((dim, pgTag))
+            if geometryName == AreaExporterService._EMPTY_NAME_CASE:
+                continue
+            area = sum(surfaceAreas.get(tag, 0.0) for _, tag in topology.getEntities((dim, pgTag)))
+            self.addComputedArea(geometryName, area)
+
+        for dim, pgTag in gmsh.model.getPhysicalGroups(1):
+            geometryName = topology.getPhysicalName((dim, pgTag))
+            if geometryName == AreaExporterService._EMPTY_NAME_CASE:
+                continue
+            tags = [tag for _, tag in topology.getEntities((dim, pgTag))]
+            perimeter = sum(curveLengths.get(tag, 0.0) for tag in tags)
+            area = 0.0
+            for loop in AreaExporterService._orientedLoops(tags):
+                area += abs(sum(sign * curveSignedAreas.get(tag, 0.0) for tag, sign in loop))
+            self.addComputedArea(geometryName, area, perimeter)
+
+    @staticmethod
+    def _integrateEntities(dimension:int) -> Tuple[Dict[int, float], Dict[int, float]]:
+        """Measure of each entity of the dimension and, for curves, its signed area.
+
+        The signed area is the contribution of the curve to 1/2 ∮ (x dy - y dx)
+        following its own parametrization. The jacobians of each element are
+        pulled once, by element type and entity, so no element tags are needed.
+        """
+        measures: Dict[int, float] = dict()
+        signedAreas: Dict[int, float] = dict()
+        entityTags = [tag for _, tag in gmsh.model.getEntities(dimension)]
+        for elementType in gmsh.model.mesh.getElementTypes(dimension):
+            order = gmsh.model.mesh.getElementProperties(elementType)[2]
+            localCoords, weights = gmsh.model.mesh.getIntegrationPoints(
+                elementType, "Gauss" + str(2 * order))
+            numPoints = len(weights)
+
+            for tag in entityTags:
+                jacobians, determinants, coords = gmsh.model.mesh.getJacobians(
+                    elementType, localCoords, tag)
+                if len(determinants) == 0:
+                    continue
+                measures[tag] = measures.get(tag, 0.0) \
+                    + float(np.sum(np.abs(determinants.reshape(-1, numPoints)) @ weights))
+
+                if dimension == 1:
+                    # Columns of the jacobian are stored first, dx/du dy/du dz/du.
+                    tangents = jacobians.reshape(-1, numPoints, 9)[:, :, 0:3]
+                    points = coords.reshape(-1, numPoints, 3)
+                    integrand = 0.5 * (points[:, :, 0] * tangents[:, :, 1] - points[:, :, 1] * tangents[:, :, 0])
+                    signedAreas[tag] = signedAreas.get(tag, 0.0) + float(np.sum(integrand @ weights))
+
+        return measures, signedAreas
+
+    @staticmethod
+    def _curveEnds(curveTags:List[int]) -> Dict[int, Tuple]:
+        """End points of each curve, from a single boundary query when every curve has two."""
+        boundary = gmsh.model.getBoundary([(1, tag) for tag in curveTags], combined=False, oriented=False)
+        if len(boundary) == 2 * len(curveTags):
+            points = [abs(pointTag) for _, pointTag in boundary]
+            return dict([[tag, (points[2*i], points[2*i + 1])] for i, tag in enumerate(curveTags)])
+
+        # Closed curves have a single or no end point, so the boundary can not be split.
+        ends = dict()
+        for tag in curveTags:
+            boundary = gmsh.model.getBoundary([(1, tag)], combined=False, oriented=False)
+            points = [abs(pointTag) for _, pointTag in boundary]
+            if len(points) < 2:
+                points = [None, None]
+            ends[tag] = (points[0], points[-1])
+        return ends
+
+    @staticmethod
+    def _orientedLoops(curveTags:List[int]) -> List[List[Tuple[int, int]]]:
+        """Chains curves through their end points into loops of (tag, sign)."""
+        if len(curveTags) == 0:
+            return []
+        ends = AreaExporterService._curveEnds(curveTags)
+        curvesAtPoint: Dict[int, List[int]] = dict()
+        for tag in curveTags:
+            for point in set(ends[tag]):
+                if point is not None:
+                    curvesAtPoint.setdefault(point, []).append(tag)
+
+        loops = []
+        used = set()
+        for tag in curveTags:
+            if tag in used:
+                continue
+            used.add(tag)
+            start, current = ends[tag]
+            loop = [(tag, 1)]
+            while current != start:
+                candidate = next((c for c in curvesAtPoint[current] if c not in used), None)
+                if candidate is None:
+                    break  # Open chain.
+                used.add(candidate)
+                first, last = ends[candidate]
+                if first == current:
+                    loop.append((candidate, 1))
+                    current = last
+                else:
+                    loop.append((candidate, -1))
+                    current = first
+            loops.append(loop)
+        return loops
+
     def exportToJson(self, exportFileName:str):
         with open(exportFileName + ".areas.json", 'w') as f:
             json.dump(self.computedAreas, f, indent=3)
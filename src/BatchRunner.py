@@ -0,0 +1,152 @@
+import glob
+import json
+import os
+import time
+import traceback
+from multiprocessing import connection, get_context
+from pathlib import Path
+from typing import Dict, List, Optional
+
+STEP_EXTENSIONS = ('.step', '.stp')
+
+
+def _runCase(inputFile: str, outputFolder: str, runOptions: Optional[Dict] = None) -> Dict:
+    result: Dict = {
+        "input": inputFile,
+        "case": Path(inputFile).stem,
+        "status": "ok",
+        "outputs": [],
+        "error": None,
+    }
+    start = time.perf_counter()
+    try:
+        from .mesher import Mesher
+        result["outputs"] = Mesher().runFromInput(
+            inputFile, outputFolder=outputFolder, **(runOptions or {}))
+    except Exception:
+        result["status"] = "failed"
+        result["error"] = traceback.format_exc()
+    result["wallTime"] = time.perf_counter() - start
+    return result
+
+
+def _caseWorker(inputFile: str, outputFolder: str, runOptions: Optional[Dict], conn):
+    conn.send(_runCase(inputFile, outputFolder, runOptions))
+    conn.close()
+
+
+class BatchRunner():
+    """Meshes many step files, each one in its own worker process.
+
+    Every case gets a fresh process and therefore its own gmsh session, so a
+    case that raises or even crashes the interpreter is reported as failed
+    without stopping the rest of the batch.
+    """
+    SUMMARY_FILE_NAME = "step2gmsh.summary.json"
+
+    def __init__(self, outputFolder: str = ".", numWorkers: Optional[int] = None,
+                 runOptions: Optional[Dict] = None):
+        """runOptions are forwarded as keyword arguments to Mesher.runFromInput."""
+        self.outputFolder = outputFolder
+        self.runOptions = runOptions if runOptions else {}
+        self.numWorkers = numWorkers if numWorkers else (os.cpu_count() or 1)
+
+    @staticmethod
+    def collectInputs(source: str) -> List[str]:
+        """Returns the step files given by a directory, a glob pattern or a manifest.
+
+        A manifest is a text file with one step path per line. Relative paths are
+        resolved from the manifest location, blank lines and lines starting with
+        '#' are ignored.
+        """
+        if os.path.isdir(source):
+            found = []
+            for ext in STEP_EXTENSIONS:
+                found.extend(glob.glob(os.path.join(source, '**', '*' + ext), recursive=True))
+            return sorted(found)
+
+        if os.path.isfile(source) and not source.lower().endswith(STEP_EXTENSIONS):
+            manifestFolder = os.path.dirname(os.path.abspath(source))
+            inputs = []
+            with open(source, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    if not os.path.isabs(line):
+                        line = os.path.join(manifestFolder, line)
+                    inputs.append(line)
+            return inputs
+
+        return sorted(glob.glob(source, recursive=True))
+
+    def run(self, inputFiles: List[str]) -> Dict:
+        caseNames = [Path(f).stem for f in inputFiles]
+        duplicated = sorted(set(n for n in caseNames if caseNames.count(n) > 1))
+        if duplicated:
+            raise ValueError(
+                "Case names must be unique within a batch, repeated: " + ", ".join(duplicated))
+
+        os.makedirs(self.outputFolder, exist_ok=True)
+
+        start = time.perf_counter()
+        results = self._runInWorkers(inputFiles)
+        failed = [r for r in results if r["status"] != "ok"]
+
+        return {
+            "total": len(results),
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "wallTime": time.perf_counter() - start,
+            "cases": results,
+        }
+
+    def _runInWorkers(self, inputFiles: List[str]) -> List[Dict]:
+        ctx = get_context("spawn")
+        pending = list(enumerate(inputFiles))
+        running: Dict = {}
+        results: List[Dict] = [None] * len(inputFiles)
+
+        while pending or running:
+            while pending and len(running) < self.numWorkers:
+                idx, inputFile = pending.pop(0)
+                receiver, sender = ctx.Pipe(duplex=False)
+                process = ctx.Process(
+                    target=_caseWorker, args=(inputFile, self.outputFolder, self.runOptions, sender))
+                process.start()
+                sender.close()
+                running[receiver] = (process, idx, inputFile, time.perf_counter())
+
+            # A receiver becomes ready when its worker sends a result or dies.
+            for receiver in connection.wait(list(running.keys())):
+                process, idx, inputFile, caseStart = running.pop(receiver)
+                results[idx] = self._collectResult(process, receiver, inputFile, caseStart)
+
+        return results
+
+    @staticmethod
+    def _collectResult(process, receiver, inputFile: str, caseStart: float) -> Dict:
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = None
+        receiver.close()
+        process.join()
+
+        if result is None:
+            result = {
+                "input": inputFile,
+                "case": Path(inputFile).stem,
+                "status": "failed",
+                "outputs": [],
+                "error": "Worker process exited with code {}".format(process.exitcode),
+                "wallTime": time.perf_counter() - caseStart,
+            }
+        return result
+
+    def exportSummary(self, summary: Dict, summaryFile: Optional[str] = None) -> str:
+        if summaryFile is None:
+            summaryFile = os.path.join(self.outputFolder, BatchRunner.SUMMARY_FILE_NAME)
+        with open(summaryFile, 'w') as f:
+            json.dump(summary, f, indent=3)
+        return summaryFile
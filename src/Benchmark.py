@@ -0,0 +1,119 @@
+import json
+import os
+import statistics
+from multiprocessing import get_context
+from typing import Dict, List, Optional
+
+
+def _benchmarkCase(inputFile: str, caseName: str, repetitions: int, meshingOptions: Optional[Dict]) -> Dict:
+    import gmsh
+    from .mesher import Mesher
+    from .Profiler import Profiler, getPeakRss
+
+    phases: Dict[str, List[float]] = dict()
+    totals = []
+    for _ in range(repetitions):
+        gmsh.initialize()
+        gmsh.option.setNumber("General.Terminal", 0)
+        profiler = Profiler()
+        Mesher(profiler).meshFromStep(inputFile, caseName, meshingOptions)
+        gmsh.finalize()
+
+        for phase in profiler.phases:
+            phases.setdefault(phase["name"], []).append(phase["wallTime"])
+        totals.append(sum(phase["wallTime"] for phase in profiler.phases))
+
+    return {
+        "phases": dict([[name, statistics.median(times)] for name, times in phases.items()]),
+        "total": statistics.median(totals),
+        "peakRss": getPeakRss(),
+        "nodes": profiler.mesh["nodes"],
+        "elements": sum(profiler.mesh["elements"].values()),
+        "booleans": dict(
+            [[op, values["count"]] for op, values in profiler.booleans.items()]),
+    }
+
+
+class Benchmark():
+    """Meshes the testData cases several times and compares against a baseline.
+
+    Each case runs in a fresh process so that its peak memory is not hidden by
+    the cases run before it. Times are the median over the repetitions.
+    """
+    DEFAULT_CASES = [
+        'empty_coax', 'partially_filled_coax', 'two_wires_coax', 'nested_coax',
+        'five_wires', 'two_wires_open', 'two_wires_shielded', 'three_wires_ribbon',
+        'unshielded_multiwire', 'agrawal1981', 'lansink2024_single_wire_multipolar',
+    ]
+
+    def __init__(self, testDataFolder: str, cases: Optional[List[str]] = None,
+                 repetitions: int = 3, meshingOptions: Optional[Dict] = None):
+        self.testDataFolder = testDataFolder
+        self.cases = cases if cases else Benchmark.DEFAULT_CASES
+        self.repetitions = repetitions
+        self.meshingOptions = meshingOptions
+
+    def inputFileFromCaseName(self, caseName: str) -> str:
+        return os.path.join(self.testDataFolder, caseName, caseName + '.step')
+
+    def run(self) -> Dict:
+        import gmsh
+        from . import __version__
+
+        results = dict()
+        ctx = get_context("spawn")
+        for caseName in self.cases:
+            with ctx.Pool(processes=1) as pool:
+                results[caseName] = pool.apply(
+                    _benchmarkCase,
+                    (self.inputFileFromCaseName(caseName), caseName,
+                     self.repetitions, self.meshingOptions)
+                )
+        return {
+            "step2gmshVersion": __version__,
+            "gmshVersion": gmsh.__version__,
+            "repetitions": self.repetitions,
+            "cases": results,
+        }
+
+    @staticmethod
+    def compare(baseline: Dict, current: Dict, tolerance: float = 0.2,
+                minimumTime: float = 0.05) -> List[str]:
+        """Lists the metrics of current exceeding baseline by more than tolerance.
+
+        Times below minimumTime seconds in the baseline are too noisy to be
+        compared and are skipped.
+        """
+        regressions = []
+
+        def check(caseName, metric, reference, value, isTime):
+            if reference is None or value is None:
+                return
+            if isTime and reference < minimumTime:
+                return
+            if value > reference * (1 + tolerance):
+                regressions.append(
+                    "{}: {} went from {:.6g} to {:.6g} (+{:.1f}%)".format(
+                        caseName, metric, reference, value,
+                        100 * (value - reference) / reference))
+
+        for caseName, reference in baseline["cases"].items():
+            if caseName not in current["cases"]:
+                continue
+            result = current["cases"][caseName]
+            check(caseName, "total", reference["total"], result["total"], True)
+            for phase, time in reference["phases"].items():
+                check(caseName, "phase " + phase, time, result["phases"].get(phase), True)
+            for metric in ("peakRss", "nodes", "elements"):
+                check(caseName, metric, reference.get(metric), result.get(metric), False)
+        return regressions
+
+    @staticmethod
+    def exportToJson(results: Dict, fileName: str):
+        with open(fileName, 'w') as f:
+            json.dump(results, f, indent=3)
+
+    @staticmethod
+    def loadFromJson(fileName: str) -> Dict:
+        with open(fileName, 'r') as f:
+            return json.load(f)
@@ -1,78 +1,177 @@
-from typing import Tuple, List, Dict
+from contextlib import contextmanager
+from typing import Tuple, List, Dict, Optional
 import gmsh
+import numpy as np
 from . import utils
 
+_EDGE_NAMES = ('XMin', 'YMin', 'ZMin', 'XMax', 'YMax', 'ZMax')
+
 class BoundingBox():
-    edges: Dict[str, float]
+    """Axis aligned box of XMin, YMin, ZMin, XMax, YMax, ZMax.
+
+    Boxes of OCC entities are queried from gmsh every time, except inside
+    a caching() block, where they are memoized until the block ends or the
+    model is synchronized. Tags are reused by booleans, so the model must
+    not change inside the block.
+    """
+    __slots__ = ('coordinates',)
+    _entityCache: Optional[Dict[Tuple[int, int], Tuple[float, float, float, float, float, float]]] = None
+
     def __init__(self, listOfCoordinates:Tuple[float,float,float,float,float,float]):
-        self.edges = {
-                'XMin': listOfCoordinates[0],
-                'YMin': listOfCoordinates[1],
-                'ZMin': listOfCoordinates[2],
-                'XMax': listOfCoordinates[3],
-                'YMax': listOfCoordinates[4],
-                'ZMax': listOfCoordinates[5],
-            }
-        
+        self.coordinates = np.array(listOfCoordinates, dtype=float).reshape(6)
+
+    @property
+    def edges(self) -> Dict[str, float]:
+        return dict(zip(_EDGE_NAMES, self.coordinates.tolist()))
+
     def getOrigin(self) -> Tuple[float,float,float]:
-        return (
-            self.edges['XMin'],
-            self.edges['YMin'],
-            self.edges['ZMin']
-        )
+        return tuple(self.coordinates[:3].tolist())
 
     def getCenter(self) -> Tuple[float,float,float]:
-        return (
-            (self.edges['XMax'] + self.edges['XMin']) / 2,
-            (self.edges['YMax'] + self.edges['YMin']) / 2,
-            (self.edges['ZMax'] + self.edges['ZMin']) / 2
-        )
+        return tuple(((self.coordinates[3:] + self.coordinates[:3]) / 2).tolist())
+
     def getDiagonal(self) -> float:
-        dx = self.edges['XMax'] - self.edges['XMin']
-        dy = self.edges['YMax'] - self.edges['YMin']
-        dz = self.edges['ZMax'] - self.edges['ZMin']
-        return (dx**2 + dy**2 + dz**2) ** 0.5
-    
+        return float(np.linalg.norm(self.coordinates[3:] - self.coordinates[:3]))
+
     def getLengths(self) -> Tuple[float, float, float]:
-        return (
-            self.edges['XMax'] - self.edges['XMin'],
-            self.edges['YMax'] - self.edges['YMin'],
-            self.edges['ZMax'] - self.edges['ZMin']
+        return tuple((self.coordinates[3:] - self.coordinates[:3]).tolist())
+
+    def overlaps(self, other: 'BoundingBox', tolerance: float = 0.0) -> bool:
+        return bool(
+            np.all(self.coordinates[:3] <= other.coordinates[3:] + tolerance) and
+            np.all(other.coordinates[:3] <= self.coordinates[3:] + tolerance)
         )
-    
+
+    @staticmethod
+    def clearCache():
+        if BoundingBox._entityCache is not None:
+            BoundingBox._entityCache.clear()
+
+    @staticmethod
+    @contextmanager
+    def caching():
+        """Memoizes the boxes of entities inside the block, which must not change the model."""
+        isOutermost = BoundingBox._entityCache is None
+        if isOutermost:
+            BoundingBox._entityCache = dict()
+        try:
+            yield
+        finally:
+            if isOutermost:
+                BoundingBox._entityCache = None
+
+    @staticmethod
+    def getEntityCoordinates(element:Tuple[int,int]) -> Tuple[float,float,float,float,float,float]:
+        element = (int(element[0]), int(element[1]))
+        cache = BoundingBox._entityCache
+        if cache is None:
+            return gmsh.model.occ.get_bounding_box(*element)
+        if element not in cache:
+            cache[element] = gmsh.model.occ.get_bounding_box(*element)
+        return cache[element]
+
+    @staticmethod
+    def fromEntity(element:Tuple[int,int]) -> 'BoundingBox':
+        return BoundingBox(BoundingBox.getEntityCoordinates(element))
+
     @staticmethod
     def _getBoundingBox(element:Tuple[int,int]) -> 'BoundingBox':
-        boundingBox:BoundingBox = BoundingBox(gmsh.model.occ.get_bounding_box(*element))
-        return boundingBox
+        return BoundingBox.fromEntity(element)
 
     @staticmethod
     def getBoundingBoxFromGroup(elements:List[Tuple[int,int]]) -> 'BoundingBox':
-        boundingBoxs:List[BoundingBox] = []
-        for element in elements:
-            boundingBoxs.append(BoundingBox._getBoundingBox(element))
-        
-        if len(boundingBoxs) != 0:
-            edges: Dict[str, List[float]] = {
-                'XMin': [],
-                'YMin': [],
-                'ZMin': [],
-                'XMax': [],
-                'YMax': [],
-                'ZMax': [],
-            }
-            for boundingBox in boundingBoxs:
-                for key in edges.keys():
-                    edges[key].append(boundingBox.edges[key])
-            
-            return BoundingBox(
-                (
-                    utils.getMinFromList(edges['XMin']),
-                    utils.getMinFromList(edges['YMin']),
-                    utils.getMinFromList(edges['ZMin']),
-                    utils.getMaxFromList(edges['XMax']),
-                    utils.getMaxFromList(edges['YMax']),
-                    utils.getMaxFromList(edges['ZMax'])
-                )
-            )
-        else:
-            return BoundingBox((0,0,0,0,0,0))
\ No newline at end of file
+        if len(elements) == 0:
+            return BoundingBox((0,0,0,0,0,0))
+        return BoundingBoxArray.fromEntities(elements).getUnion()
+
+
+class BoundingBoxArray():
+    """N bounding boxes stored as an (N,6) array of XMin, YMin, ZMin, XMax, YMax, ZMax."""
+    __slots__ = ('coordinates',)
+
+    def __init__(self, coordinates):
+        self.coordinates = np.array(coordinates, dtype=float).reshape(-1, 6)
+
+    @staticmethod
+    def fromEntities(elements:List[Tuple[int,int]]) -> 'BoundingBoxArray':
+        return BoundingBoxArray(
+            [BoundingBox.getEntityCoordinates(element) for element in elements])
+
+    @staticmethod
+    def fromGroups(groups:List[List[Tuple[int,int]]]) -> 'BoundingBoxArray':
+        return BoundingBoxArray(
+            [BoundingBox.getBoundingBoxFromGroup(group).coordinates for group in groups])
+
+    def __len__(self) -> int:
+        return self.coordinates.shape[0]
+
+    def __getitem__(self, idx: int) -> BoundingBox:
+        return BoundingBox(self.coordinates[idx])
+
+    def getUnion(self) -> BoundingBox:
+        return BoundingBox(np.concatenate((
+            self.coordinates[:, :3].min(axis=0),
+            self.coordinates[:, 3:].max(axis=0)
+        )))
+
+    def getCenters(self) -> np.ndarray:
+        return (self.coordinates[:, 3:] + self.coordinates[:, :3]) / 2
+
+    def getLengths(self) -> np.ndarray:
+        return self.coordinates[:, 3:] - self.coordinates[:, :3]
+
+    def getDiagonals(self) -> np.ndarray:
+        return np.linalg.norm(self.getLengths(), axis=1)
+
+    def overlaps(self, box: BoundingBox, tolerance: float = 0.0) -> np.ndarray:
+        """Returns which of the boxes overlap box."""
+        return np.all(
+            (self.coordinates[:, :3] <= box.coordinates[3:] + tolerance) &
+            (box.coordinates[:3] <= self.coordinates[:, 3:] + tolerance),
+            axis=1
+        )
+
+    def getOverlapMatrix(self, tolerance: float = 0.0) -> np.ndarray:
+        mins = self.coordinates[:, :3]
+        maxs = self.coordinates[:, 3:]
+        return np.all(
+            (mins[:, np.newaxis, :] <= maxs[np.newaxis, :, :] + tolerance) &
+            (mins[np.newaxis, :, :] <= maxs[:, np.newaxis, :] + tolerance),
+            axis=2
+        )
+
+
+class BoundingBoxIndex():
+    """Sweep and prune index over a set of bounding boxes."""
+    boxes: BoundingBoxArray
+    def __init__(self, boxes):
+        if not isinstance(boxes, BoundingBoxArray):
+            boxes = BoundingBoxArray([box.coordinates for box in boxes])
+        self.boxes = boxes
+
+    def getOverlappingPairs(self, tolerance: float = 0.0) -> List[Tuple[int, int]]:
+        if len(self.boxes) == 0:
+            return []
+        order = np.argsort(self.boxes.coordinates[:, 0], kind='stable')
+        sortedBoxes = BoundingBoxArray(self.boxes.coordinates[order])
+        # Boxes starting before the end of each box along X, in sorted order.
+        ends = np.searchsorted(
+            sortedBoxes.coordinates[:, 0],
+            sortedBoxes.coordinates[:, 3] + tolerance,
+            side='right'
+        )
+
+        pairs: List[Tuple[int, int]] = []
+        for idx in range(len(order)):
+            candidates = np.arange(idx + 1, ends[idx])
+            if len(candidates) == 0:
+                continue
+            hits = BoundingBoxArray(sortedBoxes.coordinates[candidates]).overlaps(
+                sortedBoxes[idx], tolerance)
+            for other in order[candidates[hits]]:
+                first, second = int(order[idx]), int(other)
+                pairs.append((min(first, second), max(first, second)))
+        return sorted(pairs)
+
+
+utils.onSynchronize(BoundingBox.clearCache)
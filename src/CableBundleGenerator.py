@@ -0,0 +1,221 @@
+import math
+import os
+from typing import Dict, List, Tuple
+
+
+class CableBundleGenerator():
+    """Cross-sections of bundles of numWires round wires, for scaling tests.
+
+    Wires are packed on a hexagonal lattice around the origin. Every layer
+    is a disk, as in the FreeCAD models of testData:
+
+    - open bundles have the reference wire as Conductor_0, wires
+      Conductor_1 to Conductor_N and an OpenBoundary_0 disk around them.
+    - shielded bundles have wires Conductor_1 to Conductor_N inside a
+      Conductor_0 disk which is the shield.
+    - jacketed bundles add a Dielectric_N disk around every wire, also
+      around the reference wire of open bundles, where it is Dielectric_0.
+
+    Lengths are in the units of the STEP file, millimetres.
+    """
+    VARIANTS = ("open", "shielded", "jacketed")
+
+    def __init__(self, numWires: int, variant: str = "open",
+                 wireRadius: float = 1.0, jacketRadius: float = 1.5,
+                 spacing: float = 0.5, shieldGap: float = 2.0,
+                 openBoundaryFactor: float = 4.0):
+        if variant not in CableBundleGenerator.VARIANTS:
+            raise ValueError("Unknown bundle variant: " + variant)
+        if numWires < 1:
+            raise ValueError("Bundles need at least one wire.")
+        if jacketRadius <= wireRadius:
+            raise ValueError("Jacket radius must be larger than the wire radius.")
+        self.numWires = numWires
+        self.variant = variant
+        self.wireRadius = wireRadius
+        self.jacketRadius = jacketRadius
+        self.spacing = spacing
+        self.shieldGap = shieldGap
+        self.openBoundaryFactor = openBoundaryFactor
+
+    def getCaseName(self) -> str:
+        return "bundle_{}_{}".format(self.variant, self.numWires)
+
+    @staticmethod
+    def hexagonalPositions(count: int, pitch: float) -> List[Tuple[float, float]]:
+        """The count points of a hexagonal lattice closest to the origin."""
+        extent = int(math.ceil(math.sqrt(count))) + 1
+        points = []
+        for j in range(-extent, extent + 1):
+            for i in range(-extent, extent + 1):
+                points.append((pitch * (i + 0.5 * j), pitch * j * math.sqrt(3.0) / 2.0))
+        points.sort(key=lambda p: (round(math.hypot(*p), 9), math.atan2(p[1], p[0])))
+        return points[:count]
+
+    def getDisks(self) -> List[Tuple[str, float, float, float]]:
+        """Layers of the bundle as (name, x, y, radius)."""
+        isOpen = self.variant != "shielded"
+        isJacketed = self.variant == "jacketed"
+        outerRadius = self.jacketRadius if isJacketed else self.wireRadius
+        pitch = 2.0 * outerRadius + self.spacing
+
+        firstWire = 0 if isOpen else 1
+        numbers = range(firstWire, firstWire + self.numWires + (1 if isOpen else 0))
+        positions = CableBundleGenerator.hexagonalPositions(len(numbers), pitch)
+
+        disks = []
+        for num, (x, y) in zip(numbers, positions):
+            disks.append(("Conductor_{}".format(num), x, y, self.wireRadius))
+            if isJacketed:
+                disks.append(("Dielectric_{}".format(num), x, y, self.jacketRadius))
+
+        bundleRadius = max(math.hypot(x, y) for x, y in positions) + outerRadius
+        if isOpen:
+            disks.append(("OpenBoundary_0", 0.0, 0.0, self.openBoundaryFactor * bundleRadius))
+        else:
+            disks.append(("Conductor_0", 0.0, 0.0, bundleRadius + self.shieldGap))
+        return disks
+
+    def buildModel(self) -> Dict[str, Tuple[int, int]]:
+        """Adds the disks to the current gmsh model, named as their layers."""
+        import gmsh
+        from . import utils
+
+        dimTags = dict()
+        for name, x, y, radius in self.getDisks():
+            dimTags[name] = (2, gmsh.model.occ.addDisk(x, y, 0, radius, radius))
+        utils.synchronize()
+        for name, dimTag in dimTags.items():
+            gmsh.model.setEntityName(*dimTag, name)
+        return dimTags
+
+    def exportStep(self, outputFolder: str) -> str:
+        """Writes <outputFolder>/<case>/<case>.step, laid out as the testData cases.
+
+        gmsh 4.11 does not write entity names to STEP files, so the file is
+        written here, with a product per layer as FreeCAD does.
+        """
+        caseName = self.getCaseName()
+        folder = os.path.join(outputFolder, caseName)
+        os.makedirs(folder, exist_ok=True)
+        fileName = os.path.join(folder, caseName + '.step')
+        with open(fileName, 'w') as f:
+            f.write(_StepWriter(caseName).write(self.getDisks()))
+        return fileName
+
+
+def _real(value: float) -> str:
+    text = "{:.15G}".format(float(value))
+    if "." in text:
+        return text
+    if "E" in text:
+        mantissa, exponent = text.split("E")
+        return mantissa + ".E" + exponent
+    return text + "."
+
+
+class _StepWriter():
+    """AP214 file with an assembly holding one planar disk face per product."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.entities: List[str] = []
+
+    def add(self, text: str) -> str:
+        self.entities.append(text)
+        return "#{}".format(len(self.entities))
+
+    def _context(self, application: str) -> str:
+        length = self.add("( LENGTH_UNIT() NAMED_UNIT(*) SI_UNIT(.MILLI.,.METRE.) )")
+        angle = self.add("( NAMED_UNIT(*) PLANE_ANGLE_UNIT() SI_UNIT($,.RADIAN.) )")
+        solid = self.add("( NAMED_UNIT(*) SI_UNIT($,.STERADIAN.) SOLID_ANGLE_UNIT() )")
+        uncertainty = self.add(
+            "UNCERTAINTY_MEASURE_WITH_UNIT(LENGTH_MEASURE(1.E-07),{},"
+            "'distance_accuracy_value','confusion accuracy')".format(length))
+        return self.add(
+            "( GEOMETRIC_REPRESENTATION_CONTEXT(3) "
+            "GLOBAL_UNCERTAINTY_ASSIGNED_CONTEXT(({})) "
+            "GLOBAL_UNIT_ASSIGNED_CONTEXT(({},{},{})) "
+            "REPRESENTATION_CONTEXT('{}','3D Context with UNIT and UNCERTAINTY') )".format(
+                uncertainty, length, angle, solid, application))
+
+    def _product(self, name: str, applicationContext: str) -> Tuple[str, str]:
+        """Returns the product definition and its product."""
+        productContext = self.add("PRODUCT_CONTEXT('',{},'mechanical')".format(applicationContext))
+        product = self.add("PRODUCT('{0}','{0}','',({1}))".format(name, productContext))
+        formation = self.add("PRODUCT_DEFINITION_FORMATION('','',{})".format(product))
+        definitionContext = self.add(
+            "PRODUCT_DEFINITION_CONTEXT('part definition',{},'design')".format(applicationContext))
+        definition = self.add(
+            "PRODUCT_DEFINITION('design','',{},{})".format(formation, definitionContext))
+        self.add("PRODUCT_RELATED_PRODUCT_CATEGORY('part',$,({}))".format(product))
+        return definition, product
+
+    def _placement(self, x: float = 0.0, y: float = 0.0) -> str:
+        point = self.add("CARTESIAN_POINT('',({},{},0.))".format(_real(x), _real(y)))
+        axis = self.add("DIRECTION('',(0.,0.,1.))")
+        reference = self.add("DIRECTION('',(1.,0.,0.))")
+        return self.add("AXIS2_PLACEMENT_3D('',{},{},{})".format(point, axis, reference))
+
+    def _disk(self, x: float, y: float, radius: float) -> str:
+        start = self.add("CARTESIAN_POINT('',({},{},0.))".format(_real(x + radius), _real(y)))
+        vertex = self.add("VERTEX_POINT('',{})".format(start))
+        circle = self.add("CIRCLE('',{},{})".format(self._placement(x, y), _real(radius)))
+        edge = self.add("EDGE_CURVE('',{0},{0},{1},.T.)".format(vertex, circle))
+        orientedEdge = self.add("ORIENTED_EDGE('',*,*,{},.T.)".format(edge))
+        loop = self.add("EDGE_LOOP('',({}))".format(orientedEdge))
+        bound = self.add("FACE_BOUND('',{},.T.)".format(loop))
+        plane = self.add("PLANE('',{})".format(self._placement(x, y)))
+        face = self.add("ADVANCED_FACE('',({}),{},.T.)".format(bound, plane))
+        shell = self.add("OPEN_SHELL('',({}))".format(face))
+        return self.add("SHELL_BASED_SURFACE_MODEL('',({}))".format(shell))
+
+    def write(self, disks: List[Tuple[str, float, float, float]]) -> str:
+        application = self.add(
+            "APPLICATION_CONTEXT('core data for automotive mechanical design processes')")
+        self.add("APPLICATION_PROTOCOL_DEFINITION('international standard',"
+                 "'automotive_design',2000,{})".format(application))
+
+        origin = self._placement()
+        assembly, _ = self._product(self.name, application)
+        assemblyShape = self.add("PRODUCT_DEFINITION_SHAPE('','',{})".format(assembly))
+        assemblyRepresentation = self.add(
+            "SHAPE_REPRESENTATION('',({}),{})".format(origin, self._context("Context #1")))
+        self.add("SHAPE_DEFINITION_REPRESENTATION({},{})".format(
+            assemblyShape, assemblyRepresentation))
+
+        for idx, (name, x, y, radius) in enumerate(disks):
+            definition, _ = self._product(name, application)
+            shape = self.add("PRODUCT_DEFINITION_SHAPE('','',{})".format(definition))
+            placement = self._placement()
+            representation = self.add(
+                "MANIFOLD_SURFACE_SHAPE_REPRESENTATION('',({},{}),{})".format(
+                    placement, self._disk(x, y, radius), self._context("Context #1")))
+            self.add("SHAPE_DEFINITION_REPRESENTATION({},{})".format(shape, representation))
+
+            transformation = self.add(
+                "ITEM_DEFINED_TRANSFORMATION('','',{},{})".format(placement, origin))
+            relationship = self.add(
+                "( REPRESENTATION_RELATIONSHIP('','',{},{}) "
+                "REPRESENTATION_RELATIONSHIP_WITH_TRANSFORMATION({}) "
+                "SHAPE_REPRESENTATION_RELATIONSHIP() )".format(
+                    representation, assemblyRepresentation, transformation))
+            usage = self.add("NEXT_ASSEMBLY_USAGE_OCCURRENCE('{}','{}','',{},{},$)".format(
+                idx + 1, name, assembly, definition))
+            placementShape = self.add(
+                "PRODUCT_DEFINITION_SHAPE('Placement','Placement of an item',{})".format(usage))
+            self.add("CONTEXT_DEPENDENT_SHAPE_REPRESENTATION({},{})".format(
+                relationship, placementShape))
+
+        lines = [
+            "ISO-10303-21;",
+            "HEADER;",
+            "FILE_DESCRIPTION(('step2gmsh cable bundle'),'2;1');",
+            "FILE_NAME('{}','',(''),(''),'','step2gmsh','Unknown');".format(self.name),
+            "FILE_SCHEMA(('AUTOMOTIVE_DESIGN { 1 0 10303 214 1 1 1 1 }'));",
+            "ENDSEC;",
+            "DATA;",
+        ]
+        lines += ["#{} = {};".format(idx + 1, text) for idx, text in enumerate(self.entities)]
+        lines += ["ENDSEC;", "END-ISO-10303-21;", ""]
+        return "\n".join(lines)
@@ -0,0 +1,146 @@
+import math
+from typing import Dict, List, Optional
+
+import gmsh
+import numpy as np
+
+from . import utils
+
+
+class ElementBudget():
+    """Scales the mesh size until the mesh fits a number of elements or DOFs.
+
+    The search runs on first order meshes of the geometry already in the
+    model, changing only Mesh.MeshSizeFactor. The number of elements of a
+    2D mesh grows as the inverse square of the size factor, so each step
+    guesses the factor hitting the budget from the last mesh, kept within
+    the bracket of factors known to be too fine and fitting. The first
+    mesh using at least minFill of the budget without exceeding it is
+    kept. When the search runs out of iterations, the finest fitting
+    mesh found is generated again. Only the kept mesh is elevated to
+    Mesh.ElementOrder and optimized.
+
+    DOFs are estimated as the nodes of a Lagrange mesh of that order:
+    vertices, plus order - 1 nodes per edge and (order - 1)(order - 2) / 2
+    per triangle, or (order - 1)^2 per quadrangle.
+    """
+    DEFAULT_MIN_FILL = 0.9
+    DEFAULT_MAX_ITERATIONS = 12
+
+    maxElements: Optional[int]
+    maxDofs: Optional[int]
+    iterations: List[Dict]
+
+    def __init__(self, maxElements: Optional[int] = None, maxDofs: Optional[int] = None,
+                 minFill: float = DEFAULT_MIN_FILL,
+                 maxIterations: int = DEFAULT_MAX_ITERATIONS):
+        if maxElements is None and maxDofs is None:
+            raise ValueError("An element budget needs maxElements or maxDofs.")
+        for value in (maxElements, maxDofs):
+            if value is not None and value <= 0:
+                raise ValueError("Element budgets must be positive.")
+        if not 0.0 < minFill <= 1.0:
+            raise ValueError("minFill must be in (0, 1].")
+        self.maxElements = maxElements
+        self.maxDofs = maxDofs
+        self.minFill = minFill
+        self.maxIterations = maxIterations
+        self.iterations = []
+
+    @staticmethod
+    def countMesh(order: int) -> Dict[str, int]:
+        """2D elements and estimated DOFs of the current first order mesh."""
+        vertices = []
+        elements = 0
+        triangles = 0
+        quadrangles = 0
+        edges = []
+        elementTypes, _, elementNodes = gmsh.model.mesh.getElements(2)
+        for elementType, nodes in zip(elementTypes, elementNodes):
+            _, _, _, numNodes, _, numVertices = gmsh.model.mesh.getElementProperties(elementType)
+            corners = nodes.reshape(-1, numNodes)[:, :numVertices]
+            elements += len(corners)
+            if numVertices == 3:
+                triangles += len(corners)
+            else:
+                quadrangles += len(corners)
+            vertices.append(corners.ravel())
+            edges.append(np.stack([corners, np.roll(corners, -1, axis=1)], axis=2).reshape(-1, 2))
+
+        if elements == 0:
+            return {"elements": 0, "dofs": 0}
+        numVertices = len(np.unique(np.concatenate(vertices)))
+        numEdges = len(np.unique(np.sort(np.concatenate(edges), axis=1), axis=0))
+        dofs = numVertices + (order - 1) * numEdges \
+            + (order - 1) * (order - 2) // 2 * triangles + (order - 1) ** 2 * quadrangles
+        return {"elements": elements, "dofs": dofs}
+
+    def _usage(self, counts: Dict[str, int]) -> float:
+        """Largest fraction of the budget used, above 1 when it does not fit."""
+        usages = []
+        if self.maxElements is not None:
+            usages.append(counts["elements"] / self.maxElements)
+        if self.maxDofs is not None:
+            usages.append(counts["dofs"] / self.maxDofs)
+        return max(usages)
+
+    def _mesh(self, factor: float, order: int) -> float:
+        gmsh.option.setNumber("Mesh.MeshSizeFactor", factor)
+        gmsh.model.mesh.clear()
+        gmsh.model.mesh.generate(2)
+        counts = ElementBudget.countMesh(order)
+        usage = self._usage(counts)
+        self.iterations.append(dict(factor=factor, usage=usage, **counts))
+        return usage
+
+    def generate(self) -> Dict:
+        """Meshes the current model within the budget. Returns the search statistics."""
+        order = int(gmsh.option.getNumber("Mesh.ElementOrder"))
+        factor = gmsh.option.getNumber("Mesh.MeshSizeFactor")
+        tooFine = 0.0
+        fitting = math.inf
+        target = 0.5 * (1.0 + self.minFill)
+        self.iterations = []
+
+        gmsh.option.setNumber("Mesh.ElementOrder", 1)
+        try:
+            for _ in range(self.maxIterations):
+                usage = self._mesh(factor, order)
+                if usage <= 1.0:
+                    fitting = min(fitting, factor)
+                    if usage >= self.minFill:
+                        break
+                else:
+                    tooFine = max(tooFine, factor)
+
+                guess = factor * math.sqrt(usage / target) if usage > 0 else 0.5 * factor
+                if not tooFine < guess < fitting:
+                    if tooFine > 0 and fitting < math.inf:
+                        guess = math.sqrt(tooFine * fitting)
+                    elif fitting < math.inf:
+                        guess = 0.5 * fitting
+                    else:
+                        guess = 2.0 * tooFine
+                factor = guess
+            else:
+                if fitting == math.inf:
+                    raise RuntimeError(
+                        "No mesh within the budget after {} iterations.".format(self.maxIterations))
+                if self.iterations[-1]["factor"] != fitting:
+                    self._mesh(fitting, order)
+        finally:
+            gmsh.option.setNumber("Mesh.ElementOrder", order)
+
+        if order > 1:
+            gmsh.model.mesh.setOrder(order)
+            utils.optimizeHighOrder()
+
+        kept = self.iterations[-1]
+        return {
+            "maxElements": self.maxElements,
+            "maxDofs": self.maxDofs,
+            "meshSizeFactor": kept["factor"],
+            "elements": kept["elements"],
+            "dofs": kept["dofs"],
+            "iterations": self.iterations,
+        }
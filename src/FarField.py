@@ -0,0 +1,218 @@
+from typing import Dict, List, Optional, Tuple
+
+import gmsh
+import numpy as np
+
+from . import constants
+from .BoundingBox import BoundingBox
+from .TopologyMap import TopologyMap
+
+DimTag = Tuple[int, int]
+
+
+class FarField():
+    """Outer region of the default vacuum domain of open problems.
+
+    The near region box around the shapes is surrounded by a disk of radius
+    radiusFactor times the diagonal of the shapes. The kinds differ in how
+    the disk truncates the exterior and which boundaries the solver gets:
+
+    - disk: the truncation is far enough for a Dirichlet or Neumann
+      condition on its OpenBoundary_0 curve.
+    - annulus: a closer truncation, tagged RobinBoundary_0, where the
+      solver applies an asymptotic, Robin, condition for a circle of the
+      center and radius given in getStatistics.
+    - kelvin: the exterior of the disk is mapped by the Kelvin transform,
+      r -> R^2 / r, to a disk of the same radius, KelvinVacuum_0, meshed
+      next to the domain. The Laplace equation keeps its form in the image
+      and infinity is its center. The disk and image boundaries,
+      KelvinInterface_0 and KelvinInterface_1, have periodic meshes so the
+      solver can identify their nodes.
+
+    For annulus and kelvin, the mesh size grows from the near region box to
+    the circle as a geometric progression of ratio growthRate. The sizes are
+    set on the points and extended from the boundaries by gmsh; runs with a
+    background field must add the same grading with addGradingFields.
+    """
+    KINDS = constants.FAR_FIELD_KINDS
+    DEFAULT_RADIUS_FACTORS = {"disk": 4.0, "annulus": 1.0, "kelvin": 1.0}
+    DEFAULT_GROWTH_RATE = 1.2
+    # Distance between the centers of the disk and its image, in radii.
+    IMAGE_OFFSET_FACTOR = 2.5
+
+    kind: str
+    radiusFactor: float
+    growthRate: float
+    groups: Dict[str, Tuple[int, Dict[int, List[DimTag]]]]
+
+    def __init__(self, kind: str = "disk", radiusFactor: Optional[float] = None,
+                 growthRate: float = DEFAULT_GROWTH_RATE):
+        if kind not in FarField.KINDS:
+            raise ValueError("Unknown far field kind: " + kind)
+        if radiusFactor is None:
+            radiusFactor = FarField.DEFAULT_RADIUS_FACTORS[kind]
+        if radiusFactor <= 0:
+            raise ValueError("The far field radius factor must be positive.")
+        if growthRate < 1.0:
+            raise ValueError("The far field growth rate must be at least 1.")
+        self.kind = kind
+        self.radiusFactor = radiusFactor
+        self.growthRate = growthRate
+        self.groups = dict()
+        self.center = None
+        self.radius = None
+        self.imageCenter = None
+        self._nearBoxSize = None
+        self._image = []
+
+    def getOpenBoundaryLabel(self) -> str:
+        return "RobinBoundary_" if self.kind == "annulus" else "OpenBoundary_"
+
+    def addDisk(self, boundingBox: BoundingBox, nearBoxSize: float,
+                radiusFactor: Optional[float] = None) -> List[DimTag]:
+        """Adds the disk around the near region box, and the Kelvin image."""
+        if radiusFactor is None:
+            radiusFactor = self.radiusFactor
+        self.center = boundingBox.getCenter()
+        self.radius = radiusFactor * boundingBox.getDiagonal()
+        self._nearBoxSize = nearBoxSize
+        if self.radius <= nearBoxSize / np.sqrt(2.0):
+            raise ValueError("The far field disk must enclose the near region box.")
+
+        disk = [(2, gmsh.model.occ.addDisk(*self.center, self.radius, self.radius))]
+        if self.kind == "kelvin":
+            self.imageCenter = tuple(
+                np.add(self.center, (FarField.IMAGE_OFFSET_FACTOR * self.radius, 0.0, 0.0)))
+            self._image = [(2, gmsh.model.occ.addDisk(*self.imageCenter, self.radius, self.radius))]
+        return disk
+
+    def _isOnCircle(self, curve: DimTag) -> bool:
+        coordinates = BoundingBox.getEntityCoordinates(curve)
+        extent = np.max(np.abs(np.subtract(coordinates, np.tile(self.center, 2))[[0, 1, 3, 4]]))
+        return extent > 0.5 * self._nearBoxSize * (1.0 + 1e-6)
+
+    def buildBoundaries(self, farVacuum: List[DimTag], nearSize: float) -> Dict[int, List[DimTag]]:
+        """Tags the far region once the near region box is cut from it.
+
+        Returns the open boundary of the domain. nearSize is the mesh size
+        on the near region box.
+        """
+        self.groups = dict()
+        # The boundary of the far region also has the near region box.
+        circle = [
+            (1, abs(tag)) for _, tag in gmsh.model.getBoundary(farVacuum, combined=False)
+            if self._isOnCircle((1, abs(tag)))]
+        if self.kind == "disk":
+            return dict([[0, circle]])
+
+        # Sizes of a geometric progression from nearSize covering the annulus.
+        circleSize = nearSize + (self.growthRate - 1.0) * (self.radius - 0.5 * self._nearBoxSize)
+        gmsh.model.mesh.setSize(
+            gmsh.model.getBoundary(circle, combined=False, recursive=True), circleSize)
+
+        if self.kind == "annulus":
+            return dict([[0, circle]])
+
+        imageCircle = [(1, abs(tag)) for _, tag in gmsh.model.getBoundary(self._image, combined=False)]
+        gmsh.model.mesh.setSize(
+            gmsh.model.getBoundary(imageCircle, combined=False, recursive=True), circleSize)
+        self.groups["KelvinVacuum_"] = (2, dict([[0, self._image]]))
+        self.groups["KelvinInterface_"] = (1, dict([[0, circle], [1, imageCircle]]))
+        return dict()
+
+    @staticmethod
+    def applyPeriodicity():
+        """Makes the mesh of the Kelvin image circle a translation of the disk circle.
+
+        Physical groups are used to find the circles, so it also applies to
+        geometries loaded from the cache.
+        """
+        topology = TopologyMap.current()
+        master = topology.getPhysicalGroupWithName("KelvinInterface_0")
+        slave = topology.getPhysicalGroupWithName("KelvinInterface_1")
+        if master is None or slave is None:
+            return
+        masterCurves = topology.getEntities(master)
+        slaveCurves = topology.getEntities(slave)
+        translation = np.subtract(
+            BoundingBox.getBoundingBoxFromGroup(slaveCurves).getCenter(),
+            BoundingBox.getBoundingBoxFromGroup(masterCurves).getCenter())
+
+        def centerOf(curve, shift=(0.0, 0.0, 0.0)):
+            return tuple(np.round(np.add(BoundingBox.fromEntity(curve).getCenter(), shift), 9))
+
+        masterCurves = sorted(masterCurves, key=lambda curve: centerOf(curve, translation))
+        slaveCurves = sorted(slaveCurves, key=centerOf)
+        affine = [1, 0, 0, translation[0],
+                  0, 1, 0, translation[1],
+                  0, 0, 1, translation[2],
+                  0, 0, 0, 1]
+        gmsh.model.mesh.setPeriodic(
+            1, [tag for _, tag in slaveCurves], [tag for _, tag in masterCurves], affine)
+
+    def addGradingFields(self) -> List[int]:
+        """Adds the size grading of the far region as mesh size fields.
+
+        Size fields disable the extension of the point sizes into the
+        surfaces, so a Threshold on the distance to the near region box,
+        restricted to the far region, grows the size from the box to the
+        circle and keeps the Kelvin image at the circle size. Physical groups
+        and point sizes are used, so it also applies to geometries loaded
+        from the cache. Returns the fields added, the last one to be included
+        in the background field, or none for disks.
+        """
+        if self.kind == "disk":
+            return []
+        topology = TopologyMap.current()
+        circleGroup = topology.getPhysicalGroupWithName(
+            "RobinBoundary_0" if self.kind == "annulus" else "KelvinInterface_0")
+        nearVacuum = topology.getPhysicalGroupWithName("Vacuum_0")
+        farVacuum = topology.getPhysicalGroupWithName("Vacuum_1")
+        if circleGroup is None or nearVacuum is None or farVacuum is None:
+            return []
+
+        def boundaryCurves(surfaces):
+            return set(abs(tag) for _, tag in gmsh.model.getBoundary(surfaces, combined=False))
+
+        def pointSizes(curves):
+            points = gmsh.model.getBoundary(
+                [(1, tag) for tag in curves], combined=False, recursive=True)
+            return [size for size in gmsh.model.mesh.getSizes(points) if size > 0]
+
+        farSurfaces = topology.getEntities(farVacuum)
+        nearBox = sorted(boundaryCurves(farSurfaces) & boundaryCurves(topology.getEntities(nearVacuum)))
+        nearSizes = pointSizes(nearBox)
+        circleSizes = pointSizes([tag for _, tag in topology.getEntities(circleGroup)])
+        if len(nearSizes) == 0 or len(circleSizes) == 0:
+            return []
+        nearSize = min(nearSizes)
+        circleSize = max(circleSizes)
+        # Inverse of the circle size of buildBoundaries, the distance from the box to the circle.
+        distMax = (circleSize - nearSize) / (self.growthRate - 1.0) if self.growthRate > 1.0 else 1.0
+
+        distance = gmsh.model.mesh.field.add("Distance")
+        gmsh.model.mesh.field.setNumbers(distance, "CurvesList", nearBox)
+        threshold = gmsh.model.mesh.field.add("Threshold")
+        gmsh.model.mesh.field.setNumber(threshold, "InField", distance)
+        gmsh.model.mesh.field.setNumber(threshold, "SizeMin", nearSize)
+        gmsh.model.mesh.field.setNumber(threshold, "SizeMax", circleSize)
+        gmsh.model.mesh.field.setNumber(threshold, "DistMin", 0.0)
+        gmsh.model.mesh.field.setNumber(threshold, "DistMax", distMax)
+        # The Kelvin image is beyond distMax, so it gets the circle size.
+        image = topology.getPhysicalGroupWithName("KelvinVacuum_0")
+        if image is not None:
+            farSurfaces = farSurfaces + topology.getEntities(image)
+        restrict = gmsh.model.mesh.field.add("Restrict")
+        gmsh.model.mesh.field.setNumber(restrict, "InField", threshold)
+        gmsh.model.mesh.field.setNumbers(restrict, "SurfacesList", [tag for _, tag in farSurfaces])
+        gmsh.model.mesh.field.setNumbers(restrict, "CurvesList", sorted(boundaryCurves(farSurfaces)))
+        return [distance, threshold, restrict]
+
+    def getStatistics(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "center": list(self.center) if self.center is not None else None,
+            "radius": self.radius,
+            "growthRate": self.growthRate,
+            "imageCenter": list(self.imageCenter) if self.imageCenter is not None else None,
+        }
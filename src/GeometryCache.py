@@ -0,0 +1,245 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .MeshCache import MeshCache
+
+
+class GeometryCache():
+    """On-disk cache of the geometry stage of the mesher.
+
+    Stores the OCC model left after the boolean operations as a BREP file
+    together with a JSON sidecar describing the physical groups and the mesh
+    size constraints. BREP files do not keep entity tags, so entities are
+    matched back to their physical groups by center of mass and mass. An
+    entry whose entities can not be matched one to one within
+    MATCH_TOLERANCE is removed and load misses.
+
+    Entries are evicted in least recently used order once the total size
+    of the cache exceeds maxSize bytes.
+
+    gmsh is imported only when the cache is used, so that processes which
+    just pass the cache along do not pay for it.
+    """
+    DEFAULT_MAX_SIZE = 1024**3
+    # Relative distance between the signatures of a cached entity and its match.
+    MATCH_TOLERANCE = 1e-6
+
+    def __init__(self, folder: Optional[str] = None, maxSize: int = DEFAULT_MAX_SIZE):
+        if folder is None:
+            folder = os.path.join(MeshCache.defaultFolder(), MeshCache.GEOMETRY_FOLDER)
+        self.folder = folder
+        self.maxSize = maxSize
+        os.makedirs(self.folder, exist_ok=True)
+
+    @staticmethod
+    def computeKey(inputFile: str, geometryOptions: Optional[Dict] = None) -> str:
+        if geometryOptions is None:
+            geometryOptions = {}
+        return MeshCache.computeKey(inputFile, geometryOptions)
+
+    def _brepFile(self, key: str) -> str:
+        return os.path.join(self.folder, key + '.brep')
+
+    def _layoutFile(self, key: str) -> str:
+        return os.path.join(self.folder, key + '.json')
+
+    def contains(self, key: str) -> bool:
+        return os.path.isfile(self._brepFile(key)) and os.path.isfile(self._layoutFile(key))
+
+    @staticmethod
+    def getEntitySignature(dim: int, tag: int) -> Dict:
+        """Center of mass and mass of an entity, which survive a BREP round trip."""
+        import gmsh
+
+        if dim == 0:
+            return {"centerOfMass": list(gmsh.model.getValue(0, tag, [])), "mass": 0.0}
+        return {
+            "centerOfMass": list(gmsh.model.occ.getCenterOfMass(dim, tag)),
+            "mass": gmsh.model.occ.getMass(dim, tag),
+        }
+
+    def store(self, key: str):
+        """Saves the current model, which must already have its physical groups."""
+        import gmsh
+
+        physicalGroups = []
+        for dim, pgTag in gmsh.model.getPhysicalGroups():
+            physicalGroups.append({
+                "dim": dim,
+                "tag": pgTag,
+                "name": gmsh.model.getPhysicalName(dim, pgTag),
+                "entities": [
+                    GeometryCache.getEntitySignature(dim, tag)
+                    for tag in gmsh.model.getEntitiesForPhysicalGroup(dim, pgTag)
+                ],
+            })
+
+        points = gmsh.model.getEntities(0)
+        meshSizes = []
+        if len(points) != 0:
+            for point, size in zip(points, gmsh.model.mesh.getSizes(points)):
+                if size > 0:
+                    meshSizes.append({
+                        "coordinates": GeometryCache.getEntitySignature(*point)["centerOfMass"],
+                        "size": size,
+                    })
+
+        # The folder may have been removed since the cache was created.
+        os.makedirs(self.folder, exist_ok=True)
+        gmsh.write(self._brepFile(key))
+        with open(self._layoutFile(key), 'w') as f:
+            json.dump(
+                {"physicalGroups": physicalGroups, "meshSizes": meshSizes}, f, indent=3)
+        self.evict()
+
+    def load(self, key: str) -> bool:
+        """Imports a cached geometry into the current model. Returns False on a miss."""
+        import gmsh
+        import numpy as np
+        from . import utils
+        from .TopologyMap import TopologyMap
+
+        if not self.contains(key):
+            return False
+
+        try:
+            with open(self._layoutFile(key), 'r') as f:
+                layout = json.load(f)
+            os.utime(self._brepFile(key))
+        except FileNotFoundError:
+            # Entry evicted by another process while being loaded.
+            return False
+
+        gmsh.model.occ.importShapes(self._brepFile(key), highestDimOnly=False)
+        utils.synchronize()
+
+        candidates = {
+            dim: GeometryCache.getCandidatesOfDimension(dim) for dim in range(3)
+        }
+        try:
+            groupTags = []
+            for dim in range(3):
+                groups = [pG for pG in layout["physicalGroups"] if pG["dim"] == dim]
+                tags = GeometryCache.findEntities(
+                    candidates[dim], [ent for pG in groups for ent in pG["entities"]])
+                for pG in groups:
+                    groupTags.append((pG, tags[:len(pG["entities"])]))
+                    tags = tags[len(pG["entities"]):]
+            pointTags = GeometryCache.findEntities(candidates[0], [
+                {"centerOfMass": meshSize["coordinates"], "mass": 0.0} for meshSize in layout["meshSizes"]])
+        except ValueError:
+            # The BREP does not round trip into the same entities, e.g. after
+            # an OCC upgrade, so the entry is rebuilt instead of trusted.
+            gmsh.model.occ.remove(gmsh.model.occ.getEntities(), recursive=True)
+            utils.synchronize()
+            self._remove(key)
+            return False
+
+        for pG, tags in groupTags:
+            gmsh.model.addPhysicalGroup(pG["dim"], tags, tag=pG["tag"], name=pG["name"])
+        TopologyMap.invalidate()
+
+        for meshSize, tag in zip(layout["meshSizes"], pointTags):
+            gmsh.model.mesh.setSize([(0, tag)], meshSize["size"])
+
+        return True
+
+    @staticmethod
+    def getCandidatesOfDimension(dim: int) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """Tags, centers of mass and masses of the entities of a dimension, for findEntity."""
+        import gmsh
+        import numpy as np
+
+        tags = np.array([tag for _, tag in gmsh.model.getEntities(dim)], dtype=int)
+        centers = np.zeros((len(tags), 3))
+        masses = np.zeros(len(tags))
+        for idx, tag in enumerate(tags):
+            signature = GeometryCache.getEntitySignature(dim, int(tag))
+            centers[idx] = signature["centerOfMass"]
+            masses[idx] = signature["mass"]
+        return tags, centers, masses
+
+    @staticmethod
+    def findEntity(candidates: Tuple['np.ndarray', 'np.ndarray', 'np.ndarray'], signature: Dict,
+                   tolerance: float = MATCH_TOLERANCE) -> int:
+        """Tag of the candidate closest to an entity signature.
+
+        Raises ValueError when no candidate is within tolerance, relative
+        to the size of the model and to the mass of the entity.
+        """
+        import numpy as np
+
+        tags, centers, masses = candidates
+        if len(tags) == 0:
+            raise ValueError("Cached geometry does not contain the expected entities.")
+        scale = max(np.max(np.abs(centers)), 1.0)
+        mass = signature["mass"]
+        score = np.linalg.norm(centers - signature["centerOfMass"], axis=1) / scale \
+            + np.abs(masses - mass) / max(abs(mass), 1e-12)
+        best = int(np.argmin(score))
+        if score[best] > tolerance:
+            raise ValueError("Cached geometry has no entity matching {}.".format(signature))
+        return int(tags[best])
+
+    @staticmethod
+    def findEntities(candidates: Tuple['np.ndarray', 'np.ndarray', 'np.ndarray'], signatures: List[Dict],
+                     tolerance: float = MATCH_TOLERANCE) -> List[int]:
+        """Tags of the candidates matching each signature with findEntity.
+
+        Raises ValueError when two different signatures match the same entity.
+        """
+        tags = [GeometryCache.findEntity(candidates, signature, tolerance) for signature in signatures]
+        signatureOfTag = dict()
+        for tag, signature in zip(tags, signatures):
+            key = (tuple(signature["centerOfMass"]), signature["mass"])
+            if signatureOfTag.setdefault(tag, key) != key:
+                raise ValueError("Cached geometry matches several entities to {}.".format(tag))
+        return tags
+
+    def _entries(self) -> List[Dict]:
+        if not os.path.isdir(self.folder):
+            return []
+        entries = []
+        for fileName in os.listdir(self.folder):
+            if not fileName.endswith('.brep'):
+                continue
+            key = fileName[:-len('.brep')]
+            try:
+                size = os.path.getsize(self._brepFile(key))
+                lastUse = os.path.getmtime(self._brepFile(key))
+                if os.path.isfile(self._layoutFile(key)):
+                    size += os.path.getsize(self._layoutFile(key))
+            except FileNotFoundError:
+                continue
+            entries.append({"key": key, "size": size, "lastUse": lastUse})
+        return entries
+
+    def _remove(self, key: str):
+        for fileName in (self._brepFile(key), self._layoutFile(key)):
+            try:
+                os.remove(fileName)
+            except FileNotFoundError:
+                pass
+
+    def size(self) -> int:
+        return sum(e["size"] for e in self._entries())
+
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda e: e["lastUse"])
+        total = sum(e["size"] for e in entries)
+        for entry in entries:
+            if total <= self.maxSize:
+                break
+            self._remove(entry["key"])
+            total -= entry["size"]
+
+    def clear(self):
+        if not os.path.isdir(self.folder):
+            return
+        for fileName in os.listdir(self.folder):
+            if fileName.endswith(('.brep', '.json')):
+                try:
+                    os.remove(os.path.join(self.folder, fileName))
+                except FileNotFoundError:
+                    pass
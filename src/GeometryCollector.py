@@ -0,0 +1,86 @@
+from typing import Dict, List, Set, Tuple
+
+import gmsh
+
+from . import utils
+from .Profiler import getCurrentRss
+from .TopologyMap import TopologyMap
+
+DimTag = Tuple[int, int]
+
+
+class GeometryCollector():
+    """Removes from the OCC model the entities no physical group needs.
+
+    Booleans run with removeObject or removeTool set to False, and probes
+    such as the intersections of ShapesClassification.isOpenProblem, leave
+    entities in the OCC model. Removing them from the gmsh model is not
+    enough, as they stay in OpenCASCADE and slow down every later
+    synchronize. Each geometry step is recorded with the entities it
+    created, and collect() removes every entity which is neither in a
+    physical group nor on the boundary of one.
+    """
+    steps: List[Dict]
+
+    def __init__(self):
+        self.steps = []
+        self._known = GeometryCollector._occEntities()
+
+    @staticmethod
+    def _occEntities() -> Set[DimTag]:
+        return set((dim, tag) for dim, tag in gmsh.model.occ.getEntities())
+
+    @staticmethod
+    def _countByDimension(entities: Set[DimTag]) -> Dict[int, int]:
+        return dict([[dim, sum(1 for d, _ in entities if d == dim)] for dim in range(4)])
+
+    def record(self, stepName: str):
+        """Records the entities created since the previous step."""
+        entities = GeometryCollector._occEntities()
+        created = entities - self._known
+        self.steps.append({
+            "name": stepName,
+            "created": GeometryCollector._countByDimension(created),
+            "alive": len(entities),
+        })
+        self._known = entities
+
+    @staticmethod
+    def getReachableEntities() -> Set[DimTag]:
+        """Entities in physical groups and, recursively, their boundaries."""
+        topology = TopologyMap.current()
+        reachable = set()
+        current = set()
+        for entities in topology.entitiesOfPhysicalGroup.values():
+            current.update(entities)
+        while current:
+            reachable.update(current)
+            higher = [dimTag for dimTag in current if dimTag[0] > 0]
+            if len(higher) == 0:
+                break
+            boundary = gmsh.model.getBoundary(higher, combined=False, oriented=False)
+            current = set((dim, abs(tag)) for dim, tag in boundary) - reachable
+        return reachable
+
+    def collect(self) -> Dict:
+        """Removes the unreachable OCC entities and returns counts and memory before and after."""
+        before = GeometryCollector._occEntities()
+        rssBefore = getCurrentRss()
+
+        orphans = before - GeometryCollector.getReachableEntities()
+        # Higher dimensions first, so that no entity is removed while still
+        # on the boundary of another.
+        for dim in (3, 2, 1, 0):
+            dimTags = sorted(dimTag for dimTag in orphans if dimTag[0] == dim)
+            if len(dimTags) != 0:
+                gmsh.model.occ.remove(dimTags, recursive=False)
+        utils.synchronize()
+
+        after = GeometryCollector._occEntities()
+        self._known = after
+        return {
+            "steps": self.steps,
+            "before": {"entities": GeometryCollector._countByDimension(before), "rss": rssBefore},
+            "after": {"entities": GeometryCollector._countByDimension(after), "rss": getCurrentRss()},
+            "removed": GeometryCollector._countByDimension(before - after),
+        }
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import gmsh
+import numpy as np
+
+from . import utils
+from .BoundingBox import BoundingBox
+
+
+class IncrementalMesher():
+    """Reuses the mesh of a previous run on the parts of the model that did not change.
+
+    After meshing, the first order mesh of every curve and surface is stored
+    next to the outputs together with a signature of the entity, its bounding
+    box, mass and center of mass. On the next run the booleans are redone, as
+    OpenCASCADE offers no way of redoing them locally, but curves and surfaces
+    whose signature matches a stored one get their stored mesh back instead
+    of being meshed. Only the remaining surfaces are meshed, against the
+    reused boundary discretizations. High order nodes are placed at the end
+    on the whole mesh.
+
+    Labelled shapes of the step file are compared with the previous run
+    through names, bounding boxes and geometric hashes, and together with the
+    reuse statistics are reported in statistics.
+    """
+    TOLERANCE = 1e-6
+
+    statistics: Dict
+    labels: Dict[str, Dict]
+
+    def __init__(self, stateName: str):
+        self.stateName = stateName
+        self.labels = dict()
+        self.statistics = dict()
+
+    def _stateFile(self) -> str:
+        return self.stateName + ".incremental.json"
+
+    def _meshFile(self) -> str:
+        return self.stateName + ".incremental.npz"
+
+    def hasState(self) -> bool:
+        return os.path.isfile(self._stateFile()) and os.path.isfile(self._meshFile())
+
+    @staticmethod
+    def _entitySignature(dim: int, tag: int) -> np.ndarray:
+        """Bounding box, mass and center of mass."""
+        boundingBox = BoundingBox.getEntityCoordinates((dim, tag))
+        if dim == 0:
+            return np.concatenate((boundingBox, [0.0], gmsh.model.getValue(0, tag, [])))
+        return np.concatenate((
+            boundingBox,
+            [gmsh.model.occ.getMass(dim, tag)],
+            gmsh.model.occ.getCenterOfMass(dim, tag)
+        ))
+
+    @staticmethod
+    def _geometricHash(signatures: List[np.ndarray], scale: float) -> str:
+        resolution = scale * IncrementalMesher.TOLERANCE
+        rounded = sorted(tuple(np.round(np.asarray(s) / resolution).astype(int).tolist()) for s in signatures)
+        return hashlib.sha256(json.dumps(rounded).encode()).hexdigest()
+
+    def recordLabels(self, shapes: List[Tuple[int, int]]):
+        """Signatures of the imported labelled surfaces, before any boolean operation."""
+        signatures: Dict[str, List[np.ndarray]] = dict()
+        for dim, tag in shapes:
+            if dim != 2:
+                continue
+            name = gmsh.model.getEntityName(dim, tag)
+            if name == "":
+                continue
+            signatures.setdefault(name, []).append(IncrementalMesher._entitySignature(dim, tag))
+        if len(signatures) == 0:
+            return
+
+        boxes = np.array([s[:6] for group in signatures.values() for s in group])
+        scale = max(float(np.max(np.abs(boxes))), 1.0)
+        self.labels = dict()
+        for name, group in signatures.items():
+            self.labels[name] = {
+                "boundingBox": np.concatenate((
+                    np.min([s[:3] for s in group], axis=0),
+                    np.max([s[3:6] for s in group], axis=0))).tolist(),
+                "hash": IncrementalMesher._geometricHash(group, scale),
+            }
+
+    @staticmethod
+    def compareLabels(previous: Dict[str, Dict], current: Dict[str, Dict]) -> Dict[str, List[str]]:
+        comparison = {"unchanged": [], "changed": [], "added": [], "removed": []}
+        for name, label in current.items():
+            if name not in previous:
+                comparison["added"].append(name)
+            elif previous[name]["hash"] == label["hash"]:
+                comparison["unchanged"].append(name)
+            else:
+                comparison["changed"].append(name)
+        comparison["removed"] = [name for name in previous if name not in current]
+        for names in comparison.values():
+            names.sort()
+        return comparison
+
+    @staticmethod
+    def _optionsKey(meshingOptions: Dict) -> str:
+        return hashlib.sha256(json.dumps(meshingOptions, sort_keys=True).encode()).hexdigest()
+
+    def _loadState(self, meshingOptions: Dict) -> Optional[Tuple[Dict, Dict[str, np.ndarray]]]:
+        if not self.hasState():
+            return None
+        with open(self._stateFile(), 'r') as f:
+            state = json.load(f)
+        if state["optionsKey"] != IncrementalMesher._optionsKey(meshingOptions):
+            return None
+        with np.load(self._meshFile()) as arrays:
+            return state, dict(arrays)
+
+    @staticmethod
+    def _match(current: np.ndarray, stored: np.ndarray) -> np.ndarray:
+        """Index of the stored signature equal to each current one, -1 if none."""
+        matches = np.full(len(current), -1, dtype=int)
+        if len(current) == 0 or len(stored) == 0:
+            return matches
+        scale = max(float(np.max(np.abs(stored[:, :6]))), 1.0)
+        positions = np.r_[0:6, 7:10]
+        distances = np.max(np.abs(
+            current[:, np.newaxis, positions] - stored[np.newaxis, :, positions]), axis=2) / scale
+        masses = np.abs(current[:, np.newaxis, 6] - stored[np.newaxis, :, 6]) \
+            / np.maximum(np.abs(stored[np.newaxis, :, 6]), 1e-12)
+        score = np.maximum(distances, masses)
+        best = np.argmin(score, axis=1)
+        isMatch = score[np.arange(len(current)), best] < IncrementalMesher.TOLERANCE
+        matches[isMatch] = best[isMatch]
+        return matches
+
+    @staticmethod
+    def _signaturesOfDimension(dim: int) -> Tuple[List[int], np.ndarray]:
+        tags = [tag for _, tag in gmsh.model.getEntities(dim)]
+        signatures = np.array(
+            [IncrementalMesher._entitySignature(dim, tag) for tag in tags]).reshape(-1, 10)
+        return tags, signatures
+
+    @staticmethod
+    def _boundaryNodes(dim: int, tag: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Tags and coordinates of the mesh nodes on the boundary of an entity."""
+        nodeTags = []
+        coords = []
+        for bdim, btag in gmsh.model.getBoundary([(dim, tag)], combined=False, oriented=False, recursive=False):
+            tags, xyz, _ = gmsh.model.mesh.getNodes(bdim, abs(btag), includeBoundary=True)
+            nodeTags.append(tags)
+            coords.append(xyz.reshape(-1, 3))
+        if len(nodeTags) == 0:
+            return np.zeros(0, dtype=np.uint64), np.zeros((0, 3))
+        return np.concatenate(nodeTags), np.concatenate(coords)
+
+    def _inject(self, dim: int, tag: int, arrays: Dict[str, np.ndarray], key: str) -> bool:
+        """Replaces the mesh of an entity with a stored one. Returns False if it does not fit."""
+        coords = arrays[key + "_coords"]
+        parametricCoords = arrays[key + "_parametricCoords"]
+        isInterior = arrays[key + "_isInterior"]
+        elements = arrays[key + "_elements"]
+
+        boundaryTags, boundaryCoords = IncrementalMesher._boundaryNodes(dim, tag)
+        localTags = np.zeros(len(coords), dtype=np.int64)
+        onBoundary = np.flatnonzero(~isInterior)
+        if len(onBoundary) > 0:
+            if len(boundaryTags) == 0:
+                return False
+            scale = max(float(np.max(np.abs(boundaryCoords))), 1.0)
+            distances = np.linalg.norm(
+                coords[onBoundary, np.newaxis, :] - boundaryCoords[np.newaxis, :, :], axis=2)
+            nearest = np.argmin(distances, axis=1)
+            if np.max(distances[np.arange(len(onBoundary)), nearest]) > scale * IncrementalMesher.TOLERANCE:
+                return False
+            localTags[onBoundary] = boundaryTags[nearest].astype(np.int64)
+
+        interior = np.flatnonzero(isInterior)
+        firstNode = int(gmsh.model.mesh.getMaxNodeTag()) + 1
+        localTags[interior] = np.arange(firstNode, firstNode + len(interior))
+
+        gmsh.model.mesh.clear([(dim, tag)])
+        if len(interior) > 0:
+            gmsh.model.mesh.addNodes(
+                dim, tag, localTags[interior].tolist(), coords[interior].ravel().tolist(),
+                parametricCoords[interior].ravel().tolist())
+        elementType = gmsh.model.mesh.getElementType("Line" if dim == 1 else "Triangle", 1)
+        firstElement = int(gmsh.model.mesh.getMaxElementTag()) + 1
+        gmsh.model.mesh.addElementsByType(
+            tag, elementType,
+            list(range(firstElement, firstElement + len(elements))),
+            localTags[elements].ravel().tolist())
+        return True
+
+    def generate(self, meshingOptions: Dict):
+        """Meshes the current model, reusing the stored mesh where possible."""
+        loaded = self._loadState(meshingOptions)
+        previousLabels = loaded[0]["labels"] if loaded is not None else {}
+        if len(self.labels) == 0:
+            # The geometry was not imported, e.g. on a geometry cache hit.
+            self.labels = previousLabels
+        self.statistics = {
+            "labels": IncrementalMesher.compareLabels(previousLabels, self.labels),
+            "curves": {"reused": 0, "meshed": len(gmsh.model.getEntities(1))},
+            "surfaces": {"reused": 0, "meshed": len(gmsh.model.getEntities(2))},
+        }
+        if loaded is None:
+            gmsh.model.mesh.generate(2)
+            return
+        state, arrays = loaded
+
+        order = int(gmsh.option.getNumber("Mesh.ElementOrder"))
+        gmsh.option.setNumber("Mesh.ElementOrder", 1)
+        try:
+            gmsh.model.mesh.generate(1)
+            for dim, name in ((1, "curves"), (2, "surfaces")):
+                tags, signatures = IncrementalMesher._signaturesOfDimension(dim)
+                matches = IncrementalMesher._match(signatures, np.array(state[name]).reshape(-1, 10))
+                reused = 0
+                for tag, match in zip(tags, matches):
+                    if match >= 0 and self._inject(dim, tag, arrays, name + str(match)):
+                        reused += 1
+                self.statistics[name] = {"reused": reused, "meshed": len(tags) - reused}
+
+            gmsh.option.setNumber("Mesh.MeshOnlyEmpty", 1)
+            gmsh.model.mesh.generate(2)
+        finally:
+            gmsh.option.setNumber("Mesh.MeshOnlyEmpty", 0)
+            gmsh.option.setNumber("Mesh.ElementOrder", order)
+
+        if order > 1:
+            gmsh.model.mesh.setOrder(order)
+            utils.optimizeHighOrder()
+
+    @staticmethod
+    def _firstOrderMesh(dim: int, tag: int) -> Dict[str, np.ndarray]:
+        numVertices = dim + 1
+        elementTypes, _, elementNodes = gmsh.model.mesh.getElements(dim, tag)
+        vertices = [np.zeros((0, numVertices), dtype=np.uint64)]
+        for elementType, nodes in zip(elementTypes, elementNodes):
+            numNodes = gmsh.model.mesh.getElementProperties(elementType)[3]
+            vertices.append(nodes.reshape(-1, numNodes)[:, :numVertices])
+        usedTags, elements = np.unique(np.concatenate(vertices), return_inverse=True)
+
+        # Boundary nodes are reparametrized on the entity by gmsh.
+        nodeTags, coords, parametricCoords = gmsh.model.mesh.getNodes(
+            dim, tag, includeBoundary=True, returnParametricCoord=True)
+        interiorTags, _, _ = gmsh.model.mesh.getNodes(dim, tag, includeBoundary=False)
+        sorter = np.argsort(nodeTags)
+        positions = sorter[np.searchsorted(nodeTags, usedTags, sorter=sorter)]
+        return {
+            "coords": coords.reshape(-1, 3)[positions],
+            "parametricCoords": parametricCoords.reshape(-1, dim)[positions],
+            "isInterior": np.isin(usedTags, interiorTags),
+            "elements": elements.reshape(-1, numVertices),
+        }
+
+    def store(self, meshingOptions: Dict):
+        state = {
+            "optionsKey": IncrementalMesher._optionsKey(meshingOptions),
+            "labels": self.labels,
+        }
+        arrays = dict()
+        for dim, name in ((1, "curves"), (2, "surfaces")):
+            tags, signatures = IncrementalMesher._signaturesOfDimension(dim)
+            state[name] = signatures.tolist()
+            for idx, tag in enumerate(tags):
+                for field, values in IncrementalMesher._firstOrderMesh(dim, tag).items():
+                    arrays[name + str(idx) + "_" + field] = values
+
+        np.savez_compressed(self._meshFile(), **arrays)
+        with open(self._stateFile(), 'w') as f:
+            json.dump(state, f, indent=3)
+
+    def getOutputs(self) -> List[str]:
+        return [self._stateFile(), self._meshFile()]
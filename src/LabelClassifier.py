@@ -0,0 +1,101 @@
+import re
+import warnings
+from typing import Dict, List, Tuple
+
+import gmsh
+
+DimTag = Tuple[int, int]
+
+
+class LabelClassifier():
+    """Sorts imported entities by the label ending their name, e.g. Conductor_2.
+
+    Each entity name is fetched from gmsh once and matched against a single
+    pattern built from all the registered labels. The number is read from the
+    end of the name, so 'Shapes/wire/Conductor_002' is Conductor_ number 2.
+    Entities whose names contain a label but do not end with its number are
+    rejected, as are labels used by several entities of the same number:
+    the last entity is kept and the conflict is recorded and warned about.
+    """
+    DEFAULT_LABELS = ("Conductor_", "Dielectric_", "OpenBoundary_")
+
+    labels: Dict[str, Tuple[int, ...]]
+    names: Dict[DimTag, str]
+    conflicts: List[Dict]
+
+    def __init__(self, labels: Tuple[str, ...] = DEFAULT_LABELS):
+        self.labels = dict()
+        self.names = dict()
+        self.conflicts = []
+        self._pattern = None
+        for label in labels:
+            self.registerLabel(label)
+
+    def registerLabel(self, label: str, dimensions: Tuple[int, ...] = (2,)):
+        """Adds a label, looked for in the names of entities of the given dimensions."""
+        if label == "":
+            raise ValueError("Labels can not be empty.")
+        self.labels[label] = tuple(dimensions)
+        self._pattern = None
+
+    def _getPattern(self) -> 're.Pattern':
+        if self._pattern is None:
+            # Longest labels first, for labels starting at the same character.
+            alternatives = "|".join(
+                re.escape(label) for label in sorted(self.labels, key=len, reverse=True))
+            self._pattern = re.compile("(" + alternatives + r")(\d+)$")
+        return self._pattern
+
+    def getName(self, dimTag: DimTag) -> str:
+        if dimTag not in self.names:
+            self.names[dimTag] = gmsh.model.getEntityName(*dimTag)
+        return self.names[dimTag]
+
+    def classify(self, dimTags: List[DimTag]) -> Dict[str, Dict[int, List[DimTag]]]:
+        """Entities of each label, by number, in a single pass over dimTags."""
+        pattern = self._getPattern()
+        dimensions = set(dim for labelDimensions in self.labels.values() for dim in labelDimensions)
+        classified = dict([[label, dict()] for label in self.labels])
+        owners: Dict[Tuple[str, int], List[DimTag]] = dict()
+        for dimTag in dimTags:
+            if dimTag[0] not in dimensions:
+                continue
+            name = self.getName(dimTag)
+            if name == "":
+                continue
+            match = pattern.search(name)
+            if match is None:
+                self._checkUnmatched(dimTag, name)
+                continue
+            label = match.group(1)
+            if dimTag[0] not in self.labels[label]:
+                continue
+            num = int(match.group(2))
+            classified[label][num] = [dimTag]
+            owners.setdefault((label, num), []).append(dimTag)
+
+        for (label, num), entities in owners.items():
+            if len(entities) > 1:
+                self._addConflict(label, num, entities)
+        return classified
+
+    def _checkUnmatched(self, dimTag: DimTag, name: str):
+        for label, dimensions in self.labels.items():
+            if dimTag[0] in dimensions and label in name:
+                raise ValueError(
+                    "Name of entity {} has label {} but does not end with its number: {}".format(
+                        dimTag, label, name))
+
+    def _addConflict(self, label: str, num: int, entities: List[DimTag]):
+        conflict = {
+            "label": label,
+            "number": num,
+            "entities": [list(dimTag) for dimTag in entities],
+            "names": [self.names[dimTag] for dimTag in entities],
+            "kept": list(entities[-1]),
+        }
+        self.conflicts.append(conflict)
+        warnings.warn(
+            "{} entities are labelled {}{}, only {} is kept.".format(
+                len(entities), label, num, tuple(entities[-1])),
+            stacklevel=3)
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import __version__
+
+
+class MeshCache():
+    """On-disk cache of meshing outputs keyed on the input contents.
+
+    Each entry is a folder named after the key holding a copy of the output
+    files. Entries are evicted in least recently used order once the total
+    size of the cache exceeds maxSize bytes. The geometry folder, holding
+    the GeometryCache, is not an entry and is never evicted.
+    """
+    DEFAULT_MAX_SIZE = 2 * 1024**3
+    GEOMETRY_FOLDER = "geometry"
+    _OUTPUT_STEM = "output"
+    _HASH_CHUNK_SIZE = 1024**2
+    _sourceDigest: Optional[str] = None
+
+    def __init__(self, folder: Optional[str] = None, maxSize: int = DEFAULT_MAX_SIZE):
+        if folder is None:
+            folder = MeshCache.defaultFolder()
+        self.folder = folder
+        self.maxSize = maxSize
+        os.makedirs(self.folder, exist_ok=True)
+
+    @staticmethod
+    def defaultFolder() -> str:
+        if 'STEP2GMSH_CACHE_DIR' in os.environ:
+            return os.environ['STEP2GMSH_CACHE_DIR']
+        return str(Path.home() / '.cache' / 'step2gmsh')
+
+    @staticmethod
+    def sourceDigest() -> str:
+        """Hash of the package sources, so entries of a modified step2gmsh are not restored."""
+        if MeshCache._sourceDigest is None:
+            hasher = hashlib.sha256()
+            for source in sorted(Path(__file__).parent.glob('*.py')):
+                hasher.update(source.name.encode())
+                hasher.update(source.read_bytes())
+            MeshCache._sourceDigest = hasher.hexdigest()
+        return MeshCache._sourceDigest
+
+    @staticmethod
+    def computeKey(inputFile: str, options: Dict) -> str:
+        """Key of the input contents, the options, and the step2gmsh and gmsh versions.
+
+        The step2gmsh version includes the hash of its sources, so changes
+        that are not released yet also change the key.
+        """
+        import gmsh
+
+        hasher = hashlib.sha256()
+        with open(inputFile, 'rb') as f:
+            for chunk in iter(lambda: f.read(MeshCache._HASH_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        hasher.update(json.dumps(options, sort_keys=True).encode())
+        hasher.update(__version__.encode())
+        hasher.update(MeshCache.sourceDigest().encode())
+        hasher.update(gmsh.__version__.encode())
+        return hasher.hexdigest()
+
+    def getGeometryFolder(self) -> str:
+        return os.path.join(self.folder, MeshCache.GEOMETRY_FOLDER)
+
+    def _entryFolder(self, key: str) -> str:
+        return os.path.join(self.folder, key)
+
+    def restore(self, key: str, outputName: str) -> Optional[List[str]]:
+        """Copies the cached outputs to outputName and returns their paths, None on a miss."""
+        entry = self._entryFolder(key)
+        if not os.path.isdir(entry):
+            return None
+
+        outputs = []
+        try:
+            for fileName in sorted(os.listdir(entry)):
+                output = outputName + fileName[len(MeshCache._OUTPUT_STEM):]
+                shutil.copyfile(os.path.join(entry, fileName), output)
+                outputs.append(output)
+            os.utime(entry)
+        except FileNotFoundError:
+            # Entry evicted by another process while being restored.
+            return None
+        return outputs
+
+    def store(self, key: str, outputs: List[str], outputName: str):
+        entry = self._entryFolder(key)
+        if os.path.isdir(entry):
+            return
+
+        staging = tempfile.mkdtemp(prefix='.staging_', dir=self.folder)
+        for output in outputs:
+            suffix = output[len(outputName):]
+            shutil.copyfile(output, os.path.join(staging, MeshCache._OUTPUT_STEM + suffix))
+        try:
+            os.replace(staging, entry)
+        except OSError:
+            # Another process stored the same entry first.
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict()
+
+    def _entries(self) -> List[Dict]:
+        entries = []
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            if name.startswith('.') or name == MeshCache.GEOMETRY_FOLDER or not os.path.isdir(path):
+                continue
+            try:
+                size = sum(
+                    os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                lastUse = os.path.getmtime(path)
+            except FileNotFoundError:
+                continue
+            entries.append({"path": path, "size": size, "lastUse": lastUse})
+        return entries
+
+    def size(self) -> int:
+        return sum(e["size"] for e in self._entries())
+
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda e: e["lastUse"])
+        total = sum(e["size"] for e in entries)
+        for entry in entries:
+            if total <= self.maxSize:
+                break
+            shutil.rmtree(entry["path"], ignore_errors=True)
+            total -= entry["size"]
+
+    def clear(self):
+        for entry in self._entries():
+            shutil.rmtree(entry["path"], ignore_errors=True)
@@ -0,0 +1,145 @@
+from typing import Dict, List, Tuple
+
+import gmsh
+import numpy as np
+
+from .TopologyMap import TopologyMap
+
+
+class MeshPartitioner():
+    """Splits the current 2D mesh in numParts parts for distributed solvers.
+
+    Partitioning is done by gmsh, with METIS, and creates the partition
+    entities and their interfaces. Partition entities keep the physical
+    groups of their parents, so the MSH file holds the partition of each
+    element in its tags, or one file per part with splitFiles. For MFEM
+    meshes, the partition of each element is written, in the order of the
+    elements of the mesh file, to a file which MFEM ParMesh can be built
+    from.
+
+    The quality of the partition is given by the load imbalance, largest
+    part over mean part size, and the edge cut, the number of mesh edges
+    between elements of different parts.
+
+    gmsh 4.11 can neither unpartition nor clear the partition entities of a
+    model, and meshing it again crashes or keeps them. A partitioned model,
+    see isPartitioned, must be rebuilt, e.g. re-imported from a BREP file
+    as ParametricSweep does, before it is meshed again.
+    """
+    numParts: int
+    splitFiles: bool
+
+    def __init__(self, numParts: int, splitFiles: bool = False):
+        if numParts < 1:
+            raise ValueError("The number of partitions must be positive.")
+        self.numParts = numParts
+        self.splitFiles = splitFiles
+
+    def partition(self) -> Dict:
+        """Partitions the mesh of the current model. Returns the partition statistics."""
+        gmsh.option.setNumber("Mesh.PartitionCreateTopology", 1)
+        # Physical groups of the partitions would be taken as materials.
+        gmsh.option.setNumber("Mesh.PartitionCreatePhysicals", 0)
+        gmsh.option.setNumber("Mesh.PartitionSplitMeshFiles", 1 if self.splitFiles else 0)
+        if self.numParts > 1:
+            gmsh.model.mesh.partition(self.numParts)
+        TopologyMap.invalidate()
+        return MeshPartitioner.getStatistics(*MeshPartitioner._elementPartitions())
+
+    @staticmethod
+    def isPartitioned() -> bool:
+        """Whether the current model has partition entities, so it can not be meshed again."""
+        return gmsh.model.getNumberOfPartitions() > 0
+
+    @staticmethod
+    def _partitionOf(dim: int, tag: int) -> int:
+        partitions = gmsh.model.getPartitions(dim, tag)
+        return int(partitions[0]) if len(partitions) > 0 else 1
+
+    @staticmethod
+    def _elementPartitions() -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """Corner node tags of the 2D elements, per element type, and their partitions."""
+        corners = []
+        partitions = []
+        for dim, tag in gmsh.model.getEntities(2):
+            partition = MeshPartitioner._partitionOf(dim, tag)
+            elementTypes, _, nodeTags = gmsh.model.mesh.getElements(dim, tag)
+            for elementType, nodes in zip(elementTypes, nodeTags):
+                _, _, _, numNodes, _, numVertices = gmsh.model.mesh.getElementProperties(elementType)
+                elementCorners = nodes.reshape(-1, numNodes)[:, :numVertices].astype(np.int64)
+                corners.append(elementCorners)
+                partitions.append(np.full(len(elementCorners), partition, dtype=np.int64))
+        return corners, partitions
+
+    @staticmethod
+    def getStatistics(corners: List[np.ndarray], partitions: List[np.ndarray]) -> Dict:
+        """Sizes, load imbalance, edge cut and interfaces of a partition of the elements.
+
+        corners holds blocks of elements as (N, vertices) node tags and
+        partitions the part, starting at 1, of each element of the block.
+        """
+        if len(corners) == 0:
+            return {"numParts": 0, "elements": [], "imbalance": 0.0,
+                    "edgeCut": 0, "interfaceNodes": 0, "interfaces": {}}
+        elementPartitions = np.concatenate(partitions)
+        sizes = np.bincount(elementPartitions)[1:]
+
+        edges = []
+        edgePartitions = []
+        for blockCorners, blockPartitions in zip(corners, partitions):
+            numVertices = blockCorners.shape[1]
+            edges.append(np.stack(
+                [blockCorners, np.roll(blockCorners, -1, axis=1)], axis=2).reshape(-1, 2))
+            edgePartitions.append(np.repeat(blockPartitions, numVertices))
+        edges = np.sort(np.concatenate(edges), axis=1)
+        edgePartitions = np.concatenate(edgePartitions)
+
+        # Inner edges appear twice, once per element sharing them.
+        order = np.lexsort((edges[:, 1], edges[:, 0]))
+        edges = edges[order]
+        edgePartitions = edgePartitions[order]
+        isShared = np.all(edges[1:] == edges[:-1], axis=1)
+        first = edgePartitions[:-1][isShared]
+        second = edgePartitions[1:][isShared]
+        isCut = first != second
+        pairs = np.sort(np.stack([first[isCut], second[isCut]], axis=1), axis=1)
+        interfaceNodes = np.unique(edges[:-1][isShared][isCut])
+
+        interfaces = dict()
+        if len(pairs) > 0:
+            uniquePairs, counts = np.unique(pairs, axis=0, return_counts=True)
+            for (p, q), count in zip(uniquePairs, counts):
+                interfaces["{}-{}".format(p, q)] = int(count)
+
+        return {
+            "numParts": int(np.count_nonzero(sizes)),
+            "elements": sizes.tolist(),
+            "imbalance": float(np.max(sizes) / np.mean(sizes[sizes > 0])),
+            "edgeCut": int(np.count_nonzero(isCut)),
+            "interfaceNodes": len(interfaceNodes),
+            "interfaces": interfaces,
+        }
+
+    def getSplitFileNames(self, outputName: str) -> List[str]:
+        """Files written by gmsh for each part when splitFiles is set."""
+        if self.numParts == 1:
+            return [outputName + '.msh']
+        return ["{}_{}.msh".format(outputName, part) for part in range(1, self.numParts + 1)]
+
+    def writeMfemPartitioning(self, fileName: str) -> str:
+        """Writes the part, from 0, of each element in the order of MfemMeshWriter."""
+        topology = TopologyMap.current()
+        partitions = []
+        for pG in gmsh.model.getPhysicalGroups(2):
+            for dim, tag in topology.getEntities(pG):
+                partition = MeshPartitioner._partitionOf(dim, tag) - 1
+                _, elementTags, _ = gmsh.model.mesh.getElements(dim, tag)
+                for tags in elementTags:
+                    partitions.append(np.full(len(tags), partition, dtype=np.int64))
+        partitions = np.concatenate(partitions) if partitions else np.zeros(0, dtype=np.int64)
+
+        with open(fileName, 'w') as f:
+            f.write("number_of_elements {}\nnumber_of_processors {}\n".format(
+                len(partitions), self.numParts))
+            np.savetxt(f, partitions, fmt='%d')
+        return fileName
@@ -0,0 +1,85 @@
+from typing import Dict, List, Tuple
+
+import gmsh
+import numpy as np
+
+from .TopologyMap import TopologyMap
+
+
+class ElementBlock():
+    """Elements of one gmsh element type.
+
+    connectivity holds, for each element, the indices of its nodes in the
+    nodes array of the MeshResult, not their gmsh tags.
+    """
+    __slots__ = ('elementType', 'name', 'dimension', 'tags', 'connectivity', 'physicalTags')
+
+    def __init__(self, elementType: int, numElements: int):
+        self.elementType = elementType
+        name, dimension, _, numNodes, _, _ = gmsh.model.mesh.getElementProperties(elementType)
+        self.name = name
+        self.dimension = dimension
+        self.tags = np.empty(numElements, dtype=np.uint64)
+        self.connectivity = np.empty((numElements, numNodes), dtype=np.int64)
+        self.physicalTags = np.empty(numElements, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+
+class MeshResult():
+    """Arrays of the mesh of the current gmsh model.
+
+    Only elements belonging to a physical group are kept, as when the mesh
+    is written to file. Node coordinates are a view of the array returned
+    by gmsh and element data is copied once, into its final block.
+    """
+    nodeTags: np.ndarray
+    nodes: np.ndarray
+    elements: Dict[str, ElementBlock]
+    physicalNames: Dict[Tuple[int, int], str]
+
+    def __init__(self):
+        nodeTags, coords, _ = gmsh.model.mesh.getNodes()
+        self.nodeTags = nodeTags
+        self.nodes = coords.reshape(-1, 3)
+        nodeIndex = np.full(
+            int(np.max(nodeTags)) + 1 if len(nodeTags) else 1, -1, dtype=np.int64)
+        nodeIndex[nodeTags.view(np.int64)] = np.arange(len(nodeTags))
+
+        topology = TopologyMap.current()
+        self.physicalNames = dict(topology.physicalNames)
+
+        # Arrays of each element type are gathered first to size the blocks.
+        chunks: Dict[int, List[Tuple[int, np.ndarray, np.ndarray]]] = dict()
+        for dim, entityTag in topology.entities:
+            physicalGroups = topology.getPhysicalGroups((dim, entityTag))
+            if len(physicalGroups) == 0:
+                continue
+            elementTypes, elementTags, nodeTags = gmsh.model.mesh.getElements(dim, entityTag)
+            for elementType, tags, nodes in zip(elementTypes, elementTags, nodeTags):
+                chunks.setdefault(int(elementType), []).append(
+                    (physicalGroups[0][1], tags, nodes))
+
+        self.elements = dict()
+        for elementType, typeChunks in chunks.items():
+            block = ElementBlock(elementType, sum(len(tags) for _, tags, _ in typeChunks))
+            start = 0
+            for physicalTag, tags, nodes in typeChunks:
+                end = start + len(tags)
+                block.tags[start:end] = tags
+                block.physicalTags[start:end] = physicalTag
+                # Tags are positive, so viewing them as signed integers is exact.
+                np.take(nodeIndex, nodes.view(np.int64).reshape(len(tags), -1),
+                        out=block.connectivity[start:end])
+                start = end
+            self.elements[block.name] = block
+
+    def getNumberOfElements(self) -> int:
+        return sum(len(block) for block in self.elements.values())
+
+    def getPhysicalTag(self, name: str) -> int:
+        for (_, tag), physicalName in self.physicalNames.items():
+            if physicalName == name:
+                return tag
+        raise KeyError(name)
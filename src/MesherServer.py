@@ -0,0 +1,239 @@
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, Optional
+
+from .BatchRunner import _runCase
+
+
+def _serverWorker(conn):
+    # Heavy modules are imported once, before the first job arrives.
+    import gmsh  # noqa: F401
+    from . import mesher  # noqa: F401
+
+    conn.send("ready")
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        conn.send(_runCase(job["input"], job["outputFolder"], job["options"]))
+    conn.close()
+
+
+class _Worker():
+    """A warm worker process and the thread feeding it jobs from the server queue."""
+
+    def __init__(self, server: 'MesherServer'):
+        self.server = server
+        self.process = None
+        self.conn = None
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _spawn(self):
+        ctx = get_context("spawn")
+        self.conn, childConn = ctx.Pipe()
+        self.process = ctx.Process(target=_serverWorker, args=(childConn,), daemon=True)
+        self.process.start()
+        childConn.close()
+        self.conn.recv()
+
+    def start(self):
+        self._spawn()
+        self.thread.start()
+
+    def _loop(self):
+        while True:
+            item = self.server._queue.get()
+            if item is None:
+                break
+            job, future, submitted = item
+            started = time.perf_counter()
+            try:
+                self.conn.send(job)
+                result = self.conn.recv()
+            except (EOFError, OSError):
+                self.process.join()
+                result = {
+                    "input": job["input"],
+                    "case": Path(job["input"]).stem,
+                    "status": "failed",
+                    "outputs": [],
+                    "error": "Worker process exited with code {}".format(self.process.exitcode),
+                    "wallTime": time.perf_counter() - started,
+                }
+                self._spawn()
+            result["id"] = job.get("id")
+            result["queueTime"] = started - submitted
+            result["latency"] = time.perf_counter() - submitted
+            future.set_result(result)
+        self.stop()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join()
+
+
+class MesherServer():
+    """Long lived mesher keeping warm worker processes.
+
+    Jobs are dicts with the step file in "input" and, optionally, an "id",
+    an "outputFolder" and "options" forwarded to Mesher.runFromInput over the
+    server runOptions. At most numWorkers jobs run at the same time and at
+    most maxQueueSize wait for a worker, further jobs are rejected. Each
+    worker imports gmsh and the mesher once, so a job only pays for meshing.
+
+    Jobs are read as JSON lines from a Unix socket or stdin and answered, in
+    completion order, with JSON lines holding the BatchRunner case result
+    plus its id, the time spent in the queue and the total latency.
+    """
+    DEFAULT_MAX_QUEUE_SIZE = 64
+
+    def __init__(self, numWorkers: Optional[int] = None,
+                 maxQueueSize: int = DEFAULT_MAX_QUEUE_SIZE,
+                 runOptions: Optional[Dict] = None):
+        self.numWorkers = numWorkers if numWorkers else (os.cpu_count() or 1)
+        self.runOptions = runOptions if runOptions else {}
+        self._queue = queue.Queue(maxsize=maxQueueSize)
+        self._workers = []
+        self._shutdown = threading.Event()
+
+    def start(self):
+        self._workers = [_Worker(self) for _ in range(self.numWorkers)]
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self):
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.thread.join()
+        self._workers = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def submit(self, job: Dict) -> Future:
+        future = Future()
+        if not isinstance(job.get("input"), str):
+            future.set_result(MesherServer._rejected(job, "Jobs must give the step file in 'input'."))
+            return future
+
+        options = dict(self.runOptions)
+        options.update(job.get("options", {}))
+        job = {
+            "id": job.get("id"),
+            "input": job["input"],
+            "outputFolder": job.get("outputFolder", "."),
+            "options": options,
+        }
+        try:
+            self._queue.put_nowait((job, future, time.perf_counter()))
+        except queue.Full:
+            future.set_result(MesherServer._rejected(job, "Job queue is full."))
+        return future
+
+    @staticmethod
+    def _rejected(job: Dict, error: str) -> Dict:
+        return {
+            "id": job.get("id"),
+            "input": job.get("input"),
+            "status": "rejected",
+            "outputs": [],
+            "error": error,
+        }
+
+    def _serveLines(self, lines, write):
+        """Submits a job per JSON line and writes each result when done."""
+        futures = []
+        lock = threading.Lock()
+
+        def respond(future):
+            with lock:
+                write(json.dumps(future.result()) + "\n")
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+            except json.JSONDecodeError as e:
+                job = {}
+                future = Future()
+                future.set_result(MesherServer._rejected(job, "Invalid JSON: " + str(e)))
+            else:
+                if job.get("command") == "shutdown":
+                    self._shutdown.set()
+                    break
+                future = self.submit(job)
+            futures.append(future)
+            future.add_done_callback(respond)
+
+        for future in futures:
+            future.result()
+
+    def serveStdin(self, stdin=None, stdout=None):
+        stdin = stdin if stdin is not None else sys.stdin
+        stdout = stdout if stdout is not None else sys.stdout
+
+        def write(text):
+            stdout.write(text)
+            stdout.flush()
+
+        self._serveLines(stdin, write)
+
+    @staticmethod
+    def supportsUnixSockets() -> bool:
+        """Unix sockets are not available on every platform, e.g. Windows."""
+        return hasattr(socket, 'AF_UNIX') and hasattr(socketserver, 'ThreadingUnixStreamServer')
+
+    def serveUnixSocket(self, socketPath: str):
+        """Serves until a client sends {"command": "shutdown"}."""
+        if not MesherServer.supportsUnixSockets():
+            raise OSError("Unix sockets are not supported on this platform.")
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                def write(text):
+                    self.wfile.write(text.encode())
+                    self.wfile.flush()
+                lines = (line.decode() for line in self.rfile)
+                server._serveLines(lines, write)
+                if server._shutdown.is_set():
+                    threading.Thread(target=unixServer.shutdown, daemon=True).start()
+
+        if os.path.exists(socketPath):
+            os.remove(socketPath)
+        with socketserver.ThreadingUnixStreamServer(socketPath, Handler) as unixServer:
+            unixServer.daemon_threads = True
+            try:
+                unixServer.serve_forever()
+            finally:
+                os.remove(socketPath)
+
+    @staticmethod
+    def request(socketPath: str, job: Dict) -> Dict:
+        """Sends one job to a server listening on socketPath and waits for its result."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socketPath)
+            client.sendall((json.dumps(job) + "\n").encode())
+            client.shutdown(socket.SHUT_WR)
+            with client.makefile('r') as response:
+                line = response.readline()
+        return json.loads(line) if line else {}
@@ -0,0 +1,142 @@
+from typing import Dict, List, Tuple
+
+import gmsh
+import numpy as np
+
+from .TopologyMap import TopologyMap
+
+
+class MfemMeshWriter():
+    """Writes the current 2D mesh in MFEM mesh v1.0 format.
+
+    Elements and boundary elements take as attribute the tag of their physical
+    group. Curved meshes store their nodes as an L2 grid function on closed
+    uniform points, which match the high order nodes placed by gmsh. The
+    file is written in chunks, so no text copy of the whole mesh is built in
+    memory.
+    """
+    CHUNK_SIZE = 100000
+
+    # gmsh element type name to MFEM geometry.
+    GEOMETRIES = {
+        "Line": 1,
+        "Triangle": 2,
+        "Quadrilateral": 3,
+    }
+
+    def __init__(self, chunkSize: int = CHUNK_SIZE):
+        self.chunkSize = chunkSize
+        nodeTags, coords, _ = gmsh.model.mesh.getNodes()
+        scaling = gmsh.option.getNumber("Mesh.ScalingFactor")
+        self.coordinates = coords.reshape(-1, 3)[:, :2] * scaling
+        self.nodeIndex = np.full(int(np.max(nodeTags)) + 1 if len(nodeTags) else 1, -1, dtype=np.int64)
+        self.nodeIndex[nodeTags.astype(np.int64)] = np.arange(len(nodeTags))
+
+    @staticmethod
+    def _elementsOfDimension(dim: int) -> List[Tuple[int, int, np.ndarray]]:
+        """(attribute, gmsh element type, (N, nodes per element) node tags) of each block."""
+        topology = TopologyMap.current()
+        blocks = []
+        for pG in gmsh.model.getPhysicalGroups(dim):
+            for _, tag in topology.getEntities(pG):
+                elementTypes, _, nodeTags = gmsh.model.mesh.getElements(dim, tag)
+                for elementType, tags in zip(elementTypes, nodeTags):
+                    numNodes = gmsh.model.mesh.getElementProperties(elementType)[3]
+                    blocks.append((pG[1], elementType, tags.reshape(-1, numNodes)))
+        return blocks
+
+    @staticmethod
+    def _geometry(elementType: int) -> Tuple[int, int, int]:
+        """MFEM geometry, order and number of vertices of a gmsh element type."""
+        name, _, order, _, _, numPrimaryNodes = gmsh.model.mesh.getElementProperties(elementType)
+        family = name.split()[0]
+        if family not in MfemMeshWriter.GEOMETRIES:
+            raise ValueError("Element type not supported by the MFEM writer: " + name)
+        return MfemMeshWriter.GEOMETRIES[family], order, numPrimaryNodes
+
+    @staticmethod
+    def _closedUniformPoints(geometry: int, order: int) -> np.ndarray:
+        """Reference coordinates of the L2 closed uniform dofs in MFEM ordering."""
+        lattice = np.linspace(0.0, 1.0, order + 1)
+        if geometry == 2:
+            return np.array([[lattice[i], lattice[j]]
+                             for j in range(order + 1) for i in range(order + 1 - j)])
+        return np.array([[lattice[i], lattice[j]]
+                         for j in range(order + 1) for i in range(order + 1)])
+
+    @staticmethod
+    def _dofPermutation(elementType: int) -> np.ndarray:
+        """Index of the gmsh node placed at each MFEM dof."""
+        _, dim, order, numNodes, localCoords, _ = gmsh.model.mesh.getElementProperties(elementType)
+        geometry = MfemMeshWriter._geometry(elementType)[0]
+        localCoords = np.array(localCoords).reshape(numNodes, dim)
+        if geometry == 3:
+            localCoords = (localCoords + 1.0) / 2.0  # gmsh quadrangles live in [-1, 1]^2.
+        points = MfemMeshWriter._closedUniformPoints(geometry, order)
+        distances = np.linalg.norm(points[:, np.newaxis, :] - localCoords[np.newaxis, :, :], axis=2)
+        permutation = np.argmin(distances, axis=1)
+        if len(points) != numNodes or np.max(np.min(distances, axis=1)) > 1e-9:
+            raise ValueError("Incomplete high order elements can not be written to MFEM.")
+        return permutation
+
+    def write(self, fileName: str) -> str:
+        elementBlocks = MfemMeshWriter._elementsOfDimension(2)
+        boundaryBlocks = MfemMeshWriter._elementsOfDimension(1)
+        if len(elementBlocks) == 0:
+            raise ValueError("There are no 2D elements in physical groups to write.")
+        orders = set(MfemMeshWriter._geometry(block[1])[1] for block in elementBlocks)
+        if len(orders) != 1:
+            raise ValueError("Mixed order meshes can not be written to MFEM.")
+        order = orders.pop()
+
+        # MFEM vertices are the corner nodes of the elements, boundary
+        # elements of any order index them by their own corner nodes.
+        corners = np.unique(np.concatenate([
+            block[2][:, :MfemMeshWriter._geometry(block[1])[2]].ravel()
+            for block in elementBlocks
+        ]).astype(np.int64))
+        vertexIndex = np.full(len(self.nodeIndex), -1, dtype=np.int64)
+        vertexIndex[corners] = np.arange(len(corners))
+
+        with open(fileName, 'w') as f:
+            f.write("MFEM mesh v1.0\n\ndimension\n2\n\n")
+            self._writeElements(f, "elements", elementBlocks, vertexIndex)
+            self._writeElements(f, "boundary", boundaryBlocks, vertexIndex)
+            f.write("vertices\n{}\n".format(len(corners)))
+            if order == 1:
+                f.write("2\n")
+                self._writeRows(f, self.coordinates[self.nodeIndex[corners]], '%.16g')
+            else:
+                f.write("\nnodes\n"
+                        "FiniteElementSpace\n"
+                        "FiniteElementCollection: L2_T4_2D_P{}\n"
+                        "VDim: 2\n"
+                        "Ordering: 1\n\n".format(order))
+                for _, elementType, nodeTags in elementBlocks:
+                    permutation = MfemMeshWriter._dofPermutation(elementType)
+                    for start in range(0, len(nodeTags), self.chunkSize):
+                        chunk = nodeTags[start:start + self.chunkSize][:, permutation]
+                        self._writeRows(
+                            f, self.coordinates[self.nodeIndex[chunk.ravel().astype(np.int64)]],
+                            '%.16g')
+        return fileName
+
+    def _writeElements(self, f, section: str, blocks: List, vertexIndex: np.ndarray):
+        f.write("{}\n{}\n".format(section, sum(len(block[2]) for block in blocks)))
+        for attribute, elementType, nodeTags in blocks:
+            geometry, _, numVertices = MfemMeshWriter._geometry(elementType)
+            for start in range(0, len(nodeTags), self.chunkSize):
+                chunk = nodeTags[start:start + self.chunkSize, :numVertices].astype(np.int64)
+                rows = np.empty((len(chunk), numVertices + 2), dtype=np.int64)
+                rows[:, 0] = attribute
+                rows[:, 1] = geometry
+                rows[:, 2:] = vertexIndex[chunk]
+                if np.any(rows[:, 2:] < 0):
+                    raise ValueError(
+                        "The {} has corner nodes which are not vertices of the elements.".format(section))
+                self._writeRows(f, rows, '%d')
+        f.write("\n")
+
+    @staticmethod
+    def _writeRows(f, rows: np.ndarray, fmt: str):
+        np.savetxt(f, rows, fmt=fmt)
@@ -0,0 +1,213 @@
+import itertools
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import gmsh
+
+from . import utils
+from . import constants
+from .ElementBudget import ElementBudget
+from .FarField import FarField
+from .GeometryCache import GeometryCache
+from .GeometryCollector import GeometryCollector
+from .mesher import Mesher
+from .MeshPartitioner import MeshPartitioner
+from .ShapesClassification import ShapesClassification
+from .SymmetryReducer import SymmetryReducer
+
+
+class ParametricSweep():
+    """Meshes one step file for every point of a grid of parameters.
+
+    The step file is imported, classified and its overlaps resolved once.
+    Parameters of the geometry, GEOMETRY_PARAMETERS, are attributes of
+    ShapesClassification. Points are grouped by their geometry parameters
+    and only the vacuum domain and physical model are rebuilt per group,
+    from a BREP snapshot of the resolved shapes. Any other parameter is a
+    gmsh option, so within a group only the mesh is cleared and generated
+    again.
+
+    Meshes and areas of every point are written as Mesher.runFromInput
+    does, with the same options except the caches, incremental meshing and
+    profiling, which do not apply to sweeps.
+    """
+    GEOMETRY_PARAMETERS = ("nearRegionScalingFactor", "farRegionScalingFactor")
+    SUMMARY_SUFFIX = constants.SWEEP_SUMMARY_SUFFIX
+
+    def __init__(self, resolutionEngine: str = "cut", preset: str = "standard",
+                 meshingOptions: Optional[Dict] = None, numThreads: Optional[int] = None,
+                 meshFormat: str = "msh", areaEngine: str = "occ", exportVtk: bool = False,
+                 sizeFields: Optional[Dict] = None, elementBudget: Optional[Dict] = None,
+                 partition: Optional[Dict] = None, symmetry: Optional[Dict] = None,
+                 farField: Optional[Dict] = None):
+        if meshFormat not in constants.MESH_FORMATS:
+            raise ValueError("Unknown mesh format: " + meshFormat)
+        if symmetry is not None and farField is not None and farField.get("kind") == "kelvin":
+            raise ValueError("Kelvin far fields can not be combined with symmetry.")
+        self.resolutionEngine = resolutionEngine
+        self.preset = preset
+        self.meshingOptions = meshingOptions if meshingOptions is not None else {}
+        self.numThreads = numThreads
+        self.meshFormat = meshFormat
+        self.areaEngine = areaEngine
+        self.exportVtk = exportVtk
+        self.sizeFields = sizeFields
+        self.elementBudget = elementBudget
+        self.partition = partition
+        self.symmetry = symmetry
+        self.farField = farField
+
+    @staticmethod
+    def expandGrid(grid: Dict[str, List]) -> List[Tuple[Dict, Dict]]:
+        """Every combination of the grid as (geometry parameters, meshing options).
+
+        Points sharing geometry parameters are consecutive.
+        """
+        for name, values in grid.items():
+            if not isinstance(values, list) or len(values) == 0:
+                raise ValueError("Sweep values must be a non empty list: " + name)
+        geometryNames = [name for name in grid if name in ParametricSweep.GEOMETRY_PARAMETERS]
+        meshNames = [name for name in grid if name not in ParametricSweep.GEOMETRY_PARAMETERS]
+
+        points = []
+        for geometryValues in itertools.product(*[grid[name] for name in geometryNames]):
+            for meshValues in itertools.product(*[grid[name] for name in meshNames]):
+                points.append((
+                    dict(zip(geometryNames, geometryValues)),
+                    dict(zip(meshNames, meshValues)),
+                ))
+        return points
+
+    @staticmethod
+    def loadGrid(fileName: str) -> Dict[str, List]:
+        with open(fileName, 'r') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _snapshot(allShapes: ShapesClassification) -> Dict[str, Dict]:
+        def signatures(shapes):
+            return dict([
+                [num, [GeometryCache.getEntitySignature(*dimTag) for dimTag in dimTags]]
+                for num, dimTags in shapes.items()
+            ])
+        return {
+            "pecs": signatures(allShapes.pecs),
+            "dielectrics": signatures(allShapes.dielectrics),
+            "open": signatures(allShapes.open),
+        }
+
+    @staticmethod
+    def _restore(allShapes: ShapesClassification, brepFile: str, snapshot: Dict[str, Dict]):
+        """Imports the snapshot in a new model and points allShapes to its entities."""
+        gmsh.model.remove()
+        gmsh.model.add(Path(brepFile).stem)
+        gmsh.model.occ.importShapes(brepFile, highestDimOnly=False)
+        utils.synchronize()
+        candidates = GeometryCache.getCandidatesOfDimension(2)
+        for attribute, shapes in snapshot.items():
+            setattr(allShapes, attribute, dict([
+                [num, [(2, tag) for tag in GeometryCache.findEntities(candidates, signatures)]]
+                for num, signatures in shapes.items()
+            ]))
+
+    def run(self, inputFile: str, grid: Dict[str, List], outputFolder: str = ".",
+            mesher: Optional[Mesher] = None) -> Dict:
+        if mesher is None:
+            mesher = Mesher()
+        caseName = Path(inputFile).stem
+        os.makedirs(outputFolder, exist_ok=True)
+        points = ParametricSweep.expandGrid(grid)
+
+        summary = {"input": inputFile, "points": []}
+        symmetry = SymmetryReducer(**self.symmetry) if self.symmetry is not None else None
+        farField = FarField(**self.farField) if self.farField is not None else None
+        gmsh.initialize()
+        try:
+            start = time.perf_counter()
+            gmsh.model.add(caseName)
+            shapes = gmsh.model.occ.importShapes(inputFile, highestDimOnly=False)
+            allShapes = ShapesClassification(shapes, farField=farField)
+            if symmetry is not None:
+                symmetry.detect(allShapes)
+            allShapes.resolveOverlaps(self.resolutionEngine)
+
+            with tempfile.TemporaryDirectory() as tmp:
+                brepFile = os.path.join(tmp, caseName + '.brep')
+                snapshot = ParametricSweep._snapshot(allShapes)
+                gmsh.write(brepFile)
+                summary["geometryTime"] = time.perf_counter() - start
+
+                currentGeometry = None
+                sizeFieldBuilder = None
+                isPartitioned = False
+                for idx, (geometryParameters, meshParameters) in enumerate(points):
+                    pointStart = time.perf_counter()
+                    mesher.report = dict()
+                    if sizeFieldBuilder is not None:
+                        sizeFieldBuilder.remove()
+                        sizeFieldBuilder = None
+                    # Partitioned models can not be meshed again, so they are rebuilt.
+                    if geometryParameters != currentGeometry or isPartitioned:
+                        if currentGeometry is not None:
+                            ParametricSweep._restore(allShapes, brepFile, snapshot)
+                        for name, value in geometryParameters.items():
+                            setattr(allShapes, name, value)
+                        vacuumDomain = allShapes.buildVacuumDomain()
+                        if symmetry is not None:
+                            symmetry.reduce(allShapes, vacuumDomain)
+                        mesher.buildPhysicalModelFromShapes(allShapes, vacuumDomain, symmetry)
+                        GeometryCollector().collect()
+                        if farField is not None and farField.kind == "kelvin":
+                            FarField.applyPeriodicity()
+                        currentGeometry = geometryParameters
+                    else:
+                        gmsh.model.mesh.clear()
+                    geometryTime = time.perf_counter() - pointStart
+
+                    options = dict(self.meshingOptions)
+                    options.update(meshParameters)
+                    budget = ElementBudget(**self.elementBudget) if self.elementBudget is not None else None
+                    meshStart = time.perf_counter()
+                    sizeFieldBuilder = mesher.generateMesh(
+                        Mesher.getMeshingOptions(self.preset, options, self.numThreads),
+                        self.sizeFields, elementBudget=budget, farField=farField, symmetry=symmetry)
+                    meshTime = time.perf_counter() - meshStart
+
+                    nodeTags, _, _ = gmsh.model.mesh.getNodes()
+                    outputName = os.path.join(outputFolder, "{}_{}".format(caseName, idx))
+                    writeStart = time.perf_counter()
+                    outputs = mesher.exportResults(
+                        outputName, self.areaEngine, self.meshFormat, self.exportVtk, self.partition)
+                    writeTime = time.perf_counter() - writeStart
+                    isPartitioned = MeshPartitioner.isPartitioned()
+
+                    parameters = dict(geometryParameters)
+                    parameters.update(meshParameters)
+                    point = {
+                        "parameters": parameters,
+                        "outputs": outputs,
+                        "nodes": len(nodeTags),
+                        "geometryTime": geometryTime,
+                        "meshTime": meshTime,
+                        "writeTime": writeTime,
+                        "wallTime": time.perf_counter() - pointStart,
+                    }
+                    if mesher.report:
+                        point["report"] = mesher.report
+                    summary["points"].append(point)
+        finally:
+            gmsh.finalize()
+
+        summary["wallTime"] = summary.get("geometryTime", 0.0) + sum(
+            point["wallTime"] for point in summary["points"])
+        return summary
+
+    @staticmethod
+    def exportSummary(summary: Dict, summaryFile: str) -> str:
+        with open(summaryFile, 'w') as f:
+            json.dump(summary, f, indent=3)
+        return summaryFile
@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import gmsh
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+
+def getPeakRss() -> Optional[int]:
+    """Peak resident set size of the process since it started, in bytes.
+
+    None where the resource module is not available, e.g. on Windows.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak
+    return peak * 1024
+
+
+def getCurrentRss() -> Optional[int]:
+    """Resident set size of the process in bytes, None without /proc, e.g. on Windows or macOS."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+class Profiler():
+    """Records wall time and memory of the meshing phases.
+
+    Each phase records the resident set size at its start and end, and the
+    peak of the process so far, processPeakRss, which is cumulative: it only
+    tells a phase raised the peak when it differs from the one of the
+    previous phase. Memory values are None where the platform does not
+    provide them.
+
+    A disabled profiler turns every call into a no-op, so the mesher can
+    always go through it.
+    """
+    BOOLEAN_OPERATIONS = ('cut', 'intersect', 'fragment', 'fuse')
+
+    phases: List[Dict]
+    booleans: Dict[str, Dict]
+    mesh: Dict
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.phases = []
+        self.booleans = dict(
+            [[op, {"count": 0, "wallTime": 0.0}] for op in Profiler.BOOLEAN_OPERATIONS])
+        self.mesh = dict()
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        rssStart = getCurrentRss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                "name": name,
+                "wallTime": time.perf_counter() - start,
+                "rssStart": rssStart,
+                "rssEnd": getCurrentRss(),
+                "processPeakRss": getPeakRss(),
+            })
+
+    @contextmanager
+    def instrumentBooleans(self):
+        """Counts and times the OCC boolean operations called inside the block."""
+        if not self.enabled:
+            yield
+            return
+        originals = dict(
+            [[op, getattr(gmsh.model.occ, op)] for op in Profiler.BOOLEAN_OPERATIONS])
+        for op, function in originals.items():
+            setattr(gmsh.model.occ, op, self._timed(op, function))
+        try:
+            yield
+        finally:
+            for op, function in originals.items():
+                setattr(gmsh.model.occ, op, function)
+
+    def _timed(self, op: str, function):
+        def timedFunction(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.booleans[op]["count"] += 1
+                self.booleans[op]["wallTime"] += time.perf_counter() - start
+        return timedFunction
+
+    def recordMeshStatistics(self):
+        if not self.enabled:
+            return
+        nodeTags, _, _ = gmsh.model.mesh.getNodes()
+        elementTypes, elementTags, _ = gmsh.model.mesh.getElements()
+        elements = dict()
+        for elementType, tags in zip(elementTypes, elementTags):
+            name = gmsh.model.mesh.getElementProperties(elementType)[0]
+            elements[name] = len(tags)
+        self.mesh = {"nodes": len(nodeTags), "elements": elements}
+
+    def toDict(self) -> Dict:
+        return {
+            "phases": self.phases,
+            "booleans": self.booleans,
+            "mesh": self.mesh,
+            "peakRss": getPeakRss(),
+        }
+
+    def exportToJson(self, exportFileName: str) -> str:
+        fileName = exportFileName + ".profile.json"
+        with open(fileName, 'w') as f:
+            json.dump(self.toDict(), f, indent=3)
+        return fileName
@@ -1,23 +1,40 @@
-from typing import Any, Tuple, List, Dict
+from typing import Any, Tuple, List, Dict, Optional
 
 import gmsh
-from .BoundingBox import BoundingBox
+from . import utils
+from . import constants
+from .BoundingBox import BoundingBox, BoundingBoxArray, BoundingBoxIndex
+from .LabelClassifier import LabelClassifier
+from .FarField import FarField
 from itertools import chain
 import numpy as np
 
 class ShapesClassification:
+    RESOLUTION_ENGINES = constants.RESOLUTION_ENGINES
+    # Default vacuum domain of open problems without OpenBoundary.
+    NEAR_REGION_BOUNDING_BOX_SCALING_FACTOR = 1.2
+    FAR_REGION_DISK_SCALING_FACTOR = FarField.DEFAULT_RADIUS_FACTORS["disk"]
     isOpenCase:bool
 
 
-    def __init__(self, shapes):
-        gmsh.model.occ.synchronize()
+    def __init__(self, shapes, classifier: Optional[LabelClassifier] = None,
+                 farField: Optional[FarField] = None):
+        utils.synchronize()
 
         self.allShapes = shapes
-        self.pecs = self.get_surfaces_with_label(shapes, "Conductor_")
-        self.dielectrics = self.get_surfaces_with_label(shapes, "Dielectric_")
-        self.open = self.get_surfaces_with_label(shapes, "OpenBoundary_")
+        self.classifier = classifier if classifier is not None else LabelClassifier()
+        self.labelled = self.classifier.classify(shapes)
+        self.pecs = self.labelled["Conductor_"]
+        self.dielectrics = self.labelled["Dielectric_"]
+        self.open = self.labelled["OpenBoundary_"]
+        self.labelConflicts = self.classifier.conflicts
         self.vacuum = dict()
+        self.farField = farField if farField is not None else FarField()
+        self.openBoundaryLabel = "OpenBoundary_"
+        self.nearRegionScalingFactor = ShapesClassification.NEAR_REGION_BOUNDING_BOX_SCALING_FACTOR
+        self.farRegionScalingFactor = self.farField.radiusFactor
 
+        self._isOpenProblem = None
         self.isOpenCase = self.isOpenProblem()
 
         if len(self.open) > 1:
@@ -31,32 +48,96 @@ class ShapesClassification:
 
     @staticmethod
     def get_surfaces_with_label(entity_tags, label: str):
-        surfaces = dict()
-        for s in entity_tags:
-            name = gmsh.model.get_entity_name(*s)
-            if s[0] != 2 or label not in name:
-                continue
-            num = ShapesClassification.getNumberFromName(name, label)
-            surfaces[num] = [s]
-
-        return surfaces
+        return LabelClassifier((label,)).classify(entity_tags)[label]
 
     def isOpenProblem(self):
-        elements = list(chain(self.pecs.values()))
-        for idx, element in enumerate(elements):
-            for otheridx, otherElement in enumerate(elements[idx+1:]):
-                if element != otherElement:
-                    intersect = gmsh.model.occ.intersect(
-                        element, 
-                        otherElement,
-                        removeObject=False,
-                        tag=300+otheridx,
-                        removeTool=False
-                    )[0]
-                    if intersect:
-                        return False   
-        return True
+        if self._isOpenProblem is not None:
+            return self._isOpenProblem
+
+        elements = list(self.pecs.values())
+        conductors = set(chain(*elements))
+        boxes = BoundingBoxArray.fromGroups(elements)
+        tolerance = gmsh.option.getNumber("Geometry.Tolerance")
+
+        self._isOpenProblem = True
+        for idx, otherIdx in BoundingBoxIndex(boxes).getOverlappingPairs(tolerance):
+            if elements[idx] == elements[otherIdx]:
+                continue
+            # Without an explicit tag, OCC returns nothing when a conductor
+            # lies inside the other one. With it, a result equal to one of the
+            # inputs is returned under the tag but not added to the model.
+            intersect = gmsh.model.occ.intersect(
+                elements[idx],
+                elements[otherIdx],
+                removeObject=False,
+                tag=gmsh.model.occ.getMaxTag(2) + 1,
+                removeTool=False
+            )[0]
+            existing = set(gmsh.model.occ.getEntities(2))
+            probes = [x for x in intersect if x in existing and x not in conductors]
+            overlaps = len(probes) < len(intersect) or \
+                sum(gmsh.model.occ.getMass(*probe) for probe in probes) > 0
+            if probes:
+                gmsh.model.occ.remove(probes, recursive=True)
+            if overlaps:
+                self._isOpenProblem = False
+                break
+        return self._isOpenProblem
     
+    def resolveOverlaps(self, engine: str = "cut"):
+        if engine == "cut":
+            self.ensureDielectricsDoNotOverlap()
+            self.removeConductorsFromDielectrics()
+        elif engine == "fragment":
+            self.fragmentConductorsAndDielectrics()
+        else:
+            raise ValueError("Unknown resolution engine: " + engine)
+
+    def fragmentConductorsAndDielectrics(self):
+        """Single pass alternative to the sequential cuts.
+
+        Fragments all conductors and dielectrics at once and assigns the
+        pieces back. Pieces covered by a conductor are removed from the
+        dielectrics (except Conductor_0 in closed cases) and pieces shared by
+        several dielectrics go to the last one, as the sequential cuts do.
+        Conductors keep all the pieces they cover.
+        """
+        owners = []
+        objects = []
+        for kind, shapes in (("pec", self.pecs), ("dielectric", self.dielectrics)):
+            for num, surfs in shapes.items():
+                for surf in surfs:
+                    owners.append((kind, num))
+                    objects.append(surf)
+
+        if len(objects) == 0:
+            return
+
+        _, piecesMap = gmsh.model.occ.fragment(objects[:1], objects[1:])
+
+        piecesOwners: Dict[Tuple[int, int], List[Tuple[str, int]]] = dict()
+        for owner, pieces in zip(owners, piecesMap):
+            for piece in pieces:
+                piecesOwners.setdefault(piece, [])
+                if owner not in piecesOwners[piece]:
+                    piecesOwners[piece].append(owner)
+
+        pecs = dict([[num, []] for num in self.pecs.keys()])
+        dielectrics = dict([[num, []] for num in self.dielectrics.keys()])
+        for piece, pieceOwners in piecesOwners.items():
+            pecNums = [num for kind, num in pieceOwners if kind == "pec"]
+            dielNums = [num for kind, num in pieceOwners if kind == "dielectric"]
+            for num in pecNums:
+                pecs[num].append(piece)
+
+            isInConductor = any(num != 0 or self.isOpenCase for num in pecNums)
+            if len(dielNums) != 0 and not isInConductor:
+                dielectrics[dielNums[-1]].append(piece)
+
+        self.pecs = pecs
+        self.dielectrics = dielectrics
+        utils.synchronize()
+
     def removeConductorsFromDielectrics(self):
         for num, diel in self.dielectrics.items():
             pec_surfs = []
@@ -66,7 +147,7 @@ class ShapesClassification:
                 pec_surfs.extend(pec_surf)
             self.dielectrics[num] = gmsh.model.occ.cut(diel, pec_surfs, removeTool=False)[0]
 
-        gmsh.model.occ.synchronize()
+        utils.synchronize()
 
     def ensureDielectricsDoNotOverlap(self):
         for n1, diel1 in self.dielectrics.items():
@@ -82,7 +163,7 @@ class ShapesClassification:
             self.dielectrics[n1] = gmsh.model.occ.cut(
                 self.dielectrics[n1], others, removeObject=True, removeTool=False)[0]
 
-        gmsh.model.occ.synchronize()
+        utils.synchronize()
 
     def buildVacuumDomain(self):
         if self.isOpenCase and len(self.open) == 0:
@@ -105,7 +186,7 @@ class ShapesClassification:
 
         dom = gmsh.model.occ.cut(
             dom, surfsToRemove, removeObject=False, removeTool=False)[0]
-        gmsh.model.occ.synchronize()
+        utils.synchronize()
 
         return dict([[0, dom]])
     
@@ -121,12 +202,10 @@ class ShapesClassification:
             surfsToRemove.extend(surf)
         dom = gmsh.model.occ.cut(
             dom, surfsToRemove, removeObject=False, removeTool=False)[0]
-        gmsh.model.occ.synchronize()
+        utils.synchronize()
         return dict([[0, dom]])
     
     def _buildDefaultVacuumDomain(self):
-        NEAR_REGION_BOUNDING_BOX_SCALING_FACTOR = 1.2
-        FAR_REGION_DISK_SCALING_FACTOR = 4.0
         nonVacuumSurfaces = []
         for _, surf in self.pecs.items():
             nonVacuumSurfaces.extend(surf)
@@ -137,7 +216,7 @@ class ShapesClassification:
 
     
         bbMaxLength = np.max(boundingBox.getLengths())
-        nearVacuumBoxSize = bbMaxLength*NEAR_REGION_BOUNDING_BOX_SCALING_FACTOR
+        nearVacuumBoxSize = bbMaxLength*self.nearRegionScalingFactor
         nVOrigin = tuple(
             np.subtract(boundingBox.getCenter(), 
                         (nearVacuumBoxSize/2.0, nearVacuumBoxSize/2.0, 0.0)))
@@ -145,12 +224,10 @@ class ShapesClassification:
             (2, gmsh.model.occ.addRectangle(*nVOrigin, *(nearVacuumBoxSize,)*2))
         ]
 
-        farVacuumDiameter = FAR_REGION_DISK_SCALING_FACTOR * boundingBox.getDiagonal()
-        farVacuum = [(2, gmsh.model.occ.addDisk(
-            *boundingBox.getCenter(), 
-            farVacuumDiameter, farVacuumDiameter))]
+        farVacuum = self.farField.addDisk(
+            boundingBox, nearVacuumBoxSize, self.farRegionScalingFactor)
         
-        gmsh.model.occ.synchronize()
+        utils.synchronize()
 
         farVacuum = gmsh.model.occ.cut(
             farVacuum, nearVacuum, removeObject=True, removeTool=False)[0]
@@ -165,10 +242,10 @@ class ShapesClassification:
 
         innerRegion = gmsh.model.getBoundary(nearVacuum, recursive=True)
         gmsh.model.mesh.setSize(innerRegion, minSide / 20)
-        
-        
-        self.open = dict([[0, gmsh.model.getBoundary(farVacuum)]])
-        gmsh.model.occ.synchronize()
+        utils.synchronize()
+
+        self.open = self.farField.buildBoundaries(farVacuum, minSide / 20)
+        self.openBoundaryLabel = self.farField.getOpenBoundaryLabel()
 
         return dict([[0, nearVacuum], [1, farVacuum]])
     
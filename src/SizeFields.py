@@ -0,0 +1,131 @@
+from typing import Dict, List, Optional
+
+import gmsh
+import numpy as np
+
+from .BoundingBox import BoundingBox
+from .FarField import FarField
+from .SymmetryReducer import SymmetryReducer
+from .TopologyMap import TopologyMap
+
+
+class SizeFieldBuilder():
+    """Grades the mesh size with the distance to conductors and material interfaces.
+
+    Each Conductor_N and Dielectric_N physical group gets a Distance field to
+    its boundary curves and a Threshold field going from sizeMin at distMin to
+    the global Mesh.MeshSizeMax at distMax. The background field is the
+    minimum of all thresholds. Parameters are factors of the smallest side of
+    the bounding box of the group and can be given per label prefix, e.g.
+    "Conductor_", or per physical group name, e.g. "Conductor_1", which
+    takes precedence.
+    """
+    DEFAULT_PARAMETERS = {
+        "Conductor_": {"sizeMinFactor": 0.1, "distMinFactor": 0.05, "distMaxFactor": 2.0},
+        "Dielectric_": {"sizeMinFactor": 0.2, "distMinFactor": 0.05, "distMaxFactor": 2.0},
+    }
+    SAMPLING = 100
+
+    parameters: Dict[str, Dict[str, float]]
+    fields: List[int]
+    extendFromBoundary: Optional[float]
+
+    def __init__(self, parameters: Optional[Dict[str, Dict[str, float]]] = None):
+        self.parameters = dict(
+            [[label, dict(values)] for label, values in SizeFieldBuilder.DEFAULT_PARAMETERS.items()])
+        if parameters is not None:
+            for label, values in parameters.items():
+                self.parameters.setdefault(label, {}).update(values)
+        self.fields = []
+        self.extendFromBoundary = None
+
+    def getParameters(self, name: str) -> Optional[Dict[str, float]]:
+        """Parameters of a physical group, None if it gets no size field."""
+        matches = [
+            label for label in self.parameters
+            if name == label or (label.endswith("_") and name.startswith(label))
+        ]
+        if len(matches) == 0:
+            return None
+        parameters = dict()
+        for label in sorted(matches, key=len):
+            parameters.update(self.parameters[label])
+        return parameters
+
+    @staticmethod
+    def _boundaryCurves(dim: int, tags: List[int]) -> List[int]:
+        if dim == 1:
+            return tags
+        boundary = gmsh.model.getBoundary([(dim, tag) for tag in tags], combined=False, oriented=False)
+        return sorted(set(abs(tag) for _, tag in boundary))
+
+    def apply(self, farField: Optional[FarField] = None,
+              symmetry: Optional[SymmetryReducer] = None, groups: bool = True) -> int:
+        """Adds the fields to the current model. Returns the background field tag, 0 if none.
+
+        farField and symmetry, when given, add their size gradings to the
+        background field. groups=False only adds the symmetry grading and
+        keeps the sizes extended from the boundaries.
+        """
+        topology = TopologyMap.current()
+        sizeMax = gmsh.option.getNumber("Mesh.MeshSizeMax")
+
+        thresholds = []
+        for pG, name in (topology.physicalNames.items() if groups else []):
+            parameters = self.getParameters(name)
+            if parameters is None:
+                continue
+            tags = [tag for _, tag in topology.getEntities(pG)]
+            curves = SizeFieldBuilder._boundaryCurves(pG[0], tags)
+            if len(curves) == 0:
+                continue
+
+            lengths = BoundingBox.getBoundingBoxFromGroup([(1, tag) for tag in curves]).getLengths()
+            characteristicLength = np.min(lengths[:2])
+            if characteristicLength <= 0:
+                characteristicLength = np.max(lengths[:2])
+
+            distance = gmsh.model.mesh.field.add("Distance")
+            gmsh.model.mesh.field.setNumbers(distance, "CurvesList", curves)
+            gmsh.model.mesh.field.setNumber(distance, "Sampling", SizeFieldBuilder.SAMPLING)
+
+            threshold = gmsh.model.mesh.field.add("Threshold")
+            gmsh.model.mesh.field.setNumber(threshold, "InField", distance)
+            gmsh.model.mesh.field.setNumber(
+                threshold, "SizeMin", min(parameters["sizeMinFactor"] * characteristicLength, sizeMax))
+            gmsh.model.mesh.field.setNumber(threshold, "SizeMax", sizeMax)
+            gmsh.model.mesh.field.setNumber(
+                threshold, "DistMin", parameters["distMinFactor"] * characteristicLength)
+            gmsh.model.mesh.field.setNumber(
+                threshold, "DistMax", parameters["distMaxFactor"] * characteristicLength)
+            self.fields.extend([distance, threshold])
+            thresholds.append(threshold)
+
+        for grader in (farField if groups else None, symmetry):
+            if grader is not None:
+                grading = grader.addGradingFields()
+                self.fields.extend(grading)
+                thresholds.extend(grading[-1:])
+
+        if len(thresholds) == 0:
+            return 0
+
+        background = gmsh.model.mesh.field.add("Min")
+        gmsh.model.mesh.field.setNumbers(background, "FieldsList", thresholds)
+        gmsh.model.mesh.field.setAsBackgroundMesh(background)
+        self.fields.append(background)
+
+        if groups:
+            # Small sizes on the boundaries must not spread into the bulk.
+            self.extendFromBoundary = gmsh.option.getNumber("Mesh.MeshSizeExtendFromBoundary")
+            gmsh.option.setNumber("Mesh.MeshSizeExtendFromBoundary", 0)
+        return background
+
+    def remove(self):
+        """Removes the fields added by apply and restores the options it changed, e.g. before applying them again."""
+        for field in reversed(self.fields):
+            gmsh.model.mesh.field.remove(field)
+        self.fields = []
+        if self.extendFromBoundary is not None:
+            gmsh.option.setNumber("Mesh.MeshSizeExtendFromBoundary", self.extendFromBoundary)
+            self.extendFromBoundary = None
@@ -0,0 +1,386 @@
+import warnings
+from typing import Dict, List, Optional, Set, Tuple
+
+import gmsh
+import numpy as np
+
+from . import constants, utils
+from .BoundingBox import BoundingBox
+from .ShapesClassification import ShapesClassification
+from .TopologyMap import TopologyMap
+
+DimTag = Tuple[int, int]
+
+
+class SymmetryReducer():
+    """Meshes half or a quarter of mirror symmetric cross-sections.
+
+    Mirror symmetry is detected on the labelled shapes, before any boolean
+    operation, about the x axis, y = yc, and the y axis, x = xc, through the
+    center of their bounding box. An axis is a symmetry axis when every
+    labelled group is its own mirror image: the area of the symmetric
+    difference of the group and its mirrored copy must be below tolerance
+    times their areas. Bounding boxes, areas and centers of mass are
+    compared first, within tolerance times the diagonal of the model, so
+    the boolean check only runs on likely images.
+
+    A symmetric geometry does not mean a symmetric excitation, so groups
+    which are the image of another group, e.g. Conductor_2 of Conductor_1,
+    only allow an axis with allowRemovals. The groups lost by the reduction
+    are then warned about and listed in removed.
+
+    Once the vacuum domain is built, all surfaces are fragmented with the
+    symmetry axes and the pieces with y < yc, or x < xc, are removed. Cuts
+    on the boundary of the remaining vacuum and dielectrics become the
+    Symmetry_0 (x axis) and Symmetry_1 (y axis) boundaries, meshed with
+    the sizes of the points they cross and the grading of addGradingFields.
+    """
+    AXES = ("x", "y")
+    DEFAULT_TOLERANCE = constants.SYMMETRY_TOLERANCE
+    DEFAULT_GROWTH_RATE = 1.1
+
+    axes: List[str]
+    center: Optional[Tuple[float, float, float]]
+    mirrors: Dict[str, Dict[str, str]]
+    axisCurves: Set[int]
+    boundaries: Dict[int, List[DimTag]]
+
+    def __init__(self, tolerance: float = DEFAULT_TOLERANCE, axes: Tuple[str, ...] = AXES,
+                 allowRemovals: bool = False):
+        for axis in axes:
+            if axis not in SymmetryReducer.AXES:
+                raise ValueError("Unknown symmetry axis: " + axis)
+        self.tolerance = tolerance
+        self.allowedAxes = tuple(axes)
+        self.allowRemovals = allowRemovals
+        self.axes = []
+        self.center = None
+        self.mirrors = dict()
+        self.removed = dict()
+        self.axisCurves = set()
+        self.boundaries = dict()
+
+    @staticmethod
+    def _labelledGroups(allShapes: ShapesClassification) -> List[Tuple[str, List[DimTag]]]:
+        groups = []
+        for label, shapes in (("Conductor_", allShapes.pecs),
+                              ("Dielectric_", allShapes.dielectrics),
+                              ("OpenBoundary_", allShapes.open)):
+            for num, dimTags in sorted(shapes.items()):
+                groups.append((label + str(num), dimTags))
+        return groups
+
+    @staticmethod
+    def _signature(dimTags: List[DimTag]) -> np.ndarray:
+        """Bounding box, mass and center of mass of a group of surfaces."""
+        box = BoundingBox.getBoundingBoxFromGroup(dimTags).coordinates
+        masses = np.array([gmsh.model.occ.getMass(*dimTag) for dimTag in dimTags])
+        centers = np.array([gmsh.model.occ.getCenterOfMass(*dimTag) for dimTag in dimTags])
+        mass = float(np.sum(masses))
+        center = np.sum(centers * masses[:, np.newaxis], axis=0) / mass if mass > 0 else centers[0]
+        return np.concatenate((box, [mass], center))
+
+    @staticmethod
+    def _mirror(signature: np.ndarray, axis: str, center: Tuple[float, float, float]) -> np.ndarray:
+        coordinate = 1 if axis == "x" else 0
+        mirrored = signature.copy()
+        mirrored[coordinate] = 2.0 * center[coordinate] - signature[coordinate + 3]
+        mirrored[coordinate + 3] = 2.0 * center[coordinate] - signature[coordinate]
+        mirrored[7 + coordinate] = 2.0 * center[coordinate] - signature[7 + coordinate]
+        return mirrored
+
+    def _isMirrorImage(self, dimTags: List[DimTag], imageDimTags: List[DimTag],
+                       axis: str) -> bool:
+        """Whether mirroring dimTags about the axis covers imageDimTags within tolerance."""
+        occ = gmsh.model.occ
+        mirrored = occ.copy(dimTags)
+        if axis == "x":
+            occ.mirror(mirrored, 0, 1, 0, -self.center[1])
+        else:
+            occ.mirror(mirrored, 1, 0, 0, -self.center[0])
+        image = occ.copy(imageDimTags)
+        mass = 2.0 * sum(occ.getMass(*dimTag) for dimTag in image)
+        # OCC areas of mirrored surfaces are off by about 1e-3, so the
+        # symmetric difference is measured on the pieces left by the cuts.
+        difference, _ = occ.cut(mirrored, image, removeObject=False, removeTool=False)
+        otherDifference, _ = occ.cut(image, mirrored, removeObject=False, removeTool=False)
+        differenceMass = sum(occ.getMass(*dimTag) for dimTag in difference + otherDifference)
+        occ.remove(mirrored + image + difference + otherDifference, recursive=True)
+        return differenceMass <= self.tolerance * mass
+
+    def detect(self, allShapes: ShapesClassification) -> List[str]:
+        """Symmetry axes of the labelled shapes."""
+        groups = SymmetryReducer._labelledGroups(allShapes)
+        self.axes = []
+        self.mirrors = dict()
+        if len(groups) == 0:
+            return self.axes
+
+        box = BoundingBox.getBoundingBoxFromGroup(
+            [dimTag for _, dimTags in groups for dimTag in dimTags])
+        self.center = box.getCenter()
+        scale = box.getDiagonal()
+        names = [name for name, _ in groups]
+        labels = [name[:name.rindex("_") + 1] for name in names]
+        signatures = np.array([SymmetryReducer._signature(dimTags) for _, dimTags in groups])
+        masses = np.maximum(np.abs(signatures[:, 6]), 1e-300)
+
+        for axis in self.allowedAxes:
+            mirrors = dict()
+            for idx, signature in enumerate(signatures):
+                mirrored = SymmetryReducer._mirror(signature, axis, self.center)
+                distances = np.max(np.abs(signatures[:, np.r_[0:6, 7:10]] - mirrored[np.r_[0:6, 7:10]]), axis=1)
+                isCandidate = (distances <= self.tolerance * scale) \
+                    & (np.abs(signatures[:, 6] - mirrored[6]) <= self.tolerance * masses) \
+                    & np.array([label == labels[idx] for label in labels])
+                if not self.allowRemovals:
+                    isCandidate &= np.arange(len(groups)) == idx
+                image = next(
+                    (int(other) for other in np.flatnonzero(isCandidate)
+                     if self._isMirrorImage(groups[idx][1], groups[int(other)][1], axis)),
+                    None)
+                if image is None:
+                    break
+                mirrors[names[idx]] = names[image]
+            else:
+                self.axes.append(axis)
+                self.mirrors[axis] = dict(
+                    [[name, image] for name, image in mirrors.items() if name != image])
+        utils.synchronize()
+        return self.axes
+
+    @staticmethod
+    def _isDiscarded(dimTag: DimTag, axes: List[str], center: Tuple[float, float, float]) -> bool:
+        centerOfMass = gmsh.model.occ.getCenterOfMass(*dimTag)
+        return any(
+            centerOfMass[1 if axis == "x" else 0] < center[1 if axis == "x" else 0]
+            for axis in axes)
+
+    def _isOnAxis(self, dimTag: DimTag, axis: str, tolerance: float) -> bool:
+        box = BoundingBox.getEntityCoordinates(dimTag)
+        coordinate = 1 if axis == "x" else 0
+        return abs(box[coordinate] - self.center[coordinate]) <= tolerance \
+            and abs(box[coordinate + 3] - self.center[coordinate]) <= tolerance
+
+    @staticmethod
+    def _getPointSizes() -> List[Tuple[np.ndarray, float]]:
+        """Coordinates and mesh size of the points with a size set."""
+        points = gmsh.model.getEntities(0)
+        if len(points) == 0:
+            return []
+        return [
+            (np.array(gmsh.model.getValue(0, tag, [])), size)
+            for (_, tag), size in zip(points, gmsh.model.mesh.getSizes(points)) if size > 0]
+
+    def _restorePointSizes(self, pointSizes: List[Tuple[np.ndarray, float]], tolerance: float):
+        """Sets the mesh sizes of the points after the fragment.
+
+        Points kept from before get their size again. Points where the axes
+        cut a curve get the sizes of the ends of the curve, interpolated with
+        the lengths of the pieces.
+        """
+        coordinates = np.array([coordinate for coordinate, _ in pointSizes]).reshape(-1, 3)
+        sizes = np.array([size for _, size in pointSizes])
+
+        def sizeAt(tag: int) -> Optional[float]:
+            if len(sizes) == 0:
+                return None
+            distances = np.linalg.norm(coordinates - gmsh.model.getValue(0, tag, []), axis=1)
+            idx = int(np.argmin(distances))
+            return float(sizes[idx]) if distances[idx] <= tolerance else None
+
+        for _, tag in gmsh.model.getEntities(0):
+            size = sizeAt(tag)
+            if size is None:
+                ends = []
+                for curve in gmsh.model.getAdjacencies(0, tag)[0]:
+                    if any(self._isOnAxis((1, curve), axis, tolerance) for axis in self.axes):
+                        continue
+                    others = [abs(other) for _, other in gmsh.model.getBoundary(
+                        [(1, curve)], combined=False, oriented=False) if abs(other) != tag]
+                    endSize = sizeAt(others[0]) if len(others) > 0 else None
+                    if endSize is not None:
+                        ends.append((endSize, gmsh.model.occ.getMass(1, curve)))
+                if len(ends) == 1:
+                    size = ends[0][0]
+                elif len(ends) > 1:
+                    (size0, length0), (size1, length1) = ends[:2]
+                    size = (size0 * length1 + size1 * length0) / (length0 + length1)
+            if size is not None:
+                gmsh.model.mesh.setSize([(0, tag)], size)
+
+    @staticmethod
+    def addGradingFields(growthRate: float = DEFAULT_GROWTH_RATE) -> List[int]:
+        """Adds mesh size fields grading the Symmetry_N curves from their ends.
+
+        Without them, a cut between two points without mesh size, e.g. across
+        a coaxial gap, is meshed with Mesh.MeshSizeMax and so are the surfaces
+        next to it. Each end gets its own mesh size or, if it has none, the
+        one the curvature of its other curves gives with
+        Mesh.MeshSizeFromCurvature, and the size grows from it as a geometric
+        progression of ratio growthRate. Physical groups are used, so it also
+        applies to geometries loaded from the cache. Returns the fields added,
+        the last one to be included in the background field, or none.
+        """
+        topology = TopologyMap.current()
+        axisCurves = set()
+        for number in range(len(SymmetryReducer.AXES)):
+            pG = topology.getPhysicalGroupWithName("Symmetry_" + str(number))
+            if pG is not None:
+                axisCurves.update(tag for _, tag in topology.getEntities(pG))
+        if len(axisCurves) == 0:
+            return []
+
+        elementsPerTwoPi = gmsh.option.getNumber("Mesh.MeshSizeFromCurvature")
+        ends = sorted(set(abs(tag) for _, tag in gmsh.model.getBoundary(
+            [(1, tag) for tag in sorted(axisCurves)], combined=False, oriented=False)))
+        endSizes = []
+        for point in ends:
+            candidates = [size for size in gmsh.model.mesh.getSizes([(0, point)]) if size > 0]
+            if elementsPerTwoPi > 0:
+                coordinates = gmsh.model.getValue(0, point, [])
+                for curve in gmsh.model.getAdjacencies(0, point)[0]:
+                    if curve in axisCurves:
+                        continue
+                    parameter = gmsh.model.getParametrization(1, curve, coordinates)
+                    curvature = abs(gmsh.model.getCurvature(1, curve, parameter)[0])
+                    if curvature > 0:
+                        candidates.append(2.0 * np.pi / (elementsPerTwoPi * curvature))
+            if candidates:
+                endSizes.append((point, min(candidates)))
+        if len(endSizes) == 0:
+            return []
+
+        fields = []
+        for point, size in endSizes:
+            distance = gmsh.model.mesh.field.add("Distance")
+            gmsh.model.mesh.field.setNumbers(distance, "PointsList", [point])
+            grading = gmsh.model.mesh.field.add("MathEval")
+            gmsh.model.mesh.field.setString(
+                grading, "F", "{} + {} * F{}".format(size, growthRate - 1.0, distance))
+            fields.extend([distance, grading])
+        minimum = gmsh.model.mesh.field.add("Min")
+        gmsh.model.mesh.field.setNumbers(minimum, "FieldsList", fields[1::2])
+        restrict = gmsh.model.mesh.field.add("Restrict")
+        gmsh.model.mesh.field.setNumber(restrict, "InField", minimum)
+        gmsh.model.mesh.field.setNumbers(restrict, "CurvesList", sorted(axisCurves))
+        return fields + [minimum, restrict]
+
+    def reduce(self, allShapes: ShapesClassification,
+               vacuumDomain: Dict[int, List[DimTag]]) -> Dict[int, List[DimTag]]:
+        """Cuts the shapes and vacuum domain along the detected axes, updating them in place.
+
+        Returns the curves on each symmetry axis, by the number of their
+        Symmetry_N boundary.
+        """
+        self.boundaries = dict()
+        if len(self.axes) == 0:
+            return self.boundaries
+
+        kinds = (("pecs", allShapes.pecs), ("dielectrics", allShapes.dielectrics),
+                 ("vacuum", vacuumDomain))
+        objects = []
+        ownersOfObject: Dict[DimTag, List[Tuple[str, int]]] = dict()
+        for kind, shapes in kinds:
+            for num, dimTags in shapes.items():
+                for dimTag in dimTags:
+                    if dimTag[0] != 2:
+                        continue
+                    if dimTag not in ownersOfObject:
+                        objects.append(dimTag)
+                        ownersOfObject[dimTag] = []
+                    ownersOfObject[dimTag].append((kind, num))
+
+        box = BoundingBox.getBoundingBoxFromGroup(objects)
+        scale = box.getDiagonal()
+        tolerance = self.tolerance * scale
+        lines = []
+        for axis in self.axes:
+            if axis == "x":
+                start = (box.coordinates[0] - scale, self.center[1])
+                end = (box.coordinates[3] + scale, self.center[1])
+            else:
+                start = (self.center[0], box.coordinates[1] - scale)
+                end = (self.center[0], box.coordinates[4] + scale)
+            lines.append((1, gmsh.model.occ.addLine(
+                gmsh.model.occ.addPoint(*start, 0), gmsh.model.occ.addPoint(*end, 0))))
+
+        pointSizes = SymmetryReducer._getPointSizes()
+        _, piecesMap = gmsh.model.occ.fragment(objects, lines)
+        utils.synchronize()
+
+        pieces: Dict[Tuple[str, int], List[DimTag]] = dict()
+        for dimTag, objectPieces in zip(objects, piecesMap[:len(objects)]):
+            for owner in ownersOfObject[dimTag]:
+                pieces.setdefault(owner, [])
+                for piece in objectPieces:
+                    if piece not in pieces[owner]:
+                        pieces[owner].append(piece)
+
+        allPieces = set(piece for ownerPieces in pieces.values() for piece in ownerPieces)
+        discarded = set(
+            piece for piece in allPieces if SymmetryReducer._isDiscarded(piece, self.axes, self.center))
+
+        self.removed = dict()
+        for kind, shapes in kinds:
+            for num in list(shapes.keys()):
+                kept = [piece for piece in pieces.get((kind, num), []) if piece not in discarded]
+                if len(kept) == 0:
+                    del shapes[num]
+                    self.removed.setdefault(kind, []).append(num)
+                else:
+                    shapes[num] = kept
+
+        if self.removed:
+            warnings.warn("Symmetry reduction removed the groups: " + ", ".join(
+                "{} {}".format(kind, nums) for kind, nums in sorted(self.removed.items())))
+
+        gmsh.model.occ.remove(sorted(discarded), recursive=True)
+        utils.synchronize()
+        self._restorePointSizes(pointSizes, tolerance)
+
+        regions: Set[DimTag] = set()
+        for shapes in (allShapes.dielectrics, vacuumDomain):
+            for dimTags in shapes.values():
+                regions.update(dimTags)
+        curveUses: Dict[int, int] = dict()
+        for dimTag in regions:
+            for _, tag in gmsh.model.getBoundary([dimTag], combined=False, oriented=False):
+                curveUses[abs(tag)] = curveUses.get(abs(tag), 0) + 1
+
+        with BoundingBox.caching():
+            self.axisCurves = set(
+                tag for _, tag in gmsh.model.getEntities(1)
+                if any(self._isOnAxis((1, tag), axis, tolerance) for axis in self.axes))
+            for number, axis in enumerate(SymmetryReducer.AXES):
+                if axis in self.axes:
+                    self.boundaries[number] = [
+                        (1, tag) for tag in sorted(curveUses)
+                        if tag in self.axisCurves and self._isOnAxis((1, tag), axis, tolerance)]
+
+        if allShapes.isOpenCase:
+            # The open boundary is the rest of the outer boundary of the domain.
+            pecCurves = set()
+            for dimTags in allShapes.pecs.values():
+                for _, tag in gmsh.model.getBoundary(dimTags, combined=False, oriented=False):
+                    pecCurves.add(abs(tag))
+            outer = sorted(
+                tag for tag, uses in curveUses.items()
+                if uses == 1 and tag not in self.axisCurves and tag not in pecCurves)
+            allShapes.open = dict([[0, [(1, tag) for tag in outer]]]) if outer else dict()
+        return self.boundaries
+
+    def removeAxisCurves(self, boundaries: Dict[int, List[DimTag]]) -> Dict[int, List[DimTag]]:
+        """Boundaries without the cuts along the symmetry axes."""
+        return dict([
+            [num, [dimTag for dimTag in dimTags if abs(dimTag[1]) not in self.axisCurves]]
+            for num, dimTags in boundaries.items()
+        ])
+
+    def getStatistics(self) -> Dict:
+        return {
+            "axes": self.axes,
+            "center": list(self.center) if self.center is not None else None,
+            "mirrors": self.mirrors,
+            "removed": self.removed,
+        }
@@ -0,0 +1,80 @@
+from typing import Dict, List, Optional, Tuple
+
+import gmsh
+
+from . import utils
+
+DimTag = Tuple[int, int]
+
+
+class TopologyMap():
+    """Indexed entity and physical group lookups of the current model.
+
+    Built once and reused until the next utils.synchronize() or until
+    physical groups are added, which must call invalidate(). Code that
+    loads, clears or creates models without synchronizing must also call
+    invalidate(), or query gmsh directly.
+    """
+    _current: Optional['TopologyMap'] = None
+
+    entities: List[DimTag]
+    entitiesOfPhysicalGroup: Dict[DimTag, List[DimTag]]
+    physicalGroupsOfEntity: Dict[DimTag, List[DimTag]]
+    physicalNames: Dict[DimTag, str]
+    physicalGroupsByName: Dict[str, DimTag]
+
+    def __init__(self):
+        self.entities = [(dim, tag) for dim, tag in gmsh.model.getEntities()]
+        self.entitiesOfPhysicalGroup = dict()
+        self.physicalGroupsOfEntity = dict()
+        self.physicalNames = dict()
+        self.physicalGroupsByName = dict()
+
+        for dim, pgTag in gmsh.model.getPhysicalGroups():
+            pG = (dim, pgTag)
+            name = gmsh.model.getPhysicalName(dim, pgTag)
+            self.physicalNames[pG] = name
+            self.physicalGroupsByName.setdefault(name, pG)
+
+            ents = [(dim, int(tag)) for tag in gmsh.model.getEntitiesForPhysicalGroup(dim, pgTag)]
+            self.entitiesOfPhysicalGroup[pG] = ents
+            for ent in ents:
+                self.physicalGroupsOfEntity.setdefault(ent, []).append(pG)
+
+    @staticmethod
+    def current() -> 'TopologyMap':
+        if TopologyMap._current is None:
+            TopologyMap._current = TopologyMap()
+        return TopologyMap._current
+
+    @staticmethod
+    def invalidate():
+        TopologyMap._current = None
+
+    def getPhysicalGroups(self, dimTag: DimTag) -> List[DimTag]:
+        return self.physicalGroupsOfEntity.get(dimTag, [])
+
+    def getEntities(self, physicalGroup: DimTag) -> List[DimTag]:
+        return self.entitiesOfPhysicalGroup.get(physicalGroup, [])
+
+    def getPhysicalName(self, physicalGroup: DimTag) -> str:
+        return self.physicalNames[physicalGroup]
+
+    def getPhysicalGroupWithName(self, name: str) -> Optional[DimTag]:
+        return self.physicalGroupsByName.get(name)
+
+    def getEntitiesNotInPhysicalGroups(self) -> List[DimTag]:
+        return [ent for ent in self.entities if ent not in self.physicalGroupsOfEntity]
+
+    def removeEntitiesNotInPhysicalGroups(self):
+        """Removes in a single call the entities not assigned to any physical group.
+
+        Entities on the boundary of assigned ones are kept by gmsh. Only
+        the model is changed, not the OCC one, so the next synchronize
+        restores the entities.
+        """
+        gmsh.model.removeEntities(self.getEntitiesNotInPhysicalGroups(), recursive=False)
+        TopologyMap.invalidate()
+
+
+utils.onSynchronize(TopologyMap.invalidate)
@@ -0,0 +1,20 @@
+import importlib
+
+__version__ = "0.1.0"
+
+# Classes loaded on first access, so that importing the package does not
+# import gmsh or numpy.
+_LAZY_ATTRIBUTES = {
+    "Mesher": "mesher",
+    "MeshResult": "MeshResult",
+    "BatchRunner": "BatchRunner",
+    "MesherServer": "MesherServer",
+    "ParametricSweep": "ParametricSweep",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module("." + _LAZY_ATTRIBUTES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
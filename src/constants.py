@@ -0,0 +1,33 @@
+"""Values shared by the mesher and the command line.
+
+Kept apart from the modules using them, which import gmsh, so that the
+command line can build its arguments without loading any heavy module.
+"""
+
+RESOLUTION_ENGINES = ("cut", "fragment")
+AREA_ENGINES = ("occ", "mesh")
+MESH_FORMATS = ("msh", "mfem")
+SWEEP_SUMMARY_SUFFIX = ".sweep.json"
+SYMMETRY_TOLERANCE = 1e-4
+FAR_FIELD_KINDS = ("disk", "annulus", "kelvin")
+
+# Layered over DEFAULT_MESHING_OPTIONS. A value of 0 threads lets gmsh
+# use all the available cores, meshing several surfaces in parallel.
+MESHING_PRESETS = {
+    "draft": {
+        "Mesh.ElementOrder": 1,
+        "Mesh.MeshSizeFromCurvature": 12,
+        "Mesh.MeshSizeMax": 80,
+        "Mesh.Algorithm": 5,      # Delaunay
+        "General.NumThreads": 0,
+        "Mesh.MaxNumThreads2D": 0,
+    },
+    "standard": {},
+    "production": {
+        "Mesh.MeshSizeFromCurvature": 100,
+        "Mesh.MeshSizeMax": 20,
+        "Mesh.HighOrderOptimize": 2,
+        "General.NumThreads": 0,
+        "Mesh.MaxNumThreads2D": 0,
+    },
+}
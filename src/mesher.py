@@ -1,11 +1,27 @@
 from typing import Tuple
 import gmsh
+import json
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
 
 from src.AreaExporterService import AreaExporterService
+from .MeshCache import MeshCache
+from .GeometryCache import GeometryCache
 from .ShapesClassification import ShapesClassification
+from . import utils
+from . import constants
 from .BoundingBox import BoundingBox
+from .Profiler import Profiler
+from .TopologyMap import TopologyMap
+from .MfemMeshWriter import MfemMeshWriter
+from .MeshResult import MeshResult
+from .SizeFields import SizeFieldBuilder
+from .IncrementalMesher import IncrementalMesher
+from .GeometryCollector import GeometryCollector
+from .ElementBudget import ElementBudget
+from .MeshPartitioner import MeshPartitioner
+from .SymmetryReducer import SymmetryReducer
+from .FarField import FarField
 import numpy as np
 
 class Mesher():
@@ -17,6 +33,7 @@ class Mesher():
         "Mesh.ScalingFactor": 1e-3,
         "Mesh.SurfaceFaces": 1,
         "Mesh.MeshSizeMax": 40,
+        "Mesh.Algorithm": 6,          # Frontal-Delaunay
 
         "General.DrawBoundingBoxes": 1,
         "General.Axes": 1,
@@ -27,72 +44,341 @@ class Mesher():
         # "Geometry.Tolerance": 1e-3,
     }
 
-    def runFromInput(self, inputFile, runGui=False):
+    MESH_FORMATS = constants.MESH_FORMATS
+    MESHING_PRESETS = constants.MESHING_PRESETS
+
+    @staticmethod
+    def getMeshingOptions(preset: str = "standard", overrides: Optional[Dict] = None,
+                          numThreads: Optional[int] = None) -> Dict:
+        """Default options, then the preset, then the number of threads, then the overrides."""
+        if preset not in Mesher.MESHING_PRESETS:
+            raise ValueError("Unknown meshing preset: " + preset)
+        options = dict(Mesher.DEFAULT_MESHING_OPTIONS)
+        options.update(Mesher.MESHING_PRESETS[preset])
+        if numThreads is not None:
+            options["General.NumThreads"] = numThreads
+            options["Mesh.MaxNumThreads2D"] = numThreads
+        if overrides is not None:
+            options.update(overrides)
+        return options
+
+    def __init__(self, profiler: Optional[Profiler] = None):
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+        self.report = dict()
+
+    def runFromInput(self, inputFile, runGui=False, outputFolder=None,
+                     cache: Optional[MeshCache] = None,
+                     geometryCache: Optional[GeometryCache] = None,
+                     resolutionEngine: str = "cut",
+                     profile: bool = False,
+                     preset: str = "standard",
+                     meshingOptions: Optional[Dict] = None,
+                     numThreads: Optional[int] = None,
+                     areaEngine: str = "occ",
+                     meshFormat: str = "msh",
+                     exportVtk: bool = False,
+                     sizeFields: Optional[Dict] = None,
+                     incremental: bool = False,
+                     elementBudget: Optional[Dict] = None,
+                     partition: Optional[Dict] = None,
+                     symmetry: Optional[Dict] = None,
+                     farField: Optional[Dict] = None) -> List[str]:
         caseName = Path(inputFile).stem
+        outputName = caseName
+        if outputFolder is not None:
+            outputName = str(Path(outputFolder) / caseName)
+        if meshFormat not in Mesher.MESH_FORMATS:
+            raise ValueError("Unknown mesh format: " + meshFormat)
+        if profile and not self.profiler.enabled:
+            self.profiler = Profiler()
+        meshingOptions = self.getMeshingOptions(preset, meshingOptions, numThreads)
+
+        if cache is not None and not runGui:
+            cacheKey = cache.computeKey(inputFile, {
+                "meshingOptions": meshingOptions,
+                "resolutionEngine": resolutionEngine,
+                "areaEngine": areaEngine,
+                "meshFormat": meshFormat,
+                "exportVtk": exportVtk,
+                "sizeFields": sizeFields,
+                "incremental": incremental,
+                "elementBudget": elementBudget,
+                "partition": partition,
+                "symmetry": symmetry,
+                "farField": farField,
+            })
+            with self.profiler.phase("cacheRestore"):
+                outputs = cache.restore(cacheKey, outputName)
+            if outputs is not None:
+                return outputs + self._exportProfile(outputName)
 
+        incrementalMesher = IncrementalMesher(outputName) if incremental else None
+        budget = ElementBudget(**elementBudget) if elementBudget is not None else None
+        symmetryReducer = SymmetryReducer(**symmetry) if symmetry is not None else None
+        farFieldTruncation = FarField(**farField) if farField is not None else None
         gmsh.initialize()
-        self.meshFromStep(inputFile, caseName, self.DEFAULT_MESHING_OPTIONS)
-        self.exportGeometryAreas(caseName)
-        gmsh.write(caseName + '.msh')
-        gmsh.write(caseName + '.vtk') # vtk export is just for debugging. 
+        self.meshFromStep(
+            inputFile, caseName, meshingOptions,
+            geometryCache=geometryCache, resolutionEngine=resolutionEngine,
+            sizeFields=sizeFields, incremental=incrementalMesher, elementBudget=budget,
+            symmetry=symmetryReducer, farField=farFieldTruncation)
+        outputs = self.exportResults(outputName, areaEngine, meshFormat, exportVtk, partition)
         if runGui:
             gmsh.fltk.run()
 
         gmsh.finalize()
 
-    def meshFromStep(self, inputFile: str, caseName: str, meshingOptions=None):
-        if meshingOptions is None:
-            meshingOptions = Mesher.DEFAULT_MESHING_OPTIONS
+        if incrementalMesher is not None:
+            outputs += incrementalMesher.getOutputs()
+        outputs += self._exportReport(outputName)
+        if cache is not None and not runGui:
+            cache.store(cacheKey, outputs, outputName)
+        return outputs + self._exportProfile(outputName)
+
+    def exportResults(self, outputName: str, areaEngine: str = "occ", meshFormat: str = "msh",
+                      exportVtk: bool = False, partition: Optional[Dict] = None) -> List[str]:
+        """Writes the areas and the mesh of the current model, partitioned if asked. Returns the files."""
+        with self.profiler.phase("areaExport"):
+            self.exportGeometryAreas(outputName, areaEngine)
+        partitioner = None
+        if partition is not None:
+            partitioner = MeshPartitioner(**partition)
+            with self.profiler.phase("partition"):
+                self.report["partition"] = partitioner.partition()
+        with self.profiler.phase("write"):
+            outputs = self.writeMesh(outputName, meshFormat, exportVtk, partitioner)
+        outputs.insert(1, outputName + '.areas.json')
+        return outputs
+
+    @staticmethod
+    def writeMesh(outputName: str, meshFormat: str = "msh", exportVtk: bool = False,
+                  partitioner: Optional[MeshPartitioner] = None) -> List[str]:
+        """partitioner, when given, must have partitioned the mesh already."""
+        if meshFormat == "mfem":
+            outputs = [MfemMeshWriter().write(outputName + '.mesh')]
+            if partitioner is not None:
+                outputs.append(partitioner.writeMfemPartitioning(outputName + '.partitioning'))
+        else:
+            gmsh.write(outputName + '.msh')
+            if partitioner is not None and partitioner.splitFiles:
+                outputs = partitioner.getSplitFileNames(outputName)
+            else:
+                outputs = [outputName + '.msh']
+        if exportVtk:
+            gmsh.write(outputName + '.vtk') # vtk export is just for debugging.
+            outputs.append(outputName + '.vtk')
+        return outputs
+
+    def meshToArrays(self, inputFile: str, caseName: Optional[str] = None,
+                     **meshOptions) -> MeshResult:
+        """Meshes inputFile and returns the mesh as arrays, without writing files.
+
+        meshOptions are passed to meshFromStep. gmsh is initialized and
+        finalized here, so it must not be already initialized.
+        """
+        if caseName is None:
+            caseName = Path(inputFile).stem
+        gmsh.initialize()
+        try:
+            self.meshFromStep(inputFile, caseName, **meshOptions)
+            return MeshResult()
+        finally:
+            gmsh.finalize()
+
+    def _exportReport(self, outputName: str) -> List[str]:
+        if len(self.report) == 0:
+            return []
+        fileName = outputName + ".report.json"
+        with open(fileName, 'w') as f:
+            json.dump(self.report, f, indent=3)
+        return [fileName]
+
+    def _exportProfile(self, outputName: str) -> List[str]:
+        if not self.profiler.enabled:
+            return []
+        return [self.profiler.exportToJson(outputName)]
+
+    def meshFromStep(self, inputFile: str, caseName: str, meshingOptions=None,
+                     geometryCache: Optional[GeometryCache] = None,
+                     resolutionEngine: str = "cut",
+                     preset: str = "standard",
+                     numThreads: Optional[int] = None,
+                     sizeFields: Optional[Dict] = None,
+                     incremental: Optional[IncrementalMesher] = None,
+                     elementBudget: Optional[ElementBudget] = None,
+                     symmetry: Optional[SymmetryReducer] = None,
+                     farField: Optional[FarField] = None):
+        """sizeFields, when given, enables the size fields with these parameter overrides.
+        incremental, when given, reuses the mesh stored by a previous run where the model did not change.
+        elementBudget, when given, scales the mesh size until the mesh fits the budget.
+        symmetry, when given, meshes only the part of the domain left by its symmetry axes.
+        farField, when given, replaces the far field disk of open problems without OpenBoundary.
+        """
+        if incremental is not None and elementBudget is not None:
+            raise ValueError("Incremental meshing and element budgets can not be combined.")
+        if symmetry is not None and farField is not None and farField.kind == "kelvin":
+            raise ValueError("Kelvin far fields can not be combined with symmetry.")
+        meshingOptions = self.getMeshingOptions(preset, meshingOptions, numThreads)
 
         gmsh.model.add(caseName)
-        allShapes = ShapesClassification(
-            gmsh.model.occ.importShapes(inputFile, highestDimOnly=False)
-        )
+        TopologyMap.invalidate()
+        with self.profiler.instrumentBooleans():
+            if geometryCache is None:
+                self.buildGeometry(inputFile, resolutionEngine, incremental, symmetry, farField)
+            else:
+                geometryKey = geometryCache.computeKey(
+                    inputFile, Mesher.getGeometryOptions(resolutionEngine, symmetry, farField))
+                with self.profiler.phase("geometryCacheLoad"):
+                    isCached = geometryCache.load(geometryKey)
+                    if isCached:
+                        self._removeEntitiesNotInPhysicalGroups()
+                if not isCached:
+                    self.buildGeometry(inputFile, resolutionEngine, incremental, symmetry, farField)
+                    with self.profiler.phase("geometryCacheStore"):
+                        geometryCache.store(geometryKey)
+        if farField is not None and farField.kind == "kelvin":
+            FarField.applyPeriodicity()
+
+        self.generateMesh(meshingOptions, sizeFields, incremental, elementBudget, farField, symmetry)
+
+    @staticmethod
+    def getGeometryOptions(resolutionEngine: str = "cut", symmetry: Optional[SymmetryReducer] = None,
+                           farField: Optional[FarField] = None) -> Dict:
+        """Options changing the geometry meshFromStep builds, the ones its geometry cache keys use."""
+        geometryOptions = {"resolutionEngine": resolutionEngine}
+        if symmetry is not None:
+            geometryOptions["symmetry"] = {
+                "tolerance": symmetry.tolerance, "axes": symmetry.allowedAxes,
+                "allowRemovals": symmetry.allowRemovals}
+        if farField is not None:
+            geometryOptions["farField"] = {
+                "kind": farField.kind, "radiusFactor": farField.radiusFactor,
+                "growthRate": farField.growthRate}
+        return geometryOptions
+
+    def generateMesh(self, meshingOptions: Dict, sizeFields: Optional[Dict] = None,
+                     incremental: Optional[IncrementalMesher] = None,
+                     elementBudget: Optional[ElementBudget] = None,
+                     farField: Optional[FarField] = None,
+                     symmetry: Optional[SymmetryReducer] = None) -> Optional[SizeFieldBuilder]:
+        """Meshes the physical model of the current model. Returns the size fields applied, if any.
+
+        farField and symmetry are the ones the model was built with, their gradings are added to the size fields.
+        """
+        self.setMeshingOptions(meshingOptions)
+        sizeFieldBuilder = None
+        if sizeFields is not None or symmetry is not None:
+            with self.profiler.phase("sizeFields"):
+                sizeFieldBuilder = SizeFieldBuilder(sizeFields)
+                sizeFieldBuilder.apply(farField, symmetry, groups=sizeFields is not None)
+
+        # --- Mesh generation ---
+        
+        with self.profiler.phase("meshGeneration"):
+            if incremental is not None:
+                incremental.generate(meshingOptions)
+            elif elementBudget is not None:
+                self.report["elementBudget"] = elementBudget.generate()
+            else:
+                gmsh.model.mesh.generate(2)
+        self.profiler.recordMeshStatistics()
+
+        if incremental is not None:
+            with self.profiler.phase("incrementalStore"):
+                incremental.store(meshingOptions)
+            self.report["incremental"] = incremental.statistics
+        return sizeFieldBuilder
+
+    @staticmethod
+    def setMeshingOptions(meshingOptions: Dict):
+        for [opt, val] in meshingOptions.items():
+            if isinstance(val, str):
+                gmsh.option.setString(opt, val)
+            else:
+                gmsh.option.setNumber(opt, val)
+
+    def buildGeometry(self, inputFile: str, resolutionEngine: str = "cut",
+                      incremental: Optional[IncrementalMesher] = None,
+                      symmetry: Optional[SymmetryReducer] = None,
+                      farField: Optional[FarField] = None):
+        collector = GeometryCollector()
+        with self.profiler.phase("import"):
+            shapes = gmsh.model.occ.importShapes(inputFile, highestDimOnly=False)
+        collector.record("import")
+        if incremental is not None:
+            utils.synchronize()
+            incremental.recordLabels(shapes)
+        with self.profiler.phase("classification"):
+            allShapes = ShapesClassification(shapes, farField=farField)
+        collector.record("classification")
+        if allShapes.labelConflicts:
+            self.report["labelConflicts"] = allShapes.labelConflicts
+        if symmetry is not None:
+            with self.profiler.phase("symmetryDetection"):
+                symmetry.detect(allShapes)
 
         # --- Geometry manipulation ---
-        allShapes.ensureDielectricsDoNotOverlap()
-        allShapes.removeConductorsFromDielectrics()
-        vacuumDomain = allShapes.buildVacuumDomain()
+        with self.profiler.phase("booleans"):
+            allShapes.resolveOverlaps(resolutionEngine)
+            vacuumDomain = allShapes.buildVacuumDomain()
+        collector.record("booleans")
+        if farField is not None and farField.center is not None:
+            self.report["farField"] = farField.getStatistics()
+        if symmetry is not None:
+            with self.profiler.phase("symmetryCut"):
+                symmetry.reduce(allShapes, vacuumDomain)
+            collector.record("symmetryCut")
+            self.report["symmetry"] = symmetry.getStatistics()
         # -- Boundaries
+        with self.profiler.phase("physicalModel"):
+            self.buildPhysicalModelFromShapes(allShapes, vacuumDomain, symmetry)
+        collector.record("physicalModel")
+
+        # -- Intermediate entities left in OpenCASCADE
+        with self.profiler.phase("geometryCleanup"):
+            self.report["geometryCleanup"] = collector.collect()
+
+    def buildPhysicalModelFromShapes(self, allShapes: ShapesClassification, vacuumDomain,
+                                     symmetry: Optional[SymmetryReducer] = None):
         pecBoundaries = self.extractBoundaries(allShapes.pecs)
+        symmetryBoundaries = None
+        if symmetry is not None:
+            pecBoundaries = symmetry.removeAxisCurves(pecBoundaries)
+            symmetryBoundaries = symmetry.boundaries
 
         self.buildPhysicalModel(
             pecBoundaries, 
             allShapes.dielectrics,
             allShapes.open,
-            vacuumDomain
+            vacuumDomain,
+            symmetryBoundaries,
+            allShapes.openBoundaryLabel,
+            allShapes.farField.groups
         )
-        
-        for [opt, val] in meshingOptions.items():
-            gmsh.option.setNumber(opt, val)
 
-        # --- Mesh generation ---
-        
-        gmsh.model.mesh.generate(2)
-
-    def exportGeometryAreas(self, caseName:str):
+    def exportGeometryAreas(self, caseName:str, areaEngine:str="occ"):
         exporter = AreaExporterService()
-        exporter.addPhysicalModelOfDimension(dimension=2)
-        exporter.addPhysicalModelOfDimension(dimension=1)
+        exporter.addPhysicalModel(areaEngine)
         exporter.exportToJson(caseName)
             
 
-    def buildPhysicalModel(self, pecBoundaries, dielectrics, openRegion, vacuumDomain):
+    def buildPhysicalModel(self, pecBoundaries, dielectrics, openRegion, vacuumDomain,
+                           symmetryBoundaries=None, openBoundaryLabel="OpenBoundary_",
+                           farFieldGroups=None):
         self._addPhysicalGroup("Conductor_", pecBoundaries, dimensionTag=1)
-        self._addPhysicalGroup("OpenBoundary_", openRegion, dimensionTag=1)
+        self._addPhysicalGroup(openBoundaryLabel, openRegion, dimensionTag=1)
+        if symmetryBoundaries is not None:
+            self._addPhysicalGroup("Symmetry_", symmetryBoundaries, dimensionTag=1)
+        if farFieldGroups is not None:
+            for label, (dimensionTag, groups) in farFieldGroups.items():
+                self._addPhysicalGroup(label, groups, dimensionTag=dimensionTag)
         self._addPhysicalGroup("Vacuum_", vacuumDomain, dimensionTag=2)
         self._addPhysicalGroup("Dielectric_", dielectrics, dimensionTag=2)
+        self._removeEntitiesNotInPhysicalGroups()
 
-        allEnts = gmsh.model.get_entities()
-        entsInPG = []
-        for pG in gmsh.model.get_physical_groups():
-            ents = gmsh.model.getEntitiesForPhysicalGroup(pG[0], pG[1])
-            for ent in ents:
-                entsInPG.append((pG[0], ent))
-        
-        entsNotInPG = [x for x in allEnts if x not in entsInPG]
-        gmsh.model.remove_entities(entsNotInPG, recursive=False)
-        gmsh.model.occ.synchronize()
+    def _removeEntitiesNotInPhysicalGroups(self):
+        TopologyMap.current().removeEntitiesNotInPhysicalGroups()
+        utils.synchronize()
 
 
     def _addPhysicalGroup(self, physicalGroupName:str, objsDict:Dict, dimensionTag=1):
@@ -100,12 +386,13 @@ class Mesher():
             name = physicalGroupName + str(num)
             tags = [x[1] for x in objs]
             gmsh.model.addPhysicalGroup(dimensionTag, tags, name=name)
+        TopologyMap.invalidate()
             
 
     @staticmethod
     def getPhysicalGroupWithName(name: str):
-        pGs = gmsh.model.getPhysicalGroups()
-        for pG in pGs:
+        """Queries gmsh directly, so it is valid for any model, e.g. one loaded with gmsh.open."""
+        for pG in gmsh.model.getPhysicalGroups():
             if gmsh.model.getPhysicalName(*pG) == name:
                 return pG
 
@@ -143,11 +430,11 @@ def print_entity_info(dim, tag):
     print(f"Bounding box: xmin={bbox[0]}, ymin={bbox[1]}, zmin={bbox[2]}, xmax={bbox[3]}, ymax={bbox[4]}, zmax={bbox[5]}")
     
     # Physical groups
-    phys_groups = []
-    for d in range(4):
-        for pg in gmsh.model.getPhysicalGroups(d):
-            if tag in gmsh.model.getEntitiesForPhysicalGroup(pg[0], pg[1]):
-                phys_groups.append((pg[0], pg[1], gmsh.model.getPhysicalName(pg[0], pg[1])))
+    topology = TopologyMap()
+    phys_groups = [
+        (pg[0], pg[1], topology.getPhysicalName(pg))
+        for pg in topology.getPhysicalGroups((dim, tag))
+    ]
     print(f"Physical groups: {phys_groups if phys_groups else '(none)'}")
     
     # Parent entities
@@ -1,5 +1,31 @@
+import gmsh
 import numpy as np
-from typing import List, Union
+from typing import Callable, List, Union
+
+_synchronizeCallbacks: List[Callable[[], None]] = []
+
+def onSynchronize(callback: Callable[[], None]):
+    """Registers a callback run after every synchronize() call, used to drop caches of the OCC model."""
+    _synchronizeCallbacks.append(callback)
+
+def synchronize():
+    gmsh.model.occ.synchronize()
+    for callback in _synchronizeCallbacks:
+        callback()
+
+def optimizeHighOrder():
+    """Optimizes a mesh raised with setOrder as generate does after its own elevation.
+
+    The methods are those of the current Mesh.HighOrderOptimize value.
+    """
+    methods = {
+        1: ["HighOrder"],
+        2: ["HighOrderElastic", "HighOrder"],
+        3: ["HighOrderElastic"],
+        4: ["HighOrderFastCurving"],
+    }
+    for method in methods.get(int(gmsh.option.getNumber("Mesh.HighOrderOptimize")), []):
+        gmsh.model.mesh.optimize(method)
 
 def assertListOfFloatsAlmostEqual(realValues, expectedValues, tolerance = 0.0000001):
     if len(realValues) != len(expectedValues):
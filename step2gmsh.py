@@ -1,13 +1,103 @@
 #!/usr/bin/env python
 
+import os
+import json
 import sys
 import argparse
-from src.mesher import Mesher
-    
-def launcher(fn):
+# Only modules which do not import gmsh or numpy are loaded here, the
+# mesher is imported when meshing starts. See benchmarks/import_time.py.
+from src import constants
+from src.BatchRunner import BatchRunner
+from src.MeshCache import MeshCache
+from src.GeometryCache import GeometryCache
+from src.MesherServer import MesherServer
+
+def launcher(fn, outputFolder=None, **runOptions):
+    from src.mesher import Mesher
     mesher = Mesher()
-    mesher.runFromInput(fn)
-    
+    return mesher.runFromInput(fn, outputFolder=outputFolder, **runOptions)
+
+
+def batchLauncher(source, outputFolder=".", numWorkers=None, summaryFile=None, **runOptions):
+    inputFiles = BatchRunner.collectInputs(source)
+    if len(inputFiles) == 0:
+        raise ValueError("No step files found in: " + source)
+
+    runner = BatchRunner(outputFolder, numWorkers, runOptions)
+    summary = runner.run(inputFiles)
+    runner.exportSummary(summary, summaryFile)
+    return summary
+
+
+def sweepLauncher(fn, gridFile, outputFolder=".", summaryFile=None, **sweepOptions):
+    from src.ParametricSweep import ParametricSweep
+    sweep = ParametricSweep(**sweepOptions)
+    summary = sweep.run(fn, ParametricSweep.loadGrid(gridFile), outputFolder)
+    if summaryFile is None:
+        summaryFile = os.path.join(
+            outputFolder, os.path.splitext(os.path.basename(fn))[0] + constants.SWEEP_SUMMARY_SUFFIX)
+    sweep.exportSummary(summary, summaryFile)
+    return summary
+
+
+def sweepOptions(runOptions):
+    """Run options which apply to sweeps, which do not use the caches."""
+    return dict([
+        [name, value] for name, value in runOptions.items()
+        if name not in ("cache", "geometryCache", "profile", "incremental")
+    ])
+
+
+def elementBudgetOptions(maxElements, maxDofs):
+    if maxElements is None and maxDofs is None:
+        return None
+    return {"maxElements": maxElements, "maxDofs": maxDofs}
+
+
+def partitionOptions(numParts, splitFiles):
+    if numParts is None:
+        return None
+    return {"numParts": numParts, "splitFiles": splitFiles}
+
+
+def symmetryOptions(symmetry, tolerance, allowRemovals):
+    if not symmetry:
+        return None
+    return {"tolerance": tolerance, "allowRemovals": allowRemovals}
+
+
+def farFieldOptions(kind, radiusFactor, growthRate):
+    if kind is None:
+        return None
+    options = {"kind": kind}
+    if radiusFactor is not None:
+        options["radiusFactor"] = radiusFactor
+    if growthRate is not None:
+        options["growthRate"] = growthRate
+    return options
+
+
+def parseOptions(options):
+    parsed = {}
+    for option in options:
+        name, sep, value = option.partition('=')
+        if not sep:
+            raise ValueError("Options must be given as NAME=VALUE: " + option)
+        try:
+            parsed[name.strip()] = float(value)
+        except ValueError:
+            parsed[name.strip()] = value.strip()
+    return parsed
+
+
+def loadSizeFields(fileName):
+    if fileName is None:
+        return None
+    if fileName == "":
+        return {}
+    with open(fileName, 'r') as f:
+        return json.load(f)
+
 
 if __name__ == '__main__':
     print("-- Launching step2gmsh")
@@ -19,13 +109,271 @@ if __name__ == '__main__':
         "Please look at README.md and LICENSE for more info at:\n"
         " https://github.com/OpenSEMBA/step2gmsh"
     )
-    parser.add_argument(
+    inputs = parser.add_mutually_exclusive_group()
+    inputs.add_argument(
         "-i",
         "--input",
         help="step input file",
-        type=argparse.FileType('r'),
-        required=True
+        type=argparse.FileType('r')
+    )
+    inputs.add_argument(
+        "-b",
+        "--batch",
+        help="directory, glob pattern or manifest file listing step input files"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="folder where output files are written",
+        default=None
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="number of worker processes in batch mode, defaults to the number of CPUs",
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--summary",
+        help="batch or sweep summary file, defaults to " + BatchRunner.SUMMARY_FILE_NAME
+             + " or <case>" + constants.SWEEP_SUMMARY_SUFFIX + " in the output folder",
+        default=None
+    )
+    parser.add_argument(
+        "--serve",
+        help="run as a server keeping warm mesher workers, reading JSON jobs from a Unix socket "
+             "at the given path or, without path, from stdin",
+        nargs="?",
+        const="-",
+        default=None
+    )
+    parser.add_argument(
+        "--queue-size",
+        help="maximum number of jobs waiting for a worker in server mode",
+        type=int,
+        default=MesherServer.DEFAULT_MAX_QUEUE_SIZE
+    )
+    parser.add_argument(
+        "--sweep",
+        help="JSON file with a grid of parameters, lists of gmsh option or geometry parameter values, "
+             "to mesh the input for each of their combinations; the mesh and geometry caches are not used",
+        default=None
+    )
+    parser.add_argument(
+        "--resolution-engine",
+        help="how overlapping conductors and dielectrics are resolved",
+        choices=constants.RESOLUTION_ENGINES,
+        default="cut"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        help="mesh output format, gmsh MSH 2.2 or native MFEM",
+        choices=constants.MESH_FORMATS,
+        default="msh"
+    )
+    parser.add_argument(
+        "--vtk",
+        help="also write a .vtk file of the mesh for visualization",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--size-fields",
+        help="grade the mesh size with the distance to conductors and material interfaces. "
+             "Optionally takes a JSON file with the parameters per label",
+        nargs="?",
+        const="",
+        default=None
+    )
+    parser.add_argument(
+        "--incremental",
+        help="reuse the mesh of the previous run of the case on the parts of the model that did not change",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--max-elements",
+        help="scale the mesh size until the mesh has at most this number of 2D elements",
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--max-dofs",
+        help="scale the mesh size until the mesh has at most this number of nodes at its element order",
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--partitions",
+        help="partition the mesh in this number of parts, written as element partition tags of the .msh "
+             "file or as a .partitioning file next to the MFEM mesh",
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--split-partitions",
+        help="write each part of a partitioned .msh mesh to its own <case>_<part>.msh file",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--symmetry",
+        help="mesh only half or a quarter of the domain when the cross-section is mirror symmetric about "
+             "the x or y axis through its center, adding Symmetry_N boundaries on the cuts",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--symmetry-tolerance",
+        help="relative tolerance, to the size of the model, of the symmetry detection",
+        type=float,
+        default=constants.SYMMETRY_TOLERANCE
+    )
+    parser.add_argument(
+        "--symmetry-allow-removals",
+        help="also reduce about axes where a shape is the image of another one, e.g. two wires, "
+             "removing one of them from the mesh",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--far-field",
+        help="far field of open problems without OpenBoundary: the default large disk, a closer graded "
+             "annulus with a RobinBoundary_0 boundary, or a Kelvin-transformed exterior disk",
+        choices=constants.FAR_FIELD_KINDS,
+        default=None
+    )
+    parser.add_argument(
+        "--far-field-radius",
+        help="radius of the far field disk, relative to the diagonal of the model",
+        type=float,
+        default=None
+    )
+    parser.add_argument(
+        "--far-field-growth",
+        help="ratio between the sizes of consecutive elements from the near region to the far field circle",
+        type=float,
+        default=None
+    )
+    parser.add_argument(
+        "--area-engine",
+        help="how areas are computed, from the OCC geometry or integrating over the mesh",
+        choices=constants.AREA_ENGINES,
+        default="occ"
+    )
+    parser.add_argument(
+        "-p",
+        "--preset",
+        help="meshing preset trading mesh quality for meshing time",
+        choices=list(constants.MESHING_PRESETS.keys()),
+        default="standard"
+    )
+    parser.add_argument(
+        "-t",
+        "--threads",
+        help="number of threads used by gmsh, 0 uses all the available cores",
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--option",
+        help="gmsh option overriding the preset, as NAME=VALUE. Can be repeated",
+        action="append",
+        default=[]
+    )
+    parser.add_argument(
+        "--profile",
+        help="write wall time, peak memory, boolean operation and mesh statistics to <case>.profile.json",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--cache",
+        help="read and write the mesh and geometry caches, which are not used by default",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--clear-cache",
+        help="remove all mesh and geometry cache entries",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="mesh cache folder, defaults to $STEP2GMSH_CACHE_DIR or ~/.cache/step2gmsh",
+        default=None
+    )
+    parser.add_argument(
+        "--cache-size",
+        help="maximum mesh cache size in MB",
+        type=float,
+        default=MeshCache.DEFAULT_MAX_SIZE / 1024**2
+    )
+    parser.add_argument(
+        "--geometry-cache-size",
+        help="maximum geometry cache size in MB, kept apart from --cache-size",
+        type=float,
+        default=GeometryCache.DEFAULT_MAX_SIZE / 1024**2
     )
 
     args = parser.parse_args()
-    launcher(args.input.name)
+    if args.input is None and args.batch is None and args.serve is None and not args.clear_cache:
+        parser.error("one of the arguments -i/--input -b/--batch is required")
+    if args.sweep is not None and (args.profile or args.incremental):
+        parser.error("--profile and --incremental can not be combined with --sweep")
+    if args.serve not in (None, "-") and not MesherServer.supportsUnixSockets():
+        parser.error("--serve PATH needs Unix sockets, which this platform does not support; "
+                     "use --serve - to read jobs from stdin")
+
+    # The cache folders are only created when the caches are used.
+    if args.cache or args.clear_cache:
+        meshCache = MeshCache(args.cache_dir, int(args.cache_size * 1024**2))
+        geometryCache = GeometryCache(
+            meshCache.getGeometryFolder(), int(args.geometry_cache_size * 1024**2))
+    if args.clear_cache:
+        meshCache.clear()
+        geometryCache.clear()
+
+    runOptions = {
+        "resolutionEngine": args.resolution_engine,
+        "profile": args.profile,
+        "preset": args.preset,
+        "meshingOptions": parseOptions(args.option),
+        "numThreads": args.threads,
+        "areaEngine": args.area_engine,
+        "meshFormat": args.format,
+        "exportVtk": args.vtk,
+        "sizeFields": loadSizeFields(args.size_fields),
+        "incremental": args.incremental,
+        "elementBudget": elementBudgetOptions(args.max_elements, args.max_dofs),
+        "partition": partitionOptions(args.partitions, args.split_partitions),
+        "symmetry": symmetryOptions(args.symmetry, args.symmetry_tolerance, args.symmetry_allow_removals),
+        "farField": farFieldOptions(args.far_field, args.far_field_radius, args.far_field_growth),
+    }
+    if args.cache:
+        runOptions["cache"] = meshCache
+        runOptions["geometryCache"] = geometryCache
+
+    if args.serve is not None:
+        with MesherServer(args.jobs, args.queue_size, runOptions) as server:
+            if args.serve == "-":
+                server.serveStdin()
+            else:
+                server.serveUnixSocket(args.serve)
+    elif args.batch is not None:
+        summary = batchLauncher(
+            args.batch,
+            outputFolder=args.output if args.output else ".",
+            numWorkers=args.jobs,
+            summaryFile=args.summary,
+            **runOptions
+        )
+        print("-- {} of {} cases meshed".format(summary["succeeded"], summary["total"]))
+        if summary["failed"] > 0:
+            sys.exit(1)
+    elif args.input is not None and args.sweep is not None:
+        summary = sweepLauncher(
+            args.input.name,
+            args.sweep,
+            outputFolder=args.output if args.output else ".",
+            summaryFile=args.summary,
+            **sweepOptions(runOptions)
+        )
+        print("-- {} sweep points meshed in {:.2f} s".format(len(summary["points"]), summary["wallTime"]))
+    elif args.input is not None:
+        launcher(args.input.name, outputFolder=args.output, **runOptions)
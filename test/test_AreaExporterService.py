@@ -43,3 +43,50 @@ class testAreaExporterService(unittest.TestCase):
         areaElements = self.sumAreasFromList(internalElements)
 
         self.assertAlmostEqual(totalArea, areaElements)
+
+    def testMeshEngineAggregatesPerPhysicalGroup(self):
+        caseName = 'five_wires'
+        Mesher().meshFromStep(self.inputFileFromCaseName(caseName), caseName)
+        areaExporter = AreaExporterService()
+        areaExporter.addPhysicalModel(engine="mesh")
+        geometries = areaExporter.computedAreas['geometries']
+
+        names = [geometry['geometry'] for geometry in geometries]
+        self.assertEqual(len(names), len(set(names)))
+
+        internalElements = []
+        for geometry in geometries:
+            if geometry['geometry'] == "Conductor_0":
+                totalArea = geometry['area']
+                self.assertIn('perimeter', geometry)
+            else:
+                internalElements.append(geometry['area'])
+        areaElements = self.sumAreasFromList(internalElements)
+
+        self.assertAlmostEqual(1.0, areaElements / totalArea, places=3)
+
+    def testMeshEngineMatchesOccEngine(self):
+        tolerance = 1e-3
+        for caseName in ('partially_filled_coax', 'five_wires'):
+            gmsh.clear()
+            Mesher().meshFromStep(self.inputFileFromCaseName(caseName), caseName)
+            occExporter = AreaExporterService()
+            occExporter.addPhysicalModel(engine="occ")
+            meshExporter = AreaExporterService()
+            meshExporter.addPhysicalModel(engine="mesh")
+
+            occAreas = {}
+            for geometry in occExporter.computedAreas['geometries']:
+                name = geometry['geometry']
+                occAreas[name] = occAreas.get(name, 0.0) + geometry['area']
+            meshGeometries = meshExporter.computedAreas['geometries']
+            self.assertEqual(sorted(occAreas), sorted(g['geometry'] for g in meshGeometries))
+            for geometry in meshGeometries:
+                name = geometry['geometry']
+                self.assertLess(abs(geometry['area'] / occAreas[name] - 1.0), tolerance, name)
+                if 'perimeter' in geometry:
+                    pG = next(pG for pG in gmsh.model.getPhysicalGroups(1)
+                              if gmsh.model.getPhysicalName(*pG) == name)
+                    length = sum(gmsh.model.occ.getMass(1, tag)
+                                 for tag in gmsh.model.getEntitiesForPhysicalGroup(*pG))
+                    self.assertLess(abs(geometry['perimeter'] / length - 1.0), tolerance, name)
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from src.BatchRunner import BatchRunner
+
+
+class testBatchRunner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def test_collect_inputs_from_directory(self):
+        inputs = BatchRunner.collectInputs(self.testdataPath)
+        names = [os.path.basename(f) for f in inputs]
+        self.assertIn('five_wires.step', names)
+        self.assertIn('empty_coax.step', names)
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_collect_inputs_from_glob(self):
+        inputs = BatchRunner.collectInputs(self.testdataPath + '*_coax/*.step')
+        names = sorted(os.path.basename(f) for f in inputs)
+        self.assertEqual(
+            names,
+            ['empty_coax.step', 'nested_coax.step',
+             'partially_filled_coax.step', 'two_wires_coax.step']
+        )
+
+    def test_collect_inputs_from_manifest(self):
+        with tempfile.TemporaryDirectory() as folder:
+            manifest = os.path.join(folder, 'cases.txt')
+            with open(manifest, 'w') as f:
+                f.write("# cases to mesh\n")
+                f.write(self.inputFileFromCaseName('empty_coax') + "\n")
+                f.write("\n")
+                f.write("relative/case.step\n")
+
+            inputs = BatchRunner.collectInputs(manifest)
+
+        self.assertEqual(len(inputs), 2)
+        self.assertEqual(inputs[0], self.inputFileFromCaseName('empty_coax'))
+        self.assertEqual(inputs[1], os.path.join(folder, 'relative/case.step'))
+
+    def test_repeated_case_names_are_rejected(self):
+        with self.assertRaises(ValueError):
+            BatchRunner().run(['a/case.step', 'b/case.step'])
+
+    def test_broken_case_does_not_stop_batch(self):
+        with tempfile.TemporaryDirectory() as folder:
+            runner = BatchRunner(outputFolder=folder, numWorkers=2)
+            summary = runner.run([
+                self.inputFileFromCaseName('empty_coax'),
+                os.path.join(folder, 'missing_case.step'),
+            ])
+            summaryFile = runner.exportSummary(summary)
+
+            self.assertEqual(summary['total'], 2)
+            self.assertEqual(summary['succeeded'], 1)
+            self.assertEqual(summary['failed'], 1)
+
+            ok, failed = summary['cases']
+            self.assertEqual(ok['status'], 'ok')
+            self.assertEqual(failed['status'], 'failed')
+            self.assertIsNotNone(failed['error'])
+            for output in ok['outputs']:
+                self.assertTrue(os.path.isfile(output), output)
+            self.assertTrue(os.path.isfile(summaryFile))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from src.Benchmark import Benchmark
+
+
+class testBenchmark(unittest.TestCase):
+    @staticmethod
+    def results(total, meshTime, elements):
+        return {
+            "cases": {
+                "five_wires": {
+                    "phases": {"import": 0.01, "meshGeneration": meshTime},
+                    "total": total,
+                    "peakRss": 100,
+                    "nodes": 10,
+                    "elements": elements,
+                }
+            }
+        }
+
+    def test_no_regressions_within_tolerance(self):
+        baseline = self.results(1.0, 0.5, 100)
+        current = self.results(1.1, 0.55, 105)
+        self.assertEqual(Benchmark.compare(baseline, current, tolerance=0.2), [])
+
+    def test_regressions_are_flagged(self):
+        baseline = self.results(1.0, 0.5, 100)
+        current = self.results(1.5, 0.8, 150)
+        regressions = Benchmark.compare(baseline, current, tolerance=0.2)
+        self.assertEqual(len(regressions), 3)
+        self.assertTrue(any("meshGeneration" in r for r in regressions))
+        self.assertTrue(any("elements" in r for r in regressions))
+
+    def test_short_phases_are_not_compared(self):
+        baseline = self.results(1.0, 0.5, 100)
+        current = self.results(1.0, 0.5, 100)
+        current["cases"]["five_wires"]["phases"]["import"] = 0.04
+        self.assertEqual(Benchmark.compare(baseline, current, minimumTime=0.05), [])
+
+    def test_save_and_load(self):
+        results = self.results(1.0, 0.5, 100)
+        with tempfile.TemporaryDirectory() as folder:
+            fileName = os.path.join(folder, 'baseline.json')
+            Benchmark.exportToJson(results, fileName)
+            self.assertEqual(Benchmark.loadFromJson(fileName), results)
+
+    def test_run_single_case(self):
+        testdataPath = os.path.dirname(os.path.realpath(__file__)) + '/../testData/'
+        results = Benchmark(testdataPath, ['empty_coax'], repetitions=1).run()
+        result = results["cases"]["empty_coax"]
+        self.assertGreater(result["elements"], 0)
+        self.assertIn("meshGeneration", result["phases"])
+
+
+if __name__ == '__main__':
+    unittest.main()
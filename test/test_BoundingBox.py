@@ -1,12 +1,15 @@
 from typing import List, Dict, Tuple
 import unittest
 import gmsh
-from src.BoundingBox import BoundingBox
+from src.BoundingBox import BoundingBox, BoundingBoxArray, BoundingBoxIndex
 from src import utils
 
 class testBoundingBox(unittest.TestCase):
     _TEST_MODEL_NAME: str = "Test_Model"
 
+    def setUp(self):
+        BoundingBox.clearCache()
+
     def testCanDefineBoundingBox(self):
         inputExample = (-1, 2.0, 3, 5, 6, 7)
         expectedBoundingBoxEdges: Dict[str, float] = {
@@ -55,4 +58,62 @@ class testBoundingBox(unittest.TestCase):
         groupOfCircles = [(1, circleSurface), (1, innerCircleSurface), (1, secondCircleSurface)]
         boundingBox = BoundingBox.getBoundingBoxFromGroup(groupOfCircles)
 
-        utils.assertListOfFloatsAlmostEqual(tuple(boundingBox.edges.values()), tuple(expectedBoundingBoxEdges.values()))
\ No newline at end of file
+        utils.assertListOfFloatsAlmostEqual(tuple(boundingBox.edges.values()), tuple(expectedBoundingBoxEdges.values()))
+
+    def testOverlappingBoxes(self):
+        box = BoundingBox((0, 0, 0, 2, 2, 0))
+        self.assertTrue(box.overlaps(BoundingBox((1, 1, 0, 3, 3, 0))))
+        self.assertTrue(box.overlaps(BoundingBox((2, 0, 0, 3, 1, 0))))
+        self.assertFalse(box.overlaps(BoundingBox((2.5, 0, 0, 3, 1, 0))))
+        self.assertTrue(box.overlaps(BoundingBox((2.5, 0, 0, 3, 1, 0)), tolerance=0.5))
+
+    def testIndexReturnsOnlyOverlappingPairs(self):
+        boxes = [
+            BoundingBox((0, 0, 0, 10, 10, 0)),
+            BoundingBox((1, 1, 0, 2, 2, 0)),
+            BoundingBox((20, 0, 0, 21, 1, 0)),
+            BoundingBox((8, 8, 0, 12, 12, 0)),
+            BoundingBox((1, 5, 0, 2, 6, 0)),
+        ]
+        pairs = BoundingBoxIndex(boxes).getOverlappingPairs()
+        self.assertEqual(pairs, [(0, 1), (0, 3), (0, 4)])
+
+    def testBoundingBoxArrayQueries(self):
+        boxes = BoundingBoxArray([
+            (0, 0, 0, 2, 2, 0),
+            (1, -1, 0, 5, 1, 0),
+            (10, 10, 0, 13, 14, 0),
+        ])
+        self.assertEqual(len(boxes), 3)
+        utils.assertListOfFloatsAlmostEqual(
+            tuple(boxes.getUnion().edges.values()), (0, -1, 0, 13, 14, 0))
+        utils.assertListOfFloatsAlmostEqual(boxes.getCenters()[2], (11.5, 12, 0))
+        utils.assertListOfFloatsAlmostEqual(boxes.getDiagonals(), (8**0.5, 20**0.5, 5))
+        self.assertEqual(
+            boxes.overlaps(BoundingBox((1.5, 0.5, 0, 1.8, 0.8, 0))).tolist(),
+            [True, True, False]
+        )
+        self.assertEqual(
+            boxes.getOverlapMatrix().tolist(),
+            [[True, True, False], [True, True, False], [False, False, True]]
+        )
+
+    def testEntityBoxesFollowModelChanges(self):
+        gmsh.initialize()
+        try:
+            # OCC boxes are enlarged by the shape tolerance, 1e-7.
+            gmsh.model.add(self._TEST_MODEL_NAME)
+            gmsh.model.occ.addCircle(0, 0, 0, 10, tag=1)
+            with BoundingBox.caching():
+                self.assertAlmostEqual(10, BoundingBox.getEntityCoordinates((1, 1))[3], delta=1e-6)
+                gmsh.model.occ.remove([(1, 1)])
+                gmsh.model.occ.addCircle(0, 0, 0, 5, tag=1)
+                # Memoized until the block ends or the model is synchronized.
+                self.assertAlmostEqual(10, BoundingBox.getEntityCoordinates((1, 1))[3], delta=1e-6)
+            self.assertAlmostEqual(5, BoundingBox.getEntityCoordinates((1, 1))[3], delta=1e-6)
+
+            gmsh.clear()
+            gmsh.model.occ.addCircle(0, 0, 0, 2, tag=1)
+            self.assertAlmostEqual(2, BoundingBox.fromEntity((1, 1)).edges['XMax'], delta=1e-6)
+        finally:
+            gmsh.finalize()
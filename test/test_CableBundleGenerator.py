@@ -0,0 +1,67 @@
+import math
+import tempfile
+import unittest
+import gmsh
+from src.CableBundleGenerator import CableBundleGenerator
+from src.mesher import Mesher
+from src.ShapesClassification import ShapesClassification
+
+
+class testCableBundleGenerator(unittest.TestCase):
+    def setUp(self):
+        gmsh.initialize()
+
+    def tearDown(self):
+        gmsh.finalize()
+
+    def test_wires_do_not_overlap_and_are_enclosed(self):
+        for variant in CableBundleGenerator.VARIANTS:
+            disks = CableBundleGenerator(37, variant).getDisks()
+            outer = disks[-1]
+            wires = [d for d in disks if d[0].startswith('Conductor_') and d is not outer]
+            for idx, (_, x, y, r) in enumerate(wires):
+                self.assertLess(math.hypot(x, y) + r, outer[3])
+                for _, otherX, otherY, otherR in wires[idx + 1:]:
+                    self.assertGreater(math.hypot(x - otherX, y - otherY), r + otherR)
+
+    def test_exported_step_is_classified(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            inputFile = CableBundleGenerator(12, 'jacketed').exportStep(tmp)
+            allShapes = ShapesClassification(
+                gmsh.model.occ.importShapes(inputFile, highestDimOnly=False))
+
+        self.assertEqual(list(range(13)), sorted(allShapes.pecs))
+        self.assertEqual(list(range(13)), sorted(allShapes.dielectrics))
+        self.assertEqual([0], list(allShapes.open))
+        self.assertTrue(allShapes.isOpenCase)
+        self.assertEqual([], allShapes.labelConflicts)
+
+    def test_shielded_bundle_is_meshed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            generator = CableBundleGenerator(7, 'shielded')
+            inputFile = generator.exportStep(tmp)
+            Mesher().meshFromStep(inputFile, generator.getCaseName())
+
+        self.assertIsNotNone(Mesher.getPhysicalGroupWithName('Conductor_0'))
+        self.assertIsNotNone(Mesher.getPhysicalGroupWithName('Conductor_7'))
+        self.assertIsNotNone(Mesher.getPhysicalGroupWithName('Vacuum_0'))
+        self.assertGreater(len(gmsh.model.mesh.getNodes()[0]), 0)
+
+    def test_model_matches_exported_step(self):
+        generator = CableBundleGenerator(5, 'open')
+        gmsh.model.add('model')
+        dimTags = generator.buildModel()
+        modelAreas = dict(
+            [[name, gmsh.model.occ.getMass(*dimTag)] for name, dimTag in dimTags.items()])
+
+        gmsh.model.add('step')
+        with tempfile.TemporaryDirectory() as tmp:
+            shapes = gmsh.model.occ.importShapes(generator.exportStep(tmp), highestDimOnly=False)
+        allShapes = ShapesClassification(shapes)
+        for num, surfaces in allShapes.pecs.items():
+            self.assertAlmostEqual(
+                modelAreas['Conductor_{}'.format(num)], gmsh.model.occ.getMass(*surfaces[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import unittest
+import gmsh
+from src import utils
+from src.mesher import Mesher
+from src.ElementBudget import ElementBudget
+
+
+class testElementBudget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        gmsh.initialize()
+
+    def tearDown(self):
+        gmsh.finalize()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def test_dofs_match_nodes_of_high_order_mesh(self):
+        gmsh.model.add('square')
+        gmsh.model.occ.addRectangle(0, 0, 0, 1, 1)
+        utils.synchronize()
+        gmsh.option.setNumber("Mesh.MeshSizeMax", 0.1)
+        gmsh.model.mesh.generate(2)
+
+        counts = ElementBudget.countMesh(3)
+        gmsh.model.mesh.setOrder(3)
+        self.assertEqual(len(gmsh.model.mesh.getNodes()[0]), counts["dofs"])
+        self.assertEqual(counts["elements"], len(gmsh.model.mesh.getElements(2)[1][0]))
+
+    def test_mesh_fits_element_budget(self):
+        caseName = 'five_wires'
+        mesher = Mesher()
+        budget = ElementBudget(maxElements=3000)
+        mesher.meshFromStep(self.inputFileFromCaseName(caseName), caseName, elementBudget=budget)
+
+        report = mesher.report["elementBudget"]
+        elementTypes, elementTags, _ = gmsh.model.mesh.getElements(2)
+        elements = sum(len(tags) for tags in elementTags)
+        self.assertEqual(report["elements"], elements)
+        self.assertLessEqual(elements, 3000)
+        self.assertGreaterEqual(elements, ElementBudget.DEFAULT_MIN_FILL * 3000)
+        self.assertEqual(3, gmsh.model.mesh.getElementProperties(elementTypes[0])[2])
+
+    def test_mesh_fits_dof_budget(self):
+        caseName = 'partially_filled_coax'
+        mesher = Mesher()
+        mesher.meshFromStep(
+            self.inputFileFromCaseName(caseName), caseName,
+            elementBudget=ElementBudget(maxDofs=20000))
+
+        nodes = len(gmsh.model.mesh.getNodes()[0])
+        self.assertLessEqual(mesher.report["elementBudget"]["dofs"], 20000)
+        self.assertLessEqual(nodes, 20000)
+
+    def test_budget_needs_a_limit(self):
+        with self.assertRaises(ValueError):
+            ElementBudget()
+
+
+if __name__ == '__main__':
+    unittest.main()
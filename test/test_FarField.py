@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+import gmsh
+from src.mesher import Mesher
+from src.FarField import FarField
+from src.SymmetryReducer import SymmetryReducer
+
+
+class testFarField(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def meshedModel(self, fileName):
+        gmsh.initialize()
+        gmsh.open(fileName)
+        names = [gmsh.model.getPhysicalName(*pG) for pG in gmsh.model.getPhysicalGroups()]
+        elements = sum(len(tags) for tags in gmsh.model.mesh.getElements(2)[1])
+        return names, elements
+
+    def test_invalid_options_raise(self):
+        with self.assertRaises(ValueError):
+            FarField("sphere")
+        with self.assertRaises(ValueError):
+            FarField("annulus", radiusFactor=0.0)
+        with self.assertRaises(ValueError):
+            FarField("annulus", growthRate=0.9)
+
+    def test_default_radius_depends_on_kind(self):
+        self.assertEqual(4.0, FarField().radiusFactor)
+        self.assertEqual(1.0, FarField("annulus").radiusFactor)
+        self.assertEqual(2.0, FarField("kelvin", radiusFactor=2.0).radiusFactor)
+
+    def test_annulus_meshes_fewer_elements(self):
+        caseName = 'unshielded_multiwire'
+        inputFile = self.inputFileFromCaseName(caseName)
+        diskOutputs = Mesher().runFromInput(inputFile, outputFolder=self.tmp.name)
+        try:
+            _, diskElements = self.meshedModel(diskOutputs[0])
+        finally:
+            gmsh.finalize()
+
+        mesher = Mesher()
+        outputs = mesher.runFromInput(
+            inputFile, outputFolder=self.tmp.name, farField={"kind": "annulus"})
+        self.assertEqual("annulus", mesher.report["farField"]["kind"])
+        try:
+            names, elements = self.meshedModel(outputs[0])
+            self.assertIn('RobinBoundary_0', names)
+            self.assertNotIn('OpenBoundary_0', names)
+            self.assertIn('Vacuum_1', names)
+            self.assertLess(elements, diskElements)
+        finally:
+            gmsh.finalize()
+
+    def test_kelvin_image_has_periodic_boundary(self):
+        caseName = 'unshielded_multiwire'
+        mesher = Mesher()
+        outputs = mesher.runFromInput(
+            self.inputFileFromCaseName(caseName), outputFolder=self.tmp.name,
+            farField={"kind": "kelvin"})
+        self.assertIsNotNone(mesher.report["farField"]["imageCenter"])
+        try:
+            names, _ = self.meshedModel(outputs[0])
+            for name in ['KelvinVacuum_0', 'KelvinInterface_0', 'KelvinInterface_1']:
+                self.assertIn(name, names)
+            self.assertNotIn('OpenBoundary_0', names)
+
+            interfaceNodes = []
+            for name in ['KelvinInterface_0', 'KelvinInterface_1']:
+                pG = Mesher.getPhysicalGroupWithName(name)
+                nodeTags, _ = gmsh.model.mesh.getNodesForPhysicalGroup(*pG)
+                interfaceNodes.append(len(nodeTags))
+            self.assertEqual(interfaceNodes[0], interfaceNodes[1])
+        finally:
+            gmsh.finalize()
+
+    def test_size_fields_keep_annulus_grading(self):
+        caseName = 'unshielded_multiwire'
+        farField = FarField("annulus")
+        mesher = Mesher()
+        gmsh.initialize()
+        try:
+            mesher.meshFromStep(self.inputFileFromCaseName(caseName), caseName, farField=farField)
+            meshingOptions = Mesher.getMeshingOptions("standard", None, None)
+            gmsh.model.mesh.clear()
+            withoutGrading = mesher.generateMesh(meshingOptions, sizeFields={})
+            fieldsWithoutGrading = len(withoutGrading.fields)
+            withoutGrading.remove()
+            gmsh.model.mesh.clear()
+            withGrading = mesher.generateMesh(meshingOptions, sizeFields={}, farField=farField)
+            self.assertEqual(fieldsWithoutGrading + 3, len(withGrading.fields))
+            self.assertEqual([], FarField().addGradingFields())
+        finally:
+            gmsh.finalize()
+
+    def test_kelvin_and_symmetry_raise(self):
+        gmsh.initialize()
+        try:
+            with self.assertRaises(ValueError):
+                Mesher().meshFromStep(
+                    self.inputFileFromCaseName('two_wires_open'), 'two_wires_open',
+                    farField=FarField("kelvin"), symmetry=SymmetryReducer())
+        finally:
+            gmsh.finalize()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+import gmsh
+import numpy as np
+from src.mesher import Mesher
+from src.GeometryCache import GeometryCache
+
+
+class testGeometryCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        gmsh.initialize()
+
+    def tearDown(self):
+        gmsh.finalize()
+        self.tmp.cleanup()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    @staticmethod
+    def physicalModelSummary():
+        summary = {}
+        for pG in gmsh.model.getPhysicalGroups():
+            tags = gmsh.model.getEntitiesForPhysicalGroup(*pG)
+            mass = sum(gmsh.model.occ.getMass(pG[0], tag) for tag in tags)
+            summary[gmsh.model.getPhysicalName(*pG)] = (pG[1], len(tags), mass)
+        return summary
+
+    def test_cached_geometry_keeps_physical_groups(self):
+        caseName = 'five_wires'
+        inputFile = self.inputFileFromCaseName(caseName)
+        cache = GeometryCache(self.tmp.name)
+        key = cache.computeKey(inputFile, Mesher.getGeometryOptions())
+        self.assertFalse(cache.contains(key))
+
+        Mesher().meshFromStep(inputFile, caseName, geometryCache=cache)
+        self.assertTrue(cache.contains(key))
+        expected = self.physicalModelSummary()
+        gmsh.clear()
+
+        Mesher().meshFromStep(inputFile, caseName, geometryCache=cache)
+        restored = self.physicalModelSummary()
+
+        self.assertEqual(sorted(restored.keys()), sorted(expected.keys()))
+        for name, (tag, numEntities, mass) in expected.items():
+            self.assertEqual(restored[name][0], tag, name)
+            self.assertEqual(restored[name][1], numEntities, name)
+            self.assertAlmostEqual(restored[name][2], mass, places=6, msg=name)
+
+    def test_cached_geometry_keeps_mesh_sizes(self):
+        caseName = 'two_wires_open'
+        inputFile = self.inputFileFromCaseName(caseName)
+        cache = GeometryCache(self.tmp.name)
+
+        Mesher().meshFromStep(inputFile, caseName, geometryCache=cache)
+        numElements = len(gmsh.model.mesh.getElements(2)[1][0])
+        gmsh.clear()
+
+        Mesher().meshFromStep(inputFile, caseName, geometryCache=cache)
+        restoredNumElements = len(gmsh.model.mesh.getElements(2)[1][0])
+        self.assertLess(abs(restoredNumElements - numElements), 0.05 * numElements)
+
+    def test_mismatched_entry_is_rejected(self):
+        caseName = 'five_wires'
+        inputFile = self.inputFileFromCaseName(caseName)
+        cache = GeometryCache(self.tmp.name)
+        key = cache.computeKey(inputFile, Mesher.getGeometryOptions())
+        Mesher().meshFromStep(inputFile, caseName, geometryCache=cache)
+        gmsh.clear()
+
+        layoutFile = os.path.join(self.tmp.name, key + '.json')
+        with open(layoutFile, 'r') as f:
+            layout = json.load(f)
+        layout["physicalGroups"][0]["entities"][0]["mass"] *= 2.0
+        with open(layoutFile, 'w') as f:
+            json.dump(layout, f)
+
+        gmsh.model.add(caseName)
+        self.assertFalse(cache.load(key))
+        self.assertFalse(cache.contains(key))
+        self.assertEqual([], gmsh.model.getEntities())
+
+    def test_entities_are_matched_one_to_one(self):
+        candidates = (np.array([1, 2]), np.array([[0.0, 0.0, 0.0], [10.0, 0.0, 0.0]]), np.array([1.0, 1.0]))
+        self.assertEqual([2, 1], GeometryCache.findEntities(candidates, [
+            {"centerOfMass": [10.0, 0.0, 0.0], "mass": 1.0},
+            {"centerOfMass": [0.0, 0.0, 0.0], "mass": 1.0}]))
+        with self.assertRaises(ValueError):
+            GeometryCache.findEntity(candidates, {"centerOfMass": [5.0, 0.0, 0.0], "mass": 1.0})
+        with self.assertRaises(ValueError):
+            GeometryCache.findEntities(candidates, [
+                {"centerOfMass": [0.0, 0.0, 0.0], "mass": 1.0},
+                {"centerOfMass": [0.0, 0.0, 0.0], "mass": 1.0 + 1e-7}], tolerance=1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
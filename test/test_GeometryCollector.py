@@ -0,0 +1,65 @@
+import os
+import unittest
+import gmsh
+from src import utils
+from src.mesher import Mesher
+from src.GeometryCollector import GeometryCollector
+from src.TopologyMap import TopologyMap
+
+
+class testGeometryCollector(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        gmsh.initialize()
+        TopologyMap.invalidate()
+
+    def tearDown(self):
+        gmsh.finalize()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def test_orphan_entities_are_removed(self):
+        gmsh.model.add('squares')
+        collector = GeometryCollector()
+        first = gmsh.model.occ.addRectangle(0, 0, 0, 1, 1)
+        gmsh.model.occ.addRectangle(2, 0, 0, 1, 1)
+        utils.synchronize()
+        collector.record('rectangles')
+        gmsh.model.addPhysicalGroup(2, [first], name='Kept')
+        TopologyMap.invalidate()
+
+        report = collector.collect()
+
+        self.assertEqual([(2, first)], gmsh.model.occ.getEntities(2))
+        self.assertEqual(4, len(gmsh.model.occ.getEntities(1)))
+        self.assertEqual(4, len(gmsh.model.occ.getEntities(0)))
+        self.assertEqual(2, report['steps'][0]['created'][2])
+        self.assertEqual({0: 4, 1: 4, 2: 1, 3: 0}, report['removed'])
+
+    def test_no_unreachable_entities_after_building_geometry(self):
+        for caseName in ['two_wires_open', 'unshielded_multiwire', 'partially_filled_coax']:
+            gmsh.model.add(caseName)
+            mesher = Mesher()
+            mesher.buildGeometry(self.inputFileFromCaseName(caseName))
+
+            reachable = GeometryCollector.getReachableEntities()
+            occEntities = set(gmsh.model.occ.getEntities())
+            self.assertEqual(set(), occEntities - reachable, caseName)
+
+            report = mesher.report['geometryCleanup']
+            self.assertEqual(
+                ['import', 'classification', 'booleans', 'physicalModel'],
+                [step['name'] for step in report['steps']])
+            self.assertGreaterEqual(
+                sum(report['before']['entities'].values()),
+                sum(report['after']['entities'].values()))
+            gmsh.model.remove()
+
+
+if __name__ == '__main__':
+    unittest.main()
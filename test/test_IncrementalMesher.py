@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import gmsh
+from src.mesher import Mesher
+from src.IncrementalMesher import IncrementalMesher
+
+
+class testIncrementalMesher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        gmsh.initialize()
+
+    def tearDown(self):
+        gmsh.finalize()
+        self.tmp.cleanup()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def meshIncrementally(self, caseName, stateName):
+        gmsh.finalize()
+        gmsh.initialize()
+        incremental = IncrementalMesher(stateName)
+        Mesher().meshFromStep(
+            self.inputFileFromCaseName(caseName), caseName, incremental=incremental)
+        nodeTags, _, _ = gmsh.model.mesh.getNodes()
+        return incremental.statistics, len(nodeTags)
+
+    def test_compare_labels(self):
+        previous = {
+            "Conductor_0": {"hash": "a"},
+            "Conductor_1": {"hash": "b"},
+            "Dielectric_1": {"hash": "c"},
+        }
+        current = {
+            "Conductor_0": {"hash": "a"},
+            "Conductor_1": {"hash": "d"},
+            "Conductor_2": {"hash": "e"},
+        }
+        comparison = IncrementalMesher.compareLabels(previous, current)
+        self.assertEqual(["Conductor_0"], comparison["unchanged"])
+        self.assertEqual(["Conductor_1"], comparison["changed"])
+        self.assertEqual(["Conductor_2"], comparison["added"])
+        self.assertEqual(["Dielectric_1"], comparison["removed"])
+
+    def test_unchanged_model_reuses_whole_mesh(self):
+        caseName = 'partially_filled_coax'
+        stateName = os.path.join(self.tmp.name, caseName)
+
+        first, firstNodes = self.meshIncrementally(caseName, stateName)
+        self.assertEqual(0, first["curves"]["reused"])
+        self.assertEqual(0, first["surfaces"]["reused"])
+        self.assertTrue(IncrementalMesher(stateName).hasState())
+
+        second, secondNodes = self.meshIncrementally(caseName, stateName)
+        self.assertEqual(0, second["curves"]["meshed"])
+        self.assertEqual(0, second["surfaces"]["meshed"])
+        self.assertEqual([], second["labels"]["changed"])
+        self.assertEqual(firstNodes, secondNodes)
+
+    def test_changed_model_is_meshed(self):
+        stateName = os.path.join(self.tmp.name, 'design')
+        self.meshIncrementally('two_wires_coax', stateName)
+        statistics, nodes = self.meshIncrementally('five_wires', stateName)
+
+        self.assertNotEqual(0, statistics["surfaces"]["meshed"])
+        self.assertNotEqual(0, nodes)
+        self.assertNotEqual([], statistics["labels"]["added"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import unittest
+import warnings
+import gmsh
+from src import utils
+from src.LabelClassifier import LabelClassifier
+from src.ShapesClassification import ShapesClassification
+
+
+class testLabelClassifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        gmsh.initialize()
+
+    def tearDown(self):
+        gmsh.finalize()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def addNamedRectangles(self, names):
+        dimTags = []
+        for idx, name in enumerate(names):
+            dimTags.append((2, gmsh.model.occ.addRectangle(2 * idx, 0, 0, 1, 1)))
+        utils.synchronize()
+        for dimTag, name in zip(dimTags, names):
+            gmsh.model.setEntityName(*dimTag, name)
+        return dimTags
+
+    def test_classifies_step_labels(self):
+        shapes = gmsh.model.occ.importShapes(
+            self.inputFileFromCaseName('partially_filled_coax'), highestDimOnly=False)
+        utils.synchronize()
+
+        classifier = LabelClassifier()
+        classified = classifier.classify(shapes)
+        for label in LabelClassifier.DEFAULT_LABELS:
+            self.assertEqual(
+                ShapesClassification.get_surfaces_with_label(shapes, label), classified[label])
+        self.assertEqual([0, 1], sorted(classified['Conductor_']))
+        self.assertEqual([], classifier.conflicts)
+
+    def test_numbers_are_read_from_the_end_of_the_name(self):
+        dimTags = self.addNamedRectangles([
+            'Shapes/solid_wire_002/Conductor_002/Conductor_002',
+            'Shapes/Dielectric_1',
+            'Shapes/other',
+        ])
+        classified = LabelClassifier().classify(dimTags)
+
+        self.assertEqual({2: [dimTags[0]]}, classified['Conductor_'])
+        self.assertEqual({1: [dimTags[1]]}, classified['Dielectric_'])
+        self.assertEqual({}, classified['OpenBoundary_'])
+
+    def test_duplicate_numbers_are_reported(self):
+        dimTags = self.addNamedRectangles(['Conductor_1', 'Conductor_1', 'Conductor_2'])
+        classifier = LabelClassifier()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            classified = classifier.classify(dimTags)
+
+        self.assertEqual([dimTags[1]], classified['Conductor_'][1])
+        self.assertEqual(1, len(caught))
+        self.assertEqual(1, len(classifier.conflicts))
+        self.assertEqual('Conductor_', classifier.conflicts[0]['label'])
+        self.assertEqual(1, classifier.conflicts[0]['number'])
+        self.assertEqual([list(dimTags[0]), list(dimTags[1])], classifier.conflicts[0]['entities'])
+
+    def test_registered_labels(self):
+        dimTags = self.addNamedRectangles(['Conductor_0', 'Port_3'])
+        classifier = LabelClassifier()
+        classifier.registerLabel('Port_')
+        classified = classifier.classify(dimTags)
+
+        self.assertEqual({0: [dimTags[0]]}, classified['Conductor_'])
+        self.assertEqual({3: [dimTags[1]]}, classified['Port_'])
+
+    def test_label_without_number_raises(self):
+        dimTags = self.addNamedRectangles(['Conductor_A'])
+        with self.assertRaises(ValueError):
+            LabelClassifier().classify(dimTags)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+from src.MeshCache import MeshCache
+from src.GeometryCache import GeometryCache
+
+
+class testMeshCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cacheFolder = os.path.join(self.tmp.name, 'cache')
+        self.outputName = os.path.join(self.tmp.name, 'case')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def writeOutputs(self, size=10):
+        outputs = [self.outputName + '.msh', self.outputName + '.areas.json']
+        for output in outputs:
+            with open(output, 'w') as f:
+                f.write('x' * size)
+        return outputs
+
+    def test_key_depends_on_step_and_options(self):
+        inputFile = self.testdataPath + 'empty_coax/empty_coax.step'
+        otherFile = self.testdataPath + 'five_wires/five_wires.step'
+        options = {"Mesh.ElementOrder": 3}
+
+        key = MeshCache.computeKey(inputFile, options)
+        self.assertEqual(key, MeshCache.computeKey(inputFile, dict(options)))
+        self.assertNotEqual(key, MeshCache.computeKey(otherFile, options))
+        self.assertNotEqual(key, MeshCache.computeKey(inputFile, {"Mesh.ElementOrder": 2}))
+
+    def test_key_depends_on_sources(self):
+        inputFile = self.testdataPath + 'empty_coax/empty_coax.step'
+        key = MeshCache.computeKey(inputFile, {})
+        digest = MeshCache.sourceDigest()
+        try:
+            MeshCache._sourceDigest = 'modified'
+            self.assertNotEqual(key, MeshCache.computeKey(inputFile, {}))
+        finally:
+            MeshCache._sourceDigest = digest
+
+    def test_restore_returns_stored_outputs(self):
+        cache = MeshCache(self.cacheFolder)
+        self.assertIsNone(cache.restore('key', self.outputName))
+
+        outputs = self.writeOutputs()
+        cache.store('key', outputs, self.outputName)
+        for output in outputs:
+            os.remove(output)
+
+        restored = cache.restore('key', self.outputName)
+        self.assertEqual(sorted(restored), sorted(outputs))
+        for output in outputs:
+            self.assertTrue(os.path.isfile(output))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = MeshCache(self.cacheFolder, maxSize=50)
+        outputs = self.writeOutputs(size=10)
+
+        cache.store('first', outputs, self.outputName)
+        cache.store('second', outputs, self.outputName)
+        os.utime(os.path.join(self.cacheFolder, 'first'), (0, 0))
+        os.utime(os.path.join(self.cacheFolder, 'second'), (1, 1))
+        cache.restore('first', self.outputName)
+        cache.store('third', outputs, self.outputName)
+
+        self.assertIsNotNone(cache.restore('first', self.outputName))
+        self.assertIsNone(cache.restore('second', self.outputName))
+        self.assertIsNotNone(cache.restore('third', self.outputName))
+        self.assertLessEqual(cache.size(), 50)
+
+    def test_clear_removes_all_entries(self):
+        cache = MeshCache(self.cacheFolder)
+        cache.store('key', self.writeOutputs(), self.outputName)
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
+        self.assertIsNone(cache.restore('key', self.outputName))
+
+    def writeGeometryEntry(self, geometryCache, key, size=10):
+        for fileName in (geometryCache._brepFile(key), geometryCache._layoutFile(key)):
+            with open(fileName, 'w') as f:
+                f.write('x' * size)
+
+    def test_geometry_cache_is_not_a_mesh_cache_entry(self):
+        cache = MeshCache(self.cacheFolder, maxSize=30)
+        geometryCache = GeometryCache(cache.getGeometryFolder())
+        self.writeGeometryEntry(geometryCache, 'geometry', size=100)
+
+        cache.store('first', self.writeOutputs(), self.outputName)
+        cache.store('second', self.writeOutputs(), self.outputName)
+        self.assertEqual(20, cache.size())
+        self.assertTrue(os.path.isfile(geometryCache._brepFile('geometry')))
+
+        cache.clear()
+        geometryCache.clear()
+        self.assertEqual(0, geometryCache.size())
+        self.assertTrue(os.path.isdir(cache.getGeometryFolder()))
+
+    def test_geometry_cache_evicts_least_recently_used(self):
+        geometryCache = GeometryCache(os.path.join(self.cacheFolder, 'geometry'), maxSize=50)
+        self.writeGeometryEntry(geometryCache, 'first')
+        self.writeGeometryEntry(geometryCache, 'second')
+        os.utime(geometryCache._brepFile('first'), (0, 0))
+        os.utime(geometryCache._brepFile('second'), (1, 1))
+        self.writeGeometryEntry(geometryCache, 'third')
+        geometryCache.evict()
+
+        self.assertFalse(geometryCache.contains('first'))
+        self.assertTrue(geometryCache.contains('second'))
+        self.assertTrue(geometryCache.contains('third'))
+        self.assertLessEqual(geometryCache.size(), 50)
+
+    def test_geometry_cache_clear_without_folder(self):
+        geometryCache = GeometryCache(os.path.join(self.cacheFolder, 'geometry'))
+        os.rmdir(geometryCache.folder)
+        geometryCache.clear()
+        self.assertEqual(0, geometryCache.size())
+
+
+if __name__ == '__main__':
+    unittest.main()
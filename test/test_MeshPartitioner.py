@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+import gmsh
+import numpy as np
+from src.mesher import Mesher
+from src.MeshPartitioner import MeshPartitioner
+
+
+class testMeshPartitioner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def test_statistics_of_two_parts(self):
+        # Unit square split in 2x2 squares of two triangles, parts by column.
+        corners = [np.array([
+            [1, 2, 5], [1, 5, 4], [2, 3, 6], [2, 6, 5],
+            [4, 5, 8], [4, 8, 7], [5, 6, 9], [5, 9, 8],
+        ])]
+        partitions = [np.array([1, 1, 2, 2, 1, 1, 2, 2])]
+
+        statistics = MeshPartitioner.getStatistics(corners, partitions)
+        self.assertEqual(2, statistics["numParts"])
+        self.assertEqual([4, 4], statistics["elements"])
+        self.assertEqual(1.0, statistics["imbalance"])
+        self.assertEqual(2, statistics["edgeCut"])
+        self.assertEqual(3, statistics["interfaceNodes"])
+        self.assertEqual({"1-2": 2}, statistics["interfaces"])
+
+    def test_partitioned_msh(self):
+        caseName = 'five_wires'
+        mesher = Mesher()
+        outputs = mesher.runFromInput(
+            self.inputFileFromCaseName(caseName), outputFolder=self.tmp.name,
+            partition={"numParts": 4})
+
+        statistics = mesher.report["partition"]
+        self.assertEqual(4, statistics["numParts"])
+        self.assertLess(statistics["imbalance"], 1.2)
+        self.assertGreater(statistics["edgeCut"], 0)
+
+        gmsh.initialize()
+        try:
+            gmsh.open(outputs[0])
+            elementTags = gmsh.model.mesh.getElements(2)[1]
+            self.assertEqual(sum(statistics["elements"]), sum(len(tags) for tags in elementTags))
+            self.assertEqual(4, gmsh.model.getNumberOfPartitions())
+            names = [gmsh.model.getPhysicalName(*pG) for pG in gmsh.model.getPhysicalGroups()]
+            self.assertIn('Conductor_0', names)
+            self.assertIn('Vacuum_0', names)
+        finally:
+            gmsh.finalize()
+
+    def test_split_msh_files(self):
+        caseName = 'partially_filled_coax'
+        outputs = Mesher().runFromInput(
+            self.inputFileFromCaseName(caseName), outputFolder=self.tmp.name,
+            partition={"numParts": 3, "splitFiles": True})
+
+        for part in range(1, 4):
+            fileName = os.path.join(self.tmp.name, "{}_{}.msh".format(caseName, part))
+            self.assertIn(fileName, outputs)
+            self.assertTrue(os.path.isfile(fileName))
+
+    def test_mfem_partitioning(self):
+        caseName = 'partially_filled_coax'
+        outputs = Mesher().runFromInput(
+            self.inputFileFromCaseName(caseName), outputFolder=self.tmp.name,
+            meshFormat="mfem", partition={"numParts": 2})
+
+        meshFile = os.path.join(self.tmp.name, caseName + '.mesh')
+        partitioningFile = os.path.join(self.tmp.name, caseName + '.partitioning')
+        self.assertIn(partitioningFile, outputs)
+        with open(meshFile, 'r') as f:
+            lines = [line.strip() for line in f]
+        numElements = int(lines[lines.index('elements') + 1])
+        with open(partitioningFile, 'r') as f:
+            lines = [line.strip() for line in f]
+        self.assertEqual("number_of_elements {}".format(numElements), lines[0])
+        self.assertEqual("number_of_processors 2", lines[1])
+        self.assertEqual({0, 1}, set(int(line) for line in lines[2:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import unittest
+import gmsh
+import numpy as np
+from src.mesher import Mesher
+from src.MeshResult import MeshResult
+
+
+class testMeshResult(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def test_arrays_match_gmsh_model(self):
+        caseName = 'partially_filled_coax'
+        gmsh.initialize()
+        try:
+            Mesher().meshFromStep(self.inputFileFromCaseName(caseName), caseName)
+            result = MeshResult()
+
+            nodeTags, coords, _ = gmsh.model.mesh.getNodes()
+            self.assertEqual(len(nodeTags), result.nodes.shape[0])
+            self.assertEqual(3, result.nodes.shape[1])
+
+            for block in result.elements.values():
+                self.assertEqual(len(block), block.connectivity.shape[0])
+                self.assertTrue(np.all(block.connectivity >= 0))
+                # Connectivity indices point back to the gmsh node tags.
+                elementTag = int(block.tags[0])
+                _, elementNodes, _, _ = gmsh.model.mesh.getElement(elementTag)
+                self.assertEqual(
+                    list(elementNodes), list(result.nodeTags[block.connectivity[0]]))
+
+            for (dim, tag), name in result.physicalNames.items():
+                self.assertEqual(gmsh.model.getPhysicalName(dim, tag), name)
+        finally:
+            gmsh.finalize()
+
+    def test_mesh_to_arrays(self):
+        caseName = 'five_wires'
+        result = Mesher().meshToArrays(self.inputFileFromCaseName(caseName), preset="draft")
+
+        triangles = result.elements['Triangle 3']
+        lines = result.elements['Line 2']
+        self.assertEqual(2, triangles.dimension)
+        self.assertEqual((len(triangles), 3), triangles.connectivity.shape)
+        self.assertEqual(len(triangles) + len(lines), result.getNumberOfElements())
+
+        conductor = result.getPhysicalTag('Conductor_1')
+        self.assertIn(conductor, set(lines.physicalTags))
+        self.assertNotIn(conductor, set(triangles.physicalTags))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from src.MesherServer import MesherServer
+
+
+class testMesherServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def test_jobs_from_stdin(self):
+        jobs = [
+            {"id": 1, "input": self.inputFileFromCaseName('empty_coax'), "outputFolder": self.tmp.name},
+            {"id": 2, "input": "missing.step", "outputFolder": self.tmp.name},
+            {"id": 3},
+        ]
+        stdin = io.StringIO("\n".join(json.dumps(job) for job in jobs) + "\nnot json\n")
+        stdout = io.StringIO()
+        with MesherServer(numWorkers=2, runOptions={"preset": "draft"}) as server:
+            server.serveStdin(stdin, stdout)
+
+        results = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(4, len(results))
+        byId = dict([[result["id"], result] for result in results])
+        self.assertEqual("ok", byId[1]["status"])
+        for output in byId[1]["outputs"]:
+            self.assertTrue(os.path.isfile(output))
+        self.assertGreaterEqual(byId[1]["latency"], byId[1]["wallTime"])
+        self.assertEqual("failed", byId[2]["status"])
+        self.assertEqual("rejected", byId[3]["status"])
+        self.assertEqual("rejected", byId[None]["status"])
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Unix sockets are not available")
+    def test_jobs_from_unix_socket(self):
+        socketPath = os.path.join(self.tmp.name, 'step2gmsh.sock')
+        with MesherServer(numWorkers=1, runOptions={"preset": "draft"}) as server:
+            thread = threading.Thread(target=server.serveUnixSocket, args=(socketPath,))
+            thread.start()
+            deadline = time.monotonic() + 30
+            while not os.path.exists(socketPath):
+                if time.monotonic() > deadline or not thread.is_alive():
+                    self.fail("The server did not create its socket.")
+                time.sleep(0.01)
+
+            for _ in range(2):
+                result = MesherServer.request(socketPath, {
+                    "id": "coax",
+                    "input": self.inputFileFromCaseName('empty_coax'),
+                    "outputFolder": self.tmp.name,
+                })
+                self.assertEqual("ok", result["status"])
+                self.assertEqual("coax", result["id"])
+
+            MesherServer.request(socketPath, {"command": "shutdown"})
+            thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(socketPath))
+
+    def test_full_queue_rejects_jobs(self):
+        server = MesherServer(numWorkers=1, maxQueueSize=1)
+        # Without started workers nothing leaves the queue.
+        first = server.submit({"input": "a.step"})
+        second = server.submit({"input": "b.step"})
+        self.assertFalse(first.done())
+        self.assertEqual("rejected", second.result()["status"])
+
+
+if __name__ == '__main__':
+    unittest.main()
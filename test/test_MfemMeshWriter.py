@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+import gmsh
+import numpy as np
+from src.mesher import Mesher
+from src.MfemMeshWriter import MfemMeshWriter
+from src.TopologyMap import TopologyMap
+
+
+class testMfemMeshWriter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        gmsh.initialize()
+
+    def tearDown(self):
+        gmsh.finalize()
+        self.tmp.cleanup()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    @staticmethod
+    def readSections(fileName):
+        with open(fileName, 'r') as f:
+            lines = [line.strip() for line in f]
+        sections = {}
+        idx = lines.index('elements')
+        numElements = int(lines[idx + 1])
+        sections['elements'] = [list(map(int, l.split())) for l in lines[idx + 2:idx + 2 + numElements]]
+        idx = lines.index('boundary')
+        numBoundary = int(lines[idx + 1])
+        sections['boundary'] = [list(map(int, l.split())) for l in lines[idx + 2:idx + 2 + numBoundary]]
+        idx = lines.index('vertices')
+        sections['numVertices'] = int(lines[idx + 1])
+        sections['lines'] = lines
+        return sections
+
+    def test_high_order_mesh(self):
+        caseName = 'partially_filled_coax'
+        Mesher().meshFromStep(self.inputFileFromCaseName(caseName), caseName)
+        fileName = MfemMeshWriter(chunkSize=7).write(os.path.join(self.tmp.name, caseName + '.mesh'))
+
+        sections = self.readSections(fileName)
+        lines = sections['lines']
+        self.assertEqual('MFEM mesh v1.0', lines[0])
+
+        numTriangles = 0
+        surfaceGroups = set()
+        for pG in gmsh.model.getPhysicalGroups(2):
+            surfaceGroups.add(pG[1])
+            for tag in gmsh.model.getEntitiesForPhysicalGroup(*pG):
+                numTriangles += len(gmsh.model.mesh.getElementsByType(21, tag)[0])
+        self.assertEqual(numTriangles, len(sections['elements']))
+        self.assertEqual(surfaceGroups, set(e[0] for e in sections['elements']))
+        self.assertTrue(all(e[1] == 2 for e in sections['elements']))
+        self.assertTrue(all(min(e[2:]) >= 0 for e in sections['boundary']))
+
+        self.assertIn('FiniteElementCollection: L2_T4_2D_P3', lines)
+        nodesStart = lines.index('Ordering: 1') + 2
+        nodes = np.array([list(map(float, l.split())) for l in lines[nodesStart:] if l])
+        self.assertEqual((10 * numTriangles, 2), nodes.shape)
+
+        # First dof of each element is its first vertex.
+        _, coords, _ = gmsh.model.mesh.getNodes()
+        scaling = gmsh.option.getNumber("Mesh.ScalingFactor")
+        extent = np.max(np.abs(coords)) * scaling
+        self.assertAlmostEqual(extent, np.max(np.abs(nodes)))
+
+    def test_boundary_off_the_elements_raises(self):
+        gmsh.model.add("boundaryOffTheElements")
+        inside = gmsh.model.occ.addRectangle(0, 0, 0, 1, 1)
+        outside = gmsh.model.occ.addRectangle(2, 0, 0, 1, 1)
+        gmsh.model.occ.synchronize()
+        gmsh.model.addPhysicalGroup(2, [inside])
+        outsideCurves = [abs(tag) for _, tag in gmsh.model.getBoundary([(2, outside)])]
+        gmsh.model.addPhysicalGroup(1, outsideCurves[:1])
+        TopologyMap.invalidate()
+        gmsh.option.setNumber("Mesh.ElementOrder", 2)
+        gmsh.model.mesh.generate(2)
+
+        with self.assertRaises(ValueError):
+            MfemMeshWriter().write(os.path.join(self.tmp.name, 'boundaryOffTheElements.mesh'))
+
+    def test_linear_mesh(self):
+        caseName = 'empty_coax'
+        Mesher().meshFromStep(self.inputFileFromCaseName(caseName), caseName, preset="draft")
+        fileName = MfemMeshWriter().write(os.path.join(self.tmp.name, caseName + '.mesh'))
+
+        sections = self.readSections(fileName)
+        lines = sections['lines']
+        self.assertNotIn('nodes', lines)
+        idx = lines.index('vertices')
+        self.assertEqual('2', lines[idx + 2])
+        vertices = [l for l in lines[idx + 3:] if l]
+        self.assertEqual(sections['numVertices'], len(vertices))
+        used = set(v for e in sections['elements'] for v in e[2:])
+        self.assertEqual(set(range(sections['numVertices'])), used)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+import gmsh
+from src.mesher import Mesher
+from src.ParametricSweep import ParametricSweep
+
+
+class testParametricSweep(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def test_expand_grid_groups_geometry_parameters(self):
+        points = ParametricSweep.expandGrid({
+            "Mesh.MeshSizeMax": [20, 40],
+            "farRegionScalingFactor": [3.0, 5.0],
+        })
+        self.assertEqual(4, len(points))
+        geometries = [point[0]["farRegionScalingFactor"] for point in points]
+        self.assertEqual([3.0, 3.0, 5.0, 5.0], geometries)
+        self.assertEqual({"Mesh.MeshSizeMax": 20}, points[0][1])
+
+        with self.assertRaises(ValueError):
+            ParametricSweep.expandGrid({"Mesh.MeshSizeMax": 20})
+
+    def test_sweep_mesh_parameters(self):
+        caseName = 'partially_filled_coax'
+        summary = ParametricSweep(preset="draft").run(
+            self.inputFileFromCaseName(caseName),
+            {"Mesh.MeshSizeMax": [10, 40]},
+            self.tmp.name)
+
+        self.assertEqual(2, len(summary["points"]))
+        for idx, point in enumerate(summary["points"]):
+            for output in point["outputs"]:
+                self.assertTrue(os.path.isfile(output))
+            areasFile = os.path.join(self.tmp.name, "{}_{}.areas.json".format(caseName, idx))
+            self.assertIn(areasFile, point["outputs"])
+        fine, coarse = summary["points"]
+        self.assertGreater(fine["nodes"], coarse["nodes"])
+
+    def test_sweep_far_field(self):
+        caseName = 'unshielded_multiwire'
+        summary = ParametricSweep(preset="draft").run(
+            self.inputFileFromCaseName(caseName),
+            {"farRegionScalingFactor": [3.0, 6.0]},
+            self.tmp.name)
+
+        small, large = summary["points"]
+        self.assertGreater(large["nodes"], small["nodes"])
+        self.assertFalse(gmsh.isInitialized())
+
+    def test_sweep_forwards_run_options(self):
+        caseName = 'partially_filled_coax'
+        summary = ParametricSweep(preset="draft", meshFormat="mfem", partition={"numParts": 2}).run(
+            self.inputFileFromCaseName(caseName),
+            {"Mesh.MeshSizeMax": [10, 40]},
+            self.tmp.name)
+
+        for idx, point in enumerate(summary["points"]):
+            outputName = os.path.join(self.tmp.name, "{}_{}".format(caseName, idx))
+            self.assertIn(outputName + '.mesh', point["outputs"])
+            self.assertIn(outputName + '.partitioning', point["outputs"])
+            self.assertEqual(2, point["report"]["partition"]["numParts"])
+
+    def test_partitioned_points_do_not_keep_previous_partitions(self):
+        caseName = 'partially_filled_coax'
+        inputFile = self.inputFileFromCaseName(caseName)
+        summary = ParametricSweep(preset="draft", meshFormat="mfem", partition={"numParts": 2}).run(
+            inputFile, {"Mesh.MeshSizeMax": [10, 40]}, self.tmp.name)
+
+        single = Mesher()
+        single.runFromInput(inputFile, outputFolder=self.tmp.name, preset="draft",
+                            meshingOptions={"Mesh.MeshSizeMax": 40}, meshFormat="mfem",
+                            partition={"numParts": 2})
+        last = summary["points"][-1]["report"]["partition"]
+        self.assertEqual(sum(single.report["partition"]["elements"]), sum(last["elements"]))
+
+        for idx, point in enumerate(summary["points"]):
+            outputName = os.path.join(self.tmp.name, "{}_{}".format(caseName, idx))
+            with open(outputName + '.partitioning', 'r') as f:
+                numElements = int(f.readline().split()[1])
+            self.assertEqual(sum(point["report"]["partition"]["elements"]), numElements)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+import unittest
+import gmsh
+from src.mesher import Mesher
+from src.Profiler import Profiler
+
+
+class testProfiler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        gmsh.initialize()
+
+    def tearDown(self):
+        gmsh.finalize()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = Profiler(enabled=False)
+        with profiler.phase("phase"):
+            pass
+        with profiler.instrumentBooleans():
+            self.assertNotIn('timedFunction', gmsh.model.occ.cut.__name__)
+        self.assertEqual(profiler.phases, [])
+
+    def test_mesh_from_step_records_phases_and_booleans(self):
+        caseName = 'five_wires'
+        originalCut = gmsh.model.occ.cut
+        profiler = Profiler()
+        Mesher(profiler).meshFromStep(self.inputFileFromCaseName(caseName), caseName)
+
+        self.assertIs(gmsh.model.occ.cut, originalCut)
+        phaseNames = [phase["name"] for phase in profiler.phases]
+        for name in ["import", "classification", "booleans", "physicalModel", "meshGeneration"]:
+            self.assertIn(name, phaseNames)
+        self.assertGreater(profiler.booleans["cut"]["count"], 0)
+        self.assertGreater(profiler.mesh["nodes"], 0)
+        self.assertGreater(sum(profiler.mesh["elements"].values()), 0)
+
+    def test_export_to_json(self):
+        profiler = Profiler()
+        with profiler.phase("phase"):
+            pass
+        with tempfile.TemporaryDirectory() as folder:
+            fileName = profiler.exportToJson(os.path.join(folder, 'case'))
+            with open(fileName, 'r') as f:
+                exported = json.load(f)
+        self.assertEqual(exported["phases"][0]["name"], "phase")
+        for field in ["rssStart", "rssEnd", "processPeakRss"]:
+            self.assertIn(field, exported["phases"][0])
+        self.assertIn("booleans", exported)
+
+
+if __name__ == '__main__':
+    unittest.main()
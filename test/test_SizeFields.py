@@ -0,0 +1,73 @@
+import os
+import unittest
+import gmsh
+from src.mesher import Mesher
+from src.SizeFields import SizeFieldBuilder
+
+
+class testSizeFields(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        gmsh.initialize()
+
+    def tearDown(self):
+        gmsh.finalize()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    @staticmethod
+    def countTriangles():
+        elementTypes, elementTags, _ = gmsh.model.mesh.getElements(2)
+        return sum(len(tags) for tags in elementTags)
+
+    def test_parameters_per_label(self):
+        builder = SizeFieldBuilder({
+            "Conductor_": {"distMaxFactor": 4.0},
+            "Conductor_1": {"sizeMinFactor": 0.01},
+        })
+
+        conductor1 = builder.getParameters("Conductor_1")
+        self.assertEqual(0.01, conductor1["sizeMinFactor"])
+        self.assertEqual(4.0, conductor1["distMaxFactor"])
+
+        conductor10 = builder.getParameters("Conductor_10")
+        self.assertEqual(
+            SizeFieldBuilder.DEFAULT_PARAMETERS["Conductor_"]["sizeMinFactor"],
+            conductor10["sizeMinFactor"])
+
+        self.assertIsNone(builder.getParameters("Vacuum_0"))
+
+    def test_size_fields_coarsen_bulk(self):
+        caseName = 'unshielded_multiwire'
+        inputFile = self.inputFileFromCaseName(caseName)
+        Mesher().meshFromStep(inputFile, caseName)
+        withoutFields = self.countTriangles()
+        gmsh.finalize()
+
+        gmsh.initialize()
+        Mesher().meshFromStep(inputFile, caseName, sizeFields={})
+        withFields = self.countTriangles()
+
+        self.assertNotEqual(0, len(gmsh.model.mesh.field.list()))
+        self.assertLess(withFields, withoutFields)
+
+    def test_remove_restores_options(self):
+        caseName = 'unshielded_multiwire'
+        Mesher().meshFromStep(self.inputFileFromCaseName(caseName), caseName)
+        gmsh.option.setNumber("Mesh.MeshSizeExtendFromBoundary", 2)
+
+        builder = SizeFieldBuilder()
+        self.assertNotEqual(0, builder.apply())
+        self.assertEqual(0, gmsh.option.getNumber("Mesh.MeshSizeExtendFromBoundary"))
+        builder.remove()
+        self.assertEqual([], list(gmsh.model.mesh.field.list()))
+        self.assertEqual(2, gmsh.option.getNumber("Mesh.MeshSizeExtendFromBoundary"))
+
+
+if __name__ == '__main__':
+    unittest.main()
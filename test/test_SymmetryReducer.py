@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+import gmsh
+from src import utils
+from src.mesher import Mesher
+from src.ShapesClassification import ShapesClassification
+from src.SymmetryReducer import SymmetryReducer
+
+
+class testSymmetryReducer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def countElements(self, fileName):
+        gmsh.initialize()
+        try:
+            gmsh.open(fileName)
+            return sum(len(tags) for tags in gmsh.model.mesh.getElements(2)[1])
+        finally:
+            gmsh.finalize()
+
+    def classifyNamedDisks(self, disks):
+        dimTags = []
+        for x, y, radius in disks.values():
+            dimTags.append((2, gmsh.model.occ.addDisk(x, y, 0, radius, radius)))
+        utils.synchronize()
+        for dimTag, name in zip(dimTags, disks.keys()):
+            gmsh.model.setEntityName(*dimTag, name)
+        return ShapesClassification(dimTags)
+
+    def classifyNamedPolygons(self, polygons):
+        dimTags = []
+        for points in polygons.values():
+            pointTags = [gmsh.model.occ.addPoint(x, y, 0) for x, y in points]
+            lines = [gmsh.model.occ.addLine(pointTags[i - 1], pointTags[i])
+                     for i in range(len(pointTags))]
+            loop = gmsh.model.occ.addCurveLoop(lines)
+            dimTags.append((2, gmsh.model.occ.addPlaneSurface([loop])))
+        utils.synchronize()
+        for dimTag, name in zip(dimTags, polygons.keys()):
+            gmsh.model.setEntityName(*dimTag, name)
+        return ShapesClassification(dimTags)
+
+    def test_unknown_axis_raises(self):
+        with self.assertRaises(ValueError):
+            SymmetryReducer(axes=("z",))
+
+    def test_detects_axes_of_named_shapes(self):
+        gmsh.initialize()
+        try:
+            coax = self.classifyNamedDisks({
+                'Conductor_0': (0, 0, 10), 'Conductor_1': (0, 0, 2)})
+            self.assertEqual(["x", "y"], SymmetryReducer().detect(coax))
+            gmsh.clear()
+
+            pair = self.classifyNamedDisks({
+                'Conductor_0': (0, 0, 10), 'Conductor_1': (-4, 0, 1), 'Conductor_2': (4, 0, 1)})
+            # Each wire is the image of the other about the y axis.
+            self.assertEqual(["x"], SymmetryReducer().detect(pair))
+            reducer = SymmetryReducer(allowRemovals=True)
+            self.assertEqual(["x", "y"], reducer.detect(pair))
+            self.assertEqual("Conductor_2", reducer.mirrors["y"]["Conductor_1"])
+            gmsh.clear()
+
+            offCenter = self.classifyNamedDisks({
+                'Conductor_0': (0, 0, 10), 'Conductor_1': (4, 0, 1)})
+            self.assertEqual(["x"], SymmetryReducer().detect(offCenter))
+            gmsh.clear()
+
+            # Same shapes with different labels are not images of each other.
+            mixed = self.classifyNamedDisks({
+                'Conductor_0': (0, 0, 10), 'Conductor_1': (-4, 0, 1), 'Dielectric_1': (4, 0, 1)})
+            self.assertEqual(["x"], SymmetryReducer().detect(mixed))
+        finally:
+            gmsh.finalize()
+
+    def test_centrally_symmetric_shapes_are_not_mirror_symmetric(self):
+        gmsh.initialize()
+        try:
+            # Same bounding box, area and center of mass as their mirror images.
+            shapes = self.classifyNamedPolygons({
+                'Conductor_0': [(-10, -10), (10, -10), (10, 10), (-10, 10)],
+                'Conductor_1': [(-3, -1), (1, -1), (3, 1), (-1, 1)],
+            })
+            self.assertEqual([], SymmetryReducer().detect(shapes))
+        finally:
+            gmsh.finalize()
+
+    def test_reduced_meshes_keep_the_element_density(self):
+        # The cut between the wires of the coax crosses no sized point.
+        for caseName, names in (('two_wires_shielded', ['Conductor_1', 'OpenBoundary_0']),
+                                ('two_wires_coax', ['Conductor_0', 'Conductor_1'])):
+            inputFile = self.inputFileFromCaseName(caseName)
+            fullOutputs = Mesher().runFromInput(inputFile, outputFolder=self.tmp.name)
+            fullElements = self.countElements(fullOutputs[0])
+
+            reduced = Mesher()
+            outputs = reduced.runFromInput(inputFile, outputFolder=self.tmp.name, symmetry={})
+            axes = reduced.report["symmetry"]["axes"]
+            self.assertGreater(len(axes), 0, caseName)
+            ratio = self.countElements(outputs[0]) / fullElements
+            self.assertAlmostEqual(0.5 ** len(axes), ratio, delta=0.15, msg=caseName)
+
+            gmsh.initialize()
+            try:
+                gmsh.open(outputs[0])
+                physicalNames = [gmsh.model.getPhysicalName(*pG) for pG in gmsh.model.getPhysicalGroups()]
+                for axis in axes:
+                    self.assertIn('Symmetry_{}'.format(SymmetryReducer.AXES.index(axis)), physicalNames)
+                for name in names + ['Vacuum_0']:
+                    self.assertIn(name, physicalNames)
+            finally:
+                gmsh.finalize()
+
+    def test_open_case_keeps_open_boundary(self):
+        caseName = 'two_wires_open'
+        mesher = Mesher()
+        outputs = mesher.runFromInput(
+            self.inputFileFromCaseName(caseName), outputFolder=self.tmp.name, symmetry={})
+        axes = mesher.report["symmetry"]["axes"]
+        self.assertGreater(len(axes), 0)
+
+        gmsh.initialize()
+        try:
+            gmsh.open(outputs[0])
+            names = [gmsh.model.getPhysicalName(*pG) for pG in gmsh.model.getPhysicalGroups()]
+            self.assertIn('OpenBoundary_0', names)
+            for axis in axes:
+                self.assertIn('Symmetry_{}'.format(SymmetryReducer.AXES.index(axis)), names)
+        finally:
+            gmsh.finalize()
+
+
+if __name__ == '__main__':
+    unittest.main()
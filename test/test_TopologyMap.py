@@ -0,0 +1,86 @@
+import os
+import unittest
+import gmsh
+from src import utils
+from src.mesher import Mesher
+from src.TopologyMap import TopologyMap
+
+
+class testTopologyMap(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dirPath = os.path.dirname(os.path.realpath(__file__)) + '/'
+        cls.testdataPath = cls.dirPath + '../testData/'
+
+    def setUp(self):
+        gmsh.initialize()
+        TopologyMap.invalidate()
+
+    def tearDown(self):
+        gmsh.finalize()
+
+    def inputFileFromCaseName(self, caseName):
+        return self.testdataPath + caseName + '/' + caseName + ".step"
+
+    def test_lookups_match_gmsh_queries(self):
+        caseName = 'five_wires'
+        gmsh.model.add(caseName)
+        Mesher().buildGeometry(self.inputFileFromCaseName(caseName))
+
+        topology = TopologyMap.current()
+        for pG in gmsh.model.getPhysicalGroups():
+            name = gmsh.model.getPhysicalName(*pG)
+            self.assertEqual(pG, topology.getPhysicalGroupWithName(name))
+            tags = sorted(gmsh.model.getEntitiesForPhysicalGroup(*pG))
+            self.assertEqual(tags, sorted(tag for _, tag in topology.getEntities(pG)))
+            for tag in tags:
+                self.assertIn(pG, topology.getPhysicalGroups((pG[0], int(tag))))
+
+        self.assertIsNone(topology.getPhysicalGroupWithName('NotAGroup'))
+        notInPhysicalGroups = [
+            ent for ent in gmsh.model.getEntities()
+            if not any(ent[1] in gmsh.model.getEntitiesForPhysicalGroup(*pG)
+                       for pG in gmsh.model.getPhysicalGroups(ent[0]))]
+        self.assertEqual(notInPhysicalGroups, topology.getEntitiesNotInPhysicalGroups())
+
+    def test_map_is_rebuilt_after_synchronize(self):
+        gmsh.model.add('box')
+        gmsh.model.occ.addBox(0, 0, 0, 1, 1, 1)
+        utils.synchronize()
+        first = TopologyMap.current()
+        self.assertIs(first, TopologyMap.current())
+
+        gmsh.model.occ.addBox(2, 0, 0, 1, 1, 1)
+        utils.synchronize()
+        second = TopologyMap.current()
+        self.assertIsNot(first, second)
+        self.assertEqual(len(gmsh.model.getEntities()), len(second.entities))
+
+    def test_remove_entities_not_in_physical_groups(self):
+        gmsh.model.add('squares')
+        first = gmsh.model.occ.addRectangle(0, 0, 0, 1, 1)
+        gmsh.model.occ.addRectangle(2, 0, 0, 1, 1)
+        utils.synchronize()
+        gmsh.model.addPhysicalGroup(2, [first], name='Kept')
+        TopologyMap.invalidate()
+
+        TopologyMap.current().removeEntitiesNotInPhysicalGroups()
+        self.assertEqual([(2, first)], gmsh.model.getEntities(2))
+
+        # The OCC model is not changed, so synchronizing restores the entities.
+        utils.synchronize()
+        self.assertEqual(2, len(gmsh.model.getEntities(2)))
+
+    def test_physical_group_with_name_follows_model_changes(self):
+        gmsh.model.add('square')
+        square = gmsh.model.occ.addRectangle(0, 0, 0, 1, 1)
+        utils.synchronize()
+        pgTag = gmsh.model.addPhysicalGroup(2, [square], name='Square')
+        self.assertEqual((2, pgTag), Mesher.getPhysicalGroupWithName('Square'))
+
+        gmsh.clear()
+        self.assertIsNone(Mesher.getPhysicalGroupWithName('Square'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -50,6 +50,71 @@ class TestMesher(unittest.TestCase):
             ), 2
         )
 
+    def test_is_open_problem(self):
+        openCase = ShapesClassification(
+            gmsh.model.occ.importShapes(self.inputFileFromCaseName('two_wires_open'))
+        )
+        self.assertTrue(openCase.isOpenCase)
+
+        gmsh.clear()
+        closedCase = ShapesClassification(
+            gmsh.model.occ.importShapes(self.inputFileFromCaseName('five_wires'))
+        )
+        self.assertFalse(closedCase.isOpenCase)
+
+    def test_is_open_problem_does_not_leave_entities(self):
+        shapes = gmsh.model.occ.importShapes(self.inputFileFromCaseName('five_wires'))
+        numSurfaces = len(gmsh.model.occ.getEntities(2))
+        ShapesClassification(shapes)
+        self.assertEqual(len(gmsh.model.occ.getEntities(2)), numSurfaces)
+
+    def physicalGroupMasses(self):
+        masses = {}
+        for pG in gmsh.model.getPhysicalGroups():
+            tags = gmsh.model.getEntitiesForPhysicalGroup(*pG)
+            masses[gmsh.model.getPhysicalName(*pG)] = sum(
+                gmsh.model.occ.getMass(pG[0], tag) for tag in tags)
+        return masses
+
+    def test_fragment_engine_matches_cut_engine(self):
+        cases = ['partially_filled_coax', 'five_wires', 'nested_coax',
+                 'two_wires_open', 'unshielded_multiwire']
+        for caseName in cases:
+            gmsh.clear()
+            gmsh.model.add(caseName)
+            Mesher().buildGeometry(self.inputFileFromCaseName(caseName), "cut")
+            expected = self.physicalGroupMasses()
+
+            gmsh.clear()
+            gmsh.model.add(caseName)
+            Mesher().buildGeometry(self.inputFileFromCaseName(caseName), "fragment")
+            masses = self.physicalGroupMasses()
+
+            self.assertEqual(sorted(masses.keys()), sorted(expected.keys()), caseName)
+            for name, mass in expected.items():
+                self.assertAlmostEqual(masses[name], mass, places=6, msg=caseName + ' ' + name)
+
+    def test_meshing_presets_are_layered(self):
+        self.assertEqual(Mesher.getMeshingOptions(), Mesher.DEFAULT_MESHING_OPTIONS)
+
+        options = Mesher.getMeshingOptions(
+            "draft", overrides={"Mesh.MeshSizeMax": 10}, numThreads=4)
+        self.assertEqual(options["Mesh.ElementOrder"], 1)
+        self.assertEqual(options["Mesh.MeshSizeMax"], 10)
+        self.assertEqual(options["General.NumThreads"], 4)
+        self.assertEqual(options["Mesh.MaxNumThreads2D"], 4)
+        self.assertEqual(options["Mesh.MshFileVersion"], 2.2)
+
+        with self.assertRaises(ValueError):
+            Mesher.getMeshingOptions("unknown")
+
+    def test_mesh_from_step_with_draft_preset(self):
+        caseName = 'five_wires'
+        Mesher().meshFromStep(self.inputFileFromCaseName(caseName), caseName, preset="draft")
+
+        elementTypes, _, _ = gmsh.model.mesh.getElements(2)
+        self.assertEqual(list(elementTypes), [2]) # 3-node triangles.
+
     def test_mesh_from_step_with_partially_filled_coax(self):
         caseName = 'partially_filled_coax'
         Mesher().meshFromStep(self.inputFileFromCaseName(caseName), caseName)
@@ -13,3 +13,28 @@ class testStep2gmsh(unittest.TestCase):
         case_name = 'partially_filled_coax'
         input = self.testdata_path + case_name + '/' + case_name + '.step'
         launcher(input)
+
+    def test_import_does_not_load_heavy_modules(self):
+        import subprocess
+        code = (
+            "import sys, step2gmsh, src; "
+            "print(' '.join(m for m in ('gmsh', 'numpy', 'src.mesher') if m in sys.modules))"
+        )
+        process = subprocess.run(
+            [sys.executable, '-c', code], cwd=self.dir_path + '..',
+            capture_output=True, text=True, check=True)
+        self.assertEqual('', process.stdout.strip())
+
+    def test_caches_are_opt_in(self):
+        import subprocess
+        import tempfile
+        case_name = 'empty_coax'
+        input = self.testdata_path + case_name + '/' + case_name + '.step'
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, 'cache')
+            env = dict(os.environ, STEP2GMSH_CACHE_DIR=cache_dir)
+            for options, has_cache in (([], False), (['--cache'], True)):
+                subprocess.run(
+                    [sys.executable, 'step2gmsh.py', '-i', input, '-o', tmp] + options,
+                    cwd=self.dir_path + '..', env=env, capture_output=True, check=True)
+                self.assertEqual(has_cache, os.path.isdir(cache_dir))